@@ -4,23 +4,87 @@
 # LINK 4: https://www.flashscores.co.uk/football/england/premier-league-2018-2019/standings/
 # LINK 5: https://www.desmos.com/calculator/blcoia6ew0
 
+import argparse
 import os
 import numpy as np
 import copy
+import functools
 import pickle
 import time
-from typing import Dict, Union
+from concurrent.futures import Executor
+from typing import Callable, Dict, List
+
+import cache
+import checkpoint
+import convergence
+import engine
+import export
+import league
+import metrics
+import parallel
+import ranking
+import schedule
+import store
+import tables
 
 """
-These are constants that depends on the league. Games = number of games every team in league plays,
-h_f_a = amount of elo added to team that plays on home field. c, d, k and lambda = constants used for elo
+Config file of the league this program calculates (more info about the format in league.py). Constants, tie breakers,
+fixtures and clubs below are taken from it, so Main.py and cli.py --league with this file always calculate the same
+league, for other league or season just change the file (or make the new one and put its name here)
+"""
+LEAGUE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'leagues', 'premier_league_2019.json')
+LEAGUE_CONFIG = league.read_config(LEAGUE_FILE)
+
+"""
+These are constants that depends on the league (they are in LEAGUE_FILE). Games = number of games every team in
+league plays, h_f_a = amount of elo added to team that plays on home field. c, d, k and lambda = constants used for elo
 calculating, you probably don't want to change them, but in case you do you can find the info about them on the link
 in line 1. Draw constants are used to calculate the draw chance. I got this numbers by calculating the integral of
 draw function and setting it equal to average draw chance * elo interval where you calculate it (you can see more info
-on graphical calculator linked on LINK 5)
+on graphical calculator linked on LINK 5). home_att and away_att are the average home and away goals of one game
+last season (596/380 and 476/380). They can also be calibrated on the results of the previous seasons (python cli.py
+calibrate, more info in calibration.py)
+"""
+CONSTANTS = LEAGUE_CONFIG['constants']
+
+"""
+Order in which clubs are ranked at the end of the season (Premier League: points, goal difference, goals scored). Other
+leagues can use head to head tie breakers, for example La Liga would be ('points', 'head_to_head_points',
+'head_to_head_goal_difference', 'goal_difference', 'goals_scored'), all options are in ranking.py
+"""
+TIE_BREAKERS = tuple(LEAGUE_CONFIG.get('tie_breakers', ranking.DEFAULT_TIE_BREAKERS))
+
+"""
+If this is True, probabilities and expected elo results are taken from the precomputed table (tables.py) instead of
+being calculated for every match. It is a little bit less precise (you can see the max error with
+print(tables.get_table(CONSTANTS)), about 1e-8), but faster: about 3 times for calculate_probabilities and for the
+probabilities of one round of the batch engine, about 10% for the whole batch engine (benchmark.py measures both).
+Table is calculated again automatically if you change CONSTANTS
+"""
+USE_TABLES = False
+
+"""
+If this is True, elo of the clubs doesn't change during the season and all games of the season are played at once
+(more info in engine.py). It is a lot faster, so it is good for the quick screening runs, but the results are a little
+bit different (clubs that start the season well don't get better chances for the rest of it). Results of both modes
+are saved separately (they have different fingerprints)
+"""
+STATIC_RATINGS = False
+
+"""
+If this is True and numba is installed (pip install numba), games are played by the compiled kernel (kernel.py). It
+gives the same results as the numpy code, only faster, without numba this does nothing. The first run compiles the
+kernel, which takes a few seconds, after that it is loaded from the cache. It isn't used with USE_TABLES
+"""
+USE_KERNEL = True
+
 """
-CONSTANTS = {'games': 38, 'number_of_clubs': 20, 'home_field_advantage': 66.7, 'c': 10, 'd': 400, 'k_base': 10,
-             'lambda': 1, 'draw_max': 0.27, 'draw_variance': 250, 'home_att': 596/380, 'away_att': 476/380}
+If this is True, every calculated season is also written to the store file next to the checkpoint file (points, goal
+difference and position of every club and the results of the remaining games, about 200 bytes per season), so other
+questions than the averages and the placings can be answered later without new calculations (more info in store.py
+and query.py)
+"""
+STORE_SEASONS = False
 
 """
 These are the constants to set the size of cmd where you run this program (274 letters width and 67 height). I decided
@@ -30,15 +94,93 @@ max len of one line because then the output will look ugly, but it will function
 """
 SCREEN_WIDTH = 274
 SCREEN_HEIGHT = 67
-os.system('mode con: cols={} lines={}'.format(SCREEN_WIDTH, SCREEN_HEIGHT))
 
 """
 This is number of the calculations of the standing program will do. First I thought to use 14000605 for meme value 
 (more info on this link: https://knowyourmeme.com/memes/i-saw-14000605-futures), but then I realised it would take my 
-pc around 160 hours to calculate it (have really old and slow processor) all so I lowered this number to 1000000 
+pc around 160 hours to calculate it (have really old and slow processor) all so I lowered this number to 1000000.
+Now it is only the upper limit, calculations stop as soon as the results are precise enough (look at TOLERANCE)
 """
 MAX = 1000000
 
+"""
+Calculations stop when the title and relegation odds of every club are within TOLERANCE of the exact values (0.001
+is +-0.1 percentage points, with 95% confidence). The odds close to 50% are the slowest, with 0.001 they need at most
+(1.96 * 0.5 / 0.001) ** 2 = 960400 seasons, so the calculations always stop before MAX (0.0005 would need 3841600
+seasons and they would never stop before MAX). If AVERAGE_TOLERANCE isn't None, averages in the standings (points,
+wins, goals...) also have to be within it. More info in convergence.py
+"""
+TOLERANCE = 0.001
+AVERAGE_TOLERANCE = None
+
+"""
+File with all games of the league (who plays who on which matchday, fixtures in LEAGUE_FILE), more info about the
+format in schedule.py
+"""
+FIXTURES_FILE = os.path.join(os.path.dirname(LEAGUE_FILE), LEAGUE_CONFIG['fixtures'])
+
+"""
+File with the results of the games that were already played (same format as FIXTURES_FILE with home_goals and
+away_goals columns, it can be the fixtures file itself). Results are added to the clubs (with the new elo) and only the
+remaining games are calculated, None means the season didn't start yet
+"""
+RESULTS_FILE = None
+
+"""
+Number of seasons the batch engine calculates at the same time. Bigger number is faster, but every season takes around
+8 KB of memory while it is being calculated (results are the same with any batch size)
+"""
+BATCH_SIZE = 1000
+
+"""
+File where the results are saved (more info in checkpoint.py) and how often they are saved (in seconds)
+"""
+CHECKPOINT_FILE = 'results.npz'
+CHECKPOINT_INTERVAL = 60
+
+"""
+Folder of the cache of the results used instead of CHECKPOINT_FILE (every set of inputs and seed has its own checkpoint
+there, so the results of other inputs are never continued, more info in cache.py) and the size of the cache in bytes
+after which the results that were not used the longest are removed. It is used by main(), print_results() and cli.py
+(default of --cache), so they always see the same results. If RESULT_CACHE is None (for example cache.FOLDER turns it
+on) only CHECKPOINT_FILE is used, which is also the file cli.py replay, query and serve read
+"""
+RESULT_CACHE = None
+CACHE_BUDGET = cache.BUDGET
+
+"""
+Fingerprint (League.fingerprint({})) of the inputs the old data1.pickle and data2.pickle files were calculated with,
+they are converted only for these inputs (the files themselves don't say what they were calculated with)
+"""
+LEGACY_INPUTS = '46b8629734fa66bb3e377ad72372fef9d7ba8eeb9a3800567827d602eab2cb2e'
+
+"""
+If METRICS_FILE isn't None, progress of the calculations (seasons per second, remaining time, checkpoint latency...) is
+written to it as JSON lines every METRICS_INTERVAL seconds instead of printing it ('-' writes them on the screen). If
+PROFILE is True, records also have the time of every stage of the calculations (more info in metrics.py), it makes
+calculations a little bit slower, so it is turned off by default
+"""
+METRICS_FILE = None
+METRICS_INTERVAL = 10
+PROFILE = False
+
+
+def resize_screen() -> None:
+    """
+    Function that sets the size of cmd to SCREEN_WIDTH and SCREEN_HEIGHT. It is called only by the functions that print
+    the standings (main and print_results), so importing this file doesn't run any commands
+    """
+    if os.name == 'nt':
+        os.system('mode con: cols={} lines={}'.format(SCREEN_WIDTH, SCREEN_HEIGHT))
+
+
+def clear_screen() -> None:
+    """
+    Function that clears cmd before the standings are printed
+    """
+    if os.name == 'nt':
+        os.system('cls')
+
 
 class Club:
     """ Class that represents the club. It has to have name (as we all do), elo (because this is the main parameter for
@@ -116,11 +258,12 @@ class Standings:
         self.clubs = clubs
 
     def __repr__(self):
-        text = ''
-        text += '=' * SCREEN_WIDTH
-        text += self.name.center(SCREEN_WIDTH)
-        text += '=' * SCREEN_WIDTH
-        text += '{} | {} | {} | {} | {} | {} | {} | {} | {}'.format('#',
+        """
+        Method that renders the standings as the table, clubs are shown sorted, but the standings aren't changed
+        :return: output string
+        """
+        parts = ['=' * SCREEN_WIDTH, self.name.center(SCREEN_WIDTH), '=' * SCREEN_WIDTH]
+        parts.append('{} | {} | {} | {} | {} | {} | {} | {} | {}'.format('#',
                                                                     'Club name'.center(35).ljust(35),
                                                                     'Games'.center(10).ljust(10),
                                                                     'Points'.center(10).ljust(10),
@@ -129,47 +272,43 @@ class Standings:
                                                                     'Losses'.center(10).ljust(10),
                                                                     'Goals'.center(15).ljust(15),
                                                                     'ELO'.center(7).ljust(7)
-                                                                    ).center(SCREEN_WIDTH)
-        text += '=' * SCREEN_WIDTH
-        place = 1
-        self.sort_standings()
-        for club in self.clubs:
-            text += '{} {}'.format(str(place).rjust(2), self.clubs[club]).center(SCREEN_WIDTH)
-            text += '-' * SCREEN_WIDTH
-            place += 1
-        return text
-
-    def percentages(self):
-        text = ''
-        text += '=' * SCREEN_WIDTH
-        text += self.name.center(SCREEN_WIDTH)
-        text += '=' * SCREEN_WIDTH
-        place = 1
-        top = 'Club\\Position'.center(35) + '|'
-        for i in range(1, 21):
-            top += '{0:^10}'.format(i) + '|'
-        text += top.center(SCREEN_WIDTH)
-        text += '-' * SCREEN_WIDTH
-        for club in self.clubs:
-            places = self.clubs[club].name.center(35) + '|'
-            for i in range(20):
-                if i != 19:
-                    places += '{:.4%}'.format(self.clubs[club].placings[i] / MAX).center(10) + '|'
-                else:
-                    places += '{:.4%}'.format(self.clubs[club].placings[i] / MAX).center(10) + '|'
-            text += places.center(SCREEN_WIDTH)
-            text += '-' * SCREEN_WIDTH
-            place += 1
-        return text
+                                                                    ).center(SCREEN_WIDTH))
+        parts.append('=' * SCREEN_WIDTH)
+        for place, club in enumerate(self.sorted_clubs(), 1):
+            parts.append('{} {}'.format(str(place).rjust(2), club).center(SCREEN_WIDTH))
+            parts.append('-' * SCREEN_WIDTH)
+        return ''.join(parts)
+
+    def percentages(self) -> str:
+        """
+        Method that renders the probabilities of every position as the table (clubs are sorted the same way as in
+        __repr__)
+        :return: output string
+        """
+        parts = ['=' * SCREEN_WIDTH, self.name.center(SCREEN_WIDTH), '=' * SCREEN_WIDTH]
+        top = 'Club\\Position'.center(35) + '|' + ''.join('{0:^10}|'.format(i) for i in range(1, len(self.clubs) + 1))
+        parts += [top.center(SCREEN_WIDTH), '-' * SCREEN_WIDTH]
+        for club in self.sorted_clubs():
+            # every season gives the club exactly one place, so the sum of the placings is the number of seasons
+            seasons = max(sum(club.placings), 1)
+            places = club.name.center(35) + '|' + ''.join('{:.4%}'.format(count / seasons).center(10) + '|'
+                                                          for count in club.placings[:len(self.clubs)])
+            parts += [places.center(SCREEN_WIDTH), '-' * SCREEN_WIDTH]
+        return ''.join(parts)
+
+    def sorted_clubs(self) -> List[Club]:
+        """
+        Method that returns the clubs sorted by points/goal difference/goals scored, without changing the standings
+        :return: list of clubs
+        """
+        return sorted(self.clubs.values(), key=lambda club: (club.points, club.goals_scored - club.goals_received,
+                                                             club.goals_scored), reverse=True)
 
     def sort_standings(self) -> None:
         """
         Method that sorts the dictionary by points/goal difference
         """
-        dictionary = {list(self.clubs.keys())[list(self.clubs.values()).index(i)]: i
-                      for i in sorted(self.clubs.values(), key=lambda x: (x.points, x.goals_scored - x.goals_received,
-                                                                          x.goals_scored), reverse=True)}
-        self.clubs = dictionary
+        self.clubs = {club.name: club for club in self.sorted_clubs()}
 
 
 class StandingsFull(Standings):
@@ -187,7 +326,7 @@ class StandingsFull(Standings):
         :param other: Standing that is being added
         """
         for club in self.clubs:
-            self.clubs[club].games = 38
+            self.clubs[club].games = other.clubs[club].games
             self.clubs[club].points += other.clubs[club].points
             self.clubs[club].wins += other.clubs[club].wins
             self.clubs[club].draws += other.clubs[club].draws
@@ -211,17 +350,29 @@ class StandingsFull(Standings):
             self.clubs[club].elo /= self.standing_calculated
 
 
-def calculate_probabilities(home: Club, away: Club) -> tuple:
+def probability_table() -> tables.ProbabilityTable:
+    """
+    Function that returns the table of CONSTANTS if USE_TABLES is True, it is called once before the games are played
+    and the table is passed to every game (so the constants aren't checked for every match)
+    :return: table (None if USE_TABLES is False)
+    """
+    return tables.get_table(CONSTANTS) if USE_TABLES else None
+
+
+def calculate_probabilities(home: Club, away: Club, table: tables.ProbabilityTable = None) -> tuple:
     """
     Function that is being used to calculate the probabilities of each possible outcome of the match. It takes 2 clubs
     that play the match and then uses formulas to calculate the probabilities (floats between 0 and 1). You can find
     more info about this code on LINK 1 section 2 (explanation) and LINK 5 (graphical simulation of this function)
     :param home: Club that is playing on home field
     :param away: Club that is playing on away field
+    :param table: table from probability_table used instead of the formulas (if it is given)
     :return: tuple that contains the probabilities (home_win, draw, away_win)
     """
     hfa = CONSTANTS['home_field_advantage']
     difference_in_elo = home.elo + hfa - away.elo
+    if table is not None:
+        return table.lookup_one(difference_in_elo)[:3]
     draw_chance = CONSTANTS['draw_max'] * np.power(np.e, (-difference_in_elo ** 2 /
                                                           (2 * CONSTANTS['draw_variance'] ** 2)))
     home_win = 1 / (1 + np.power(CONSTANTS['c'], - difference_in_elo / CONSTANTS['d'])) * (1 - draw_chance)
@@ -229,38 +380,27 @@ def calculate_probabilities(home: Club, away: Club) -> tuple:
     return home_win, draw_chance, away_win
 
 
-def add_result(home: Club, away: Club) -> str:
+def add_result(home: Club, away: Club, table: tables.ProbabilityTable = None) -> str:
     """
     Function that decides the winner of the match based on calculated probabilities. It returns the string that
     represents the outcome
     :param home: Club that is playing on home field
     :param away: Club that is playing on away field
+    :param table: table from probability_table used instead of the formulas (if it is given)
     :return: String for outcome (1 == Home team won, X == draw, 2 == Away team won)
     """
     possible_outcomes = ['1', 'X', '2']
-    probabilities = calculate_probabilities(home, away)
+    probabilities = calculate_probabilities(home, away, table)
     return np.random.choice(possible_outcomes, p=probabilities)
 
 
-def calculate_poisson(home_average: float, away_average: float) -> tuple:
-    """
-    Function chat decides how much goals will each team score (for this I use poisson distribution
-    (more info on LINK 3)). It takes the average number of goals teams scored when playing on the home field/away field
-    and returns the tuple which contains the integers (number of goals)
-    :param home_average: average number of goals home team scored on its field
-    :param away_average: average number of goals away team scored on other field
-    :return: tuple (home_team_scored_goals, away_team_scored_goals)
-    """
-    home_poisson = np.random.poisson(home_average)
-    away_poisson = np.random.poisson(away_average)
-    return home_poisson, away_poisson
-
-
 def add_goals(home: Club, away: Club, result: str) -> tuple:
     """
-    Another function to add goals, but this time it adds goals based on the outcome of the match, for example if home
-    team won the game but poisson decided that the result should be 0:0, then I calculate another poisson while I am not
-    etting the right outcome. This is the function that is being used in main program to decide goals scored
+    Another function to add goals, but this time it adds goals based on the outcome of the match. It used to calculate
+    the poisson again and again while it wasn't getting the right outcome (for example if home team won the game but
+    poisson decided that the result should be 0:0), now it picks the result directly from the poisson probabilities of
+    only the results that agree with the outcome, which gives the same distribution, but with one random number. This is
+    the function that is being used in main program to decide goals scored
     :param home: Club playing on the home field
     :param away: Club playing on the away field
     :param result: Who won
@@ -273,30 +413,39 @@ def add_goals(home: Club, away: Club, result: str) -> tuple:
     away_att = (away.away_goals_scored / games) / CONSTANTS['away_att']
     home_def = (away.home_goals_received / games) / CONSTANTS['away_att']
     away_average = away_att * home_def * CONSTANTS['away_att']
-    home_scored, away_scored = calculate_poisson(home_average, away_average)
-    if result == '1':
-        while home_scored <= away_scored:
-            home_scored, away_scored = calculate_poisson(home_average, away_average)
-    elif result == 'X':
-        while home_scored != away_scored:
-            home_scored, away_scored = calculate_poisson(home_average, away_average)
-    elif result == '2':
-        while home_scored >= away_scored:
-            home_scored, away_scored = calculate_poisson(home_average, away_average)
-    return home_scored, away_scored
+    cdf = scoreline_cdf(home_average, away_average)[['1', 'X', '2'].index(result)]
+    cell = int(np.searchsorted(cdf, np.random.random(), side='right'))
+    return divmod(cell, engine.MAX_GOALS + 1)
+
+
+@functools.lru_cache(maxsize=None)
+def scoreline_cdf(home_average: float, away_average: float) -> np.ndarray:
+    """
+    Function that calculates the distribution of the results for each outcome (more info in engine.scoreline_cdf). Every
+    pair of clubs always has the same averages, so it is calculated only once for each game
+    :param home_average: average number of goals home team scores
+    :param away_average: average number of goals away team scores
+    :return: array with shape (3, number of results), cumulative distribution for '1', 'X' and '2'
+    """
+    return engine.scoreline_cdf(home_average, away_average)[0]
 
 
-def elo_change(home: Club, away: Club, goal_difference: int) -> tuple:
+def elo_change(home: Club, away: Club, goal_difference: int, table: tables.ProbabilityTable = None) -> tuple:
     """
     Function that calculates the new elo of the clubs after the game (for more info about this calculation view LINK 1)
     :param home: Club playing on the home field
     :param away: Club playing on the away field
     :param goal_difference: home team scored goals - away team scored goals
+    :param table: table from probability_table used instead of the formulas (if it is given)
     :return: tuple (new elo for home club, new elo for away club)
     """
     home_elo_before = home.elo + CONSTANTS['home_field_advantage']
     away_elo_before = away.elo
-    home_positive_result = 1 / (1 + np.power(CONSTANTS['c'], (away_elo_before - home_elo_before) / CONSTANTS['d']))
+    if table is not None:
+        home_positive_result = table.lookup_one(home_elo_before - away_elo_before)[3]
+    else:
+        home_positive_result = 1 / (1 + np.power(CONSTANTS['c'], (away_elo_before - home_elo_before) /
+                                                 CONSTANTS['d']))
     if goal_difference == 0:
         elo_score = 0.5
     elif goal_difference > 0:
@@ -304,566 +453,472 @@ def elo_change(home: Club, away: Club, goal_difference: int) -> tuple:
     else:
         elo_score = 0
     delta = abs(goal_difference)
-    k = CONSTANTS['k_base'] * np.power((1 + delta), CONSTANTS['lambda'])
+    k = CONSTANTS['k_base'] * (1 + delta) ** CONSTANTS['lambda']
     elo_home_new = home.elo + k * (elo_score - home_positive_result)
     elo_away_new = away.elo + k * (home_positive_result - elo_score)
     return elo_home_new, elo_away_new
 
 
-def play_game(home: Club, away: Club) -> None:
+def play_game(home: Club, away: Club, table: tables.ProbabilityTable = None) -> None:
     """
     Function that runs the simulation of the game. First it calculates the winner, than the amount of goals each team
     scored, new elo for both clubs and than writes the result to the data of the clubs
     :param home: Club playing on the home field
     :param away: Club playing on the away field
+    :param table: table from probability_table used instead of the formulas (if it is given)
+    """
+    if metrics.collector is None:
+        outcome = add_result(home, away, table)
+        goals = add_goals(home, away, outcome)
+        record_result(home, away, goals, table)
+        return
+    with metrics.stage('add_result'):
+        outcome = add_result(home, away, table)
+    with metrics.stage('add_goals'):
+        goals = add_goals(home, away, outcome)
+    with metrics.stage('record_result'):
+        record_result(home, away, goals, table)
+
+
+def record_result(home: Club, away: Club, goals: tuple, table: tables.ProbabilityTable = None) -> None:
+    """
+    Function that writes the result of the game (simulated or the real one) to the data of the clubs, together with
+    the new elo
+    :param home: Club playing on the home field
+    :param away: Club playing on the away field
+    :param goals: tuple (home goals, away goals)
+    :param table: table from probability_table used instead of the formulas (if it is given)
     """
-    outcome = add_result(home, away)
-    goals = add_goals(home, away, outcome)
-    new_elo = elo_change(home, away, goals[0] - goals[1])
-    if outcome == '1':
+    new_elo = elo_change(home, away, goals[0] - goals[1], table)
+    if goals[0] > goals[1]:
         home.add_result(3, goals[0], goals[1], new_elo[0])
         away.add_result(0, goals[1], goals[0], new_elo[1])
-    if outcome == 'X':
+    elif goals[0] == goals[1]:
         home.add_result(1, goals[0], goals[1], new_elo[0])
         away.add_result(1, goals[1], goals[0], new_elo[1])
-    if outcome == '2':
+    else:
         home.add_result(0, goals[0], goals[1], new_elo[0])
         away.add_result(3, goals[1], goals[0], new_elo[1])
 
 
-def play_all_games(teams: Dict[str, Club]) -> None:
+def apply_results(teams: Dict[str, Club], results: List[tuple]) -> None:
     """
-    Function that plays all games of the one league. This method SUCKSSSS, but it works!!! In future updates I will
-     probably add scraper for webpage so I dont need to write so much text
+    Function that adds the real results of the games that were already played to the clubs
     :param teams: dictionary of teams
+    :param results: list of tuples (matchday, home club name, away club name, home goals, away goals) in the order
+                    they were played (schedule.read_results)
     """
+    table = probability_table()
+    for _, home, away, home_goals, away_goals in results:
+        record_result(teams[home], teams[away], (home_goals, away_goals), table)
 
-    # 1st Leg
-    play_game(teams['Liverpool'], teams['Norwich'])
-    play_game(teams['West Ham'], teams['Manchester City'])
-    play_game(teams['Crystal Palace'], teams['Everton'])
-    play_game(teams['Burnley'], teams['Southampton'])
-    play_game(teams['Watford'], teams['Brighton'])
-    play_game(teams['Bournemouth'], teams['Sheffield'])
-    play_game(teams['Tottenham'], teams['Aston Villa'])
-    play_game(teams['Leicester'], teams['Wolverhampton'])
-    play_game(teams['Newcastle'], teams['Arsenal'])
-    play_game(teams['Manchester United'], teams['Chelsea'])
-    # 2st Leg
-    play_game(teams['Arsenal'], teams['Burnley'])
-    play_game(teams['Southampton'], teams['Liverpool'])
-    play_game(teams['Brighton'], teams['West Ham'])
-    play_game(teams['Everton'], teams['Watford'])
-    play_game(teams['Norwich'], teams['Newcastle'])
-    play_game(teams['Aston Villa'], teams['Bournemouth'])
-    play_game(teams['Manchester City'], teams['Tottenham'])
-    play_game(teams['Sheffield'], teams['Crystal Palace'])
-    play_game(teams['Chelsea'], teams['Leicester'])
-    play_game(teams['Wolverhampton'], teams['Manchester United'])
-    # 3st Leg
-    play_game(teams['Aston Villa'], teams['Everton'])
-    play_game(teams['Norwich'], teams['Chelsea'])
-    play_game(teams['Brighton'], teams['Southampton'])
-    play_game(teams['Manchester United'], teams['Crystal Palace'])
-    play_game(teams['Wolverhampton'], teams['Burnley'])
-    play_game(teams['Watford'], teams['West Ham'])
-    play_game(teams['Sheffield'], teams['Leicester'])
-    play_game(teams['Liverpool'], teams['Arsenal'])
-    play_game(teams['Bournemouth'], teams['Manchester City'])
-    play_game(teams['Tottenham'], teams['Newcastle'])
-    # 4st Leg
-    play_game(teams['Southampton'], teams['Manchester United'])
-    play_game(teams['Crystal Palace'], teams['Aston Villa'])
-    play_game(teams['Chelsea'], teams['Sheffield'])
-    play_game(teams['Newcastle'], teams['Watford'])
-    play_game(teams['Manchester City'], teams['Brighton'])
-    play_game(teams['West Ham'], teams['Norwich'])
-    play_game(teams['Leicester'], teams['Bournemouth'])
-    play_game(teams['Burnley'], teams['Liverpool'])
-    play_game(teams['Everton'], teams['Wolverhampton'])
-    play_game(teams['Arsenal'], teams['Tottenham'])
-    # 5st Leg
-    play_game(teams['Liverpool'], teams['Newcastle'])
-    play_game(teams['Manchester United'], teams['Leicester'])
-    play_game(teams['Sheffield'], teams['Southampton'])
-    play_game(teams['Brighton'], teams['Burnley'])
-    play_game(teams['Wolverhampton'], teams['Chelsea'])
-    play_game(teams['Tottenham'], teams['Crystal Palace'])
-    play_game(teams['Norwich'], teams['Manchester City'])
-    play_game(teams['Bournemouth'], teams['Everton'])
-    play_game(teams['Watford'], teams['Arsenal'])
-    play_game(teams['Aston Villa'], teams['West Ham'])
-    # 6st Leg
-    play_game(teams['Southampton'], teams['Bournemouth'])
-    play_game(teams['Leicester'], teams['Tottenham'])
-    play_game(teams['Burnley'], teams['Norwich'])
-    play_game(teams['Everton'], teams['Sheffield'])
-    play_game(teams['Crystal Palace'], teams['Wolverhampton'])
-    play_game(teams['Manchester City'], teams['Watford'])
-    play_game(teams['Newcastle'], teams['Brighton'])
-    play_game(teams['West Ham'], teams['Manchester United'])
-    play_game(teams['Arsenal'], teams['Aston Villa'])
-    play_game(teams['Chelsea'], teams['Liverpool'])
-    # 7st Leg
-    play_game(teams['Sheffield'], teams['Liverpool'])
-    play_game(teams['Crystal Palace'], teams['Norwich'])
-    play_game(teams['Aston Villa'], teams['Burnley'])
-    play_game(teams['Bournemouth'], teams['West Ham'])
-    play_game(teams['Wolverhampton'], teams['Watford'])
-    play_game(teams['Tottenham'], teams['Southampton'])
-    play_game(teams['Chelsea'], teams['Brighton'])
-    play_game(teams['Leicester'], teams['Newcastle'])
-    play_game(teams['Everton'], teams['Manchester City'])
-    play_game(teams['Manchester United'], teams['Arsenal'])
-    # 8st Leg
-    play_game(teams['Norwich'], teams['Aston Villa'])
-    play_game(teams['Southampton'], teams['Chelsea'])
-    play_game(teams['West Ham'], teams['Crystal Palace'])
-    play_game(teams['Watford'], teams['Sheffield'])
-    play_game(teams['Burnley'], teams['Everton'])
-    play_game(teams['Manchester City'], teams['Wolverhampton'])
-    play_game(teams['Brighton'], teams['Tottenham'])
-    play_game(teams['Liverpool'], teams['Leicester'])
-    play_game(teams['Arsenal'], teams['Bournemouth'])
-    play_game(teams['Newcastle'], teams['Manchester United'])
-    # 9st Leg
-    play_game(teams['Aston Villa'], teams['Brighton'])
-    play_game(teams['Tottenham'], teams['Watford'])
-    play_game(teams['Manchester United'], teams['Liverpool'])
-    play_game(teams['Wolverhampton'], teams['Southampton'])
-    play_game(teams['Crystal Palace'], teams['Manchester City'])
-    play_game(teams['Everton'], teams['West Ham'])
-    play_game(teams['Chelsea'], teams['Newcastle'])
-    play_game(teams['Sheffield'], teams['Arsenal'])
-    play_game(teams['Bournemouth'], teams['Norwich'])
-    play_game(teams['Leicester'], teams['Burnley'])
-    # 10st Leg
-    play_game(teams['Arsenal'], teams['Crystal Palace'])
-    play_game(teams['Manchester City'], teams['Aston Villa'])
-    play_game(teams['Southampton'], teams['Leicester'])
-    play_game(teams['Liverpool'], teams['Tottenham'])
-    play_game(teams['Newcastle'], teams['Wolverhampton'])
-    play_game(teams['Watford'], teams['Bournemouth'])
-    play_game(teams['Brighton'], teams['Everton'])
-    play_game(teams['West Ham'], teams['Sheffield'])
-    play_game(teams['Norwich'], teams['Manchester United'])
-    play_game(teams['Burnley'], teams['Chelsea'])
-    # 11st Leg
-    play_game(teams['West Ham'], teams['Newcastle'])
-    play_game(teams['Aston Villa'], teams['Liverpool'])
-    play_game(teams['Watford'], teams['Chelsea'])
-    play_game(teams['Arsenal'], teams['Wolverhampton'])
-    play_game(teams['Everton'], teams['Tottenham'])
-    play_game(teams['Bournemouth'], teams['Manchester United'])
-    play_game(teams['Crystal Palace'], teams['Leicester'])
-    play_game(teams['Sheffield'], teams['Burnley'])
-    play_game(teams['Brighton'], teams['Norwich'])
-    play_game(teams['Manchester City'], teams['Southampton'])
-    # 12st Leg
-    play_game(teams['Burnley'], teams['West Ham'])
-    play_game(teams['Wolverhampton'], teams['Aston Villa'])
-    play_game(teams['Leicester'], teams['Arsenal'])
-    play_game(teams['Newcastle'], teams['Bournemouth'])
-    play_game(teams['Southampton'], teams['Everton'])
-    play_game(teams['Liverpool'], teams['Manchester City'])
-    play_game(teams['Norwich'], teams['Watford'])
-    play_game(teams['Chelsea'], teams['Crystal Palace'])
-    play_game(teams['Manchester United'], teams['Brighton'])
-    play_game(teams['Tottenham'], teams['Sheffield'])
-    # 13st Leg
-    play_game(teams['West Ham'], teams['Tottenham'])
-    play_game(teams['Arsenal'], teams['Southampton'])
-    play_game(teams['Brighton'], teams['Leicester'])
-    play_game(teams['Watford'], teams['Burnley'])
-    play_game(teams['Sheffield'], teams['Manchester United'])
-    play_game(teams['Crystal Palace'], teams['Liverpool'])
-    play_game(teams['Bournemouth'], teams['Wolverhampton'])
-    play_game(teams['Everton'], teams['Norwich'])
-    play_game(teams['Aston Villa'], teams['Newcastle'])
-    play_game(teams['Manchester City'], teams['Chelsea'])
-    # 14st Leg
-    play_game(teams['Liverpool'], teams['Brighton'])
-    play_game(teams['Newcastle'], teams['Manchester City'])
-    play_game(teams['Norwich'], teams['Arsenal'])
-    play_game(teams['Burnley'], teams['Crystal Palace'])
-    play_game(teams['Leicester'], teams['Everton'])
-    play_game(teams['Southampton'], teams['Watford'])
-    play_game(teams['Chelsea'], teams['West Ham'])
-    play_game(teams['Tottenham'], teams['Bournemouth'])
-    play_game(teams['Manchester United'], teams['Aston Villa'])
-    play_game(teams['Wolverhampton'], teams['Sheffield'])
-    # 15st Leg
-    play_game(teams['Leicester'], teams['Watford'])
-    play_game(teams['Sheffield'], teams['Newcastle'])
-    play_game(teams['Wolverhampton'], teams['West Ham'])
-    play_game(teams['Burnley'], teams['Manchester City'])
-    play_game(teams['Arsenal'], teams['Brighton'])
-    play_game(teams['Manchester United'], teams['Tottenham'])
-    play_game(teams['Chelsea'], teams['Aston Villa'])
-    play_game(teams['Southampton'], teams['Norwich'])
-    play_game(teams['Crystal Palace'], teams['Bournemouth'])
-    play_game(teams['Liverpool'], teams['Everton'])
-    # 16st Leg
-    play_game(teams['Aston Villa'], teams['Leicester'])
-    play_game(teams['Brighton'], teams['Wolverhampton'])
-    play_game(teams['Bournemouth'], teams['Liverpool'])
-    play_game(teams['Manchester City'], teams['Manchester United'])
-    play_game(teams['Tottenham'], teams['Burnley'])
-    play_game(teams['Watford'], teams['Crystal Palace'])
-    play_game(teams['Everton'], teams['Chelsea'])
-    play_game(teams['Newcastle'], teams['Southampton'])
-    play_game(teams['West Ham'], teams['Arsenal'])
-    play_game(teams['Norwich'], teams['Sheffield'])
-    # 17st Leg
-    play_game(teams['Liverpool'], teams['Watford'])
-    play_game(teams['Chelsea'], teams['Bournemouth'])
-    play_game(teams['Sheffield'], teams['Aston Villa'])
-    play_game(teams['Leicester'], teams['Norwich'])
-    play_game(teams['Burnley'], teams['Newcastle'])
-    play_game(teams['Crystal Palace'], teams['Brighton'])
-    play_game(teams['Arsenal'], teams['Manchester City'])
-    play_game(teams['Southampton'], teams['West Ham'])
-    play_game(teams['Manchester United'], teams['Everton'])
-    play_game(teams['Wolverhampton'], teams['Tottenham'])
-    # 18st Leg
-    play_game(teams['Tottenham'], teams['Chelsea'])
-    play_game(teams['West Ham'], teams['Liverpool'])
-    play_game(teams['Newcastle'], teams['Crystal Palace'])
-    play_game(teams['Aston Villa'], teams['Southampton'])
-    play_game(teams['Watford'], teams['Manchester United'])
-    play_game(teams['Norwich'], teams['Wolverhampton'])
-    play_game(teams['Everton'], teams['Arsenal'])
-    play_game(teams['Brighton'], teams['Sheffield'])
-    play_game(teams['Manchester City'], teams['Leicester'])
-    play_game(teams['Bournemouth'], teams['Burnley'])
-    # 19st Leg
-    play_game(teams['Bournemouth'], teams['Arsenal'])
-    play_game(teams['Manchester United'], teams['Newcastle'])
-    play_game(teams['Sheffield'], teams['Watford'])
-    play_game(teams['Chelsea'], teams['Southampton'])
-    play_game(teams['Aston Villa'], teams['Norwich'])
-    play_game(teams['Tottenham'], teams['Brighton'])
-    play_game(teams['Crystal Palace'], teams['West Ham'])
-    play_game(teams['Wolverhampton'], teams['Manchester City'])
-    play_game(teams['Everton'], teams['Burnley'])
-    play_game(teams['Leicester'], teams['Liverpool'])
-    # 20 Leg
-    play_game(teams['Arsenal'], teams['Chelsea'])
-    play_game(teams['Southampton'], teams['Crystal Palace'])
-    play_game(teams['Norwich'], teams['Tottenham'])
-    play_game(teams['Brighton'], teams['Bournemouth'])
-    play_game(teams['Burnley'], teams['Manchester United'])
-    play_game(teams['West Ham'], teams['Leicester'])
-    play_game(teams['Manchester City'], teams['Sheffield'])
-    play_game(teams['Newcastle'], teams['Everton'])
-    play_game(teams['Watford'], teams['Aston Villa'])
-    play_game(teams['Liverpool'], teams['Wolverhampton'])
-    # 21 Leg
-    play_game(teams['Newcastle'], teams['Leicester'])
-    play_game(teams['Brighton'], teams['Chelsea'])
-    play_game(teams['West Ham'], teams['Bournemouth'])
-    play_game(teams['Watford'], teams['Wolverhampton'])
-    play_game(teams['Liverpool'], teams['Sheffield'])
-    play_game(teams['Arsenal'], teams['Manchester United'])
-    play_game(teams['Manchester City'], teams['Everton'])
-    play_game(teams['Southampton'], teams['Tottenham'])
-    play_game(teams['Burnley'], teams['Aston Villa'])
-    play_game(teams['Norwich'], teams['Crystal Palace'])
-    # 22 Leg
-    play_game(teams['Everton'], teams['Brighton'])
-    play_game(teams['Sheffield'], teams['West Ham'])
-    play_game(teams['Leicester'], teams['Southampton'])
-    play_game(teams['Aston Villa'], teams['Manchester City'])
-    play_game(teams['Manchester United'], teams['Norwich'])
-    play_game(teams['Bournemouth'], teams['Watford'])
-    play_game(teams['Chelsea'], teams['Burnley'])
-    play_game(teams['Crystal Palace'], teams['Arsenal'])
-    play_game(teams['Wolverhampton'], teams['Newcastle'])
-    play_game(teams['Tottenham'], teams['Liverpool'])
-    # 23 Leg
-    play_game(teams['Watford'], teams['Tottenham'])
-    play_game(teams['Newcastle'], teams['Chelsea'])
-    play_game(teams['Brighton'], teams['Aston Villa'])
-    play_game(teams['Burnley'], teams['Leicester'])
-    play_game(teams['Manchester City'], teams['Crystal Palace'])
-    play_game(teams['West Ham'], teams['Everton'])
-    play_game(teams['Arsenal'], teams['Sheffield'])
-    play_game(teams['Liverpool'], teams['Manchester United'])
-    play_game(teams['Norwich'], teams['Bournemouth'])
-    play_game(teams['Southampton'], teams['Wolverhampton'])
-    # 24 Leg
-    play_game(teams['Bournemouth'], teams['Brighton'])
-    play_game(teams['Wolverhampton'], teams['Liverpool'])
-    play_game(teams['Aston Villa'], teams['Watford'])
-    play_game(teams['Leicester'], teams['West Ham'])
-    play_game(teams['Sheffield'], teams['Manchester City'])
-    play_game(teams['Everton'], teams['Newcastle'])
-    play_game(teams['Manchester United'], teams['Burnley'])
-    play_game(teams['Chelsea'], teams['Arsenal'])
-    play_game(teams['Tottenham'], teams['Norwich'])
-    play_game(teams['Crystal Palace'], teams['Southampton'])
-    # 25 Leg
-    play_game(teams['Tottenham'], teams['Manchester City'])
-    play_game(teams['Burnley'], teams['Arsenal'])
-    play_game(teams['Newcastle'], teams['Norwich'])
-    play_game(teams['Manchester United'], teams['Wolverhampton'])
-    play_game(teams['Crystal Palace'], teams['Sheffield'])
-    play_game(teams['West Ham'], teams['Brighton'])
-    play_game(teams['Leicester'], teams['Chelsea'])
-    play_game(teams['Bournemouth'], teams['Aston Villa'])
-    play_game(teams['Watford'], teams['Everton'])
-    play_game(teams['Liverpool'], teams['Southampton'])
-    # 26 Leg
-    play_game(teams['Aston Villa'], teams['Tottenham'])
-    play_game(teams['Brighton'], teams['Watford'])
-    play_game(teams['Southampton'], teams['Burnley'])
-    play_game(teams['Everton'], teams['Crystal Palace'])
-    play_game(teams['Norwich'], teams['Liverpool'])
-    play_game(teams['Wolverhampton'], teams['Leicester'])
-    play_game(teams['Chelsea'], teams['Manchester United'])
-    play_game(teams['Manchester City'], teams['West Ham'])
-    play_game(teams['Arsenal'], teams['Newcastle'])
-    play_game(teams['Sheffield'], teams['Bournemouth'])
-    # 27 Leg
-    play_game(teams['Crystal Palace'], teams['Newcastle'])
-    play_game(teams['Arsenal'], teams['Everton'])
-    play_game(teams['Burnley'], teams['Bournemouth'])
-    play_game(teams['Leicester'], teams['Manchester City'])
-    play_game(teams['Sheffield'], teams['Brighton'])
-    play_game(teams['Wolverhampton'], teams['Norwich'])
-    play_game(teams['Liverpool'], teams['West Ham'])
-    play_game(teams['Southampton'], teams['Aston Villa'])
-    play_game(teams['Manchester United'], teams['Watford'])
-    play_game(teams['Chelsea'], teams['Tottenham'])
-    # 28 Leg
-    play_game(teams['Bournemouth'], teams['Chelsea'])
-    play_game(teams['Newcastle'], teams['Burnley'])
-    play_game(teams['Norwich'], teams['Leicester'])
-    play_game(teams['West Ham'], teams['Southampton'])
-    play_game(teams['Brighton'], teams['Crystal Palace'])
-    play_game(teams['Everton'], teams['Manchester United'])
-    play_game(teams['Tottenham'], teams['Wolverhampton'])
-    play_game(teams['Aston Villa'], teams['Sheffield'])
-    play_game(teams['Manchester City'], teams['Arsenal'])
-    play_game(teams['Watford'], teams['Liverpool'])
-    # 29 Leg
-    play_game(teams['Wolverhampton'], teams['Brighton'])
-    play_game(teams['Burnley'], teams['Tottenham'])
-    play_game(teams['Arsenal'], teams['West Ham'])
-    play_game(teams['Leicester'], teams['Aston Villa'])
-    play_game(teams['Southampton'], teams['Newcastle'])
-    play_game(teams['Liverpool'], teams['Bournemouth'])
-    play_game(teams['Sheffield'], teams['Norwich'])
-    play_game(teams['Crystal Palace'], teams['Watford'])
-    play_game(teams['Chelsea'], teams['Everton'])
-    play_game(teams['Manchester United'], teams['Manchester City'])
-    # 30 Leg
-    play_game(teams['West Ham'], teams['Wolverhampton'])
-    play_game(teams['Brighton'], teams['Arsenal'])
-    play_game(teams['Tottenham'], teams['Manchester United'])
-    play_game(teams['Everton'], teams['Liverpool'])
-    play_game(teams['Norwich'], teams['Southampton'])
-    play_game(teams['Newcastle'], teams['Sheffield'])
-    play_game(teams['Watford'], teams['Leicester'])
-    play_game(teams['Manchester City'], teams['Burnley'])
-    play_game(teams['Aston Villa'], teams['Chelsea'])
-    play_game(teams['Bournemouth'], teams['Crystal Palace'])
-    # 31 Leg
-    play_game(teams['Norwich'], teams['Everton'])
-    play_game(teams['Leicester'], teams['Brighton'])
-    play_game(teams['Chelsea'], teams['Manchester City'])
-    play_game(teams['Southampton'], teams['Arsenal'])
-    play_game(teams['Newcastle'], teams['Aston Villa'])
-    play_game(teams['Manchester United'], teams['Sheffield'])
-    play_game(teams['Tottenham'], teams['West Ham'])
-    play_game(teams['Burnley'], teams['Watford'])
-    play_game(teams['Wolverhampton'], teams['Bournemouth'])
-    play_game(teams['Liverpool'], teams['Crystal Palace'])
-    # 32 Leg
-    play_game(teams['Manchester City'], teams['Liverpool'])
-    play_game(teams['Aston Villa'], teams['Wolverhampton'])
-    play_game(teams['Brighton'], teams['Manchester United'])
-    play_game(teams['Arsenal'], teams['Norwich'])
-    play_game(teams['Crystal Palace'], teams['Burnley'])
-    play_game(teams['Watford'], teams['Southampton'])
-    play_game(teams['Sheffield'], teams['Tottenham'])
-    play_game(teams['Bournemouth'], teams['Newcastle'])
-    play_game(teams['West Ham'], teams['Chelsea'])
-    play_game(teams['Everton'], teams['Leicester'])
-    # 33 Leg
-    play_game(teams['Southampton'], teams['Manchester City'])
-    play_game(teams['Leicester'], teams['Crystal Palace'])
-    play_game(teams['Wolverhampton'], teams['Arsenal'])
-    play_game(teams['Liverpool'], teams['Aston Villa'])
-    play_game(teams['Newcastle'], teams['West Ham'])
-    play_game(teams['Burnley'], teams['Sheffield'])
-    play_game(teams['Chelsea'], teams['Watford'])
-    play_game(teams['Norwich'], teams['Brighton'])
-    play_game(teams['Tottenham'], teams['Everton'])
-    play_game(teams['Manchester United'], teams['Bournemouth'])
-    # 34 Leg
-    play_game(teams['Arsenal'], teams['Leicester'])
-    play_game(teams['Brighton'], teams['Liverpool'])
-    play_game(teams['Sheffield'], teams['Wolverhampton'])
-    play_game(teams['Everton'], teams['Southampton'])
-    play_game(teams['Aston Villa'], teams['Manchester United'])
-    play_game(teams['Manchester City'], teams['Newcastle'])
-    play_game(teams['Bournemouth'], teams['Tottenham'])
-    play_game(teams['West Ham'], teams['Burnley'])
-    play_game(teams['Watford'], teams['Norwich'])
-    play_game(teams['Crystal Palace'], teams['Chelsea'])
-    # 35 Leg
-    play_game(teams['Manchester United'], teams['Southampton'])
-    play_game(teams['Liverpool'], teams['Burnley'])
-    play_game(teams['Wolverhampton'], teams['Everton'])
-    play_game(teams['Sheffield'], teams['Chelsea'])
-    play_game(teams['Bournemouth'], teams['Leicester'])
-    play_game(teams['Brighton'], teams['Manchester City'])
-    play_game(teams['Watford'], teams['Newcastle'])
-    play_game(teams['Norwich'], teams['West Ham'])
-    play_game(teams['Tottenham'], teams['Arsenal'])
-    play_game(teams['Aston Villa'], teams['Crystal Palace'])
-    # 36 Leg
-    play_game(teams['Everton'], teams['Aston Villa'])
-    play_game(teams['Chelsea'], teams['Norwich'])
-    play_game(teams['Southampton'], teams['Brighton'])
-    play_game(teams['Burnley'], teams['Wolverhampton'])
-    play_game(teams['Manchester City'], teams['Bournemouth'])
-    play_game(teams['Crystal Palace'], teams['Manchester United'])
-    play_game(teams['Leicester'], teams['Sheffield'])
-    play_game(teams['West Ham'], teams['Watford'])
-    play_game(teams['Arsenal'], teams['Liverpool'])
-    play_game(teams['Newcastle'], teams['Tottenham'])
-    # 37 Leg
-    play_game(teams['Tottenham'], teams['Leicester'])
-    play_game(teams['Bournemouth'], teams['Southampton'])
-    play_game(teams['Norwich'], teams['Burnley'])
-    play_game(teams['Aston Villa'], teams['Arsenal'])
-    play_game(teams['Wolverhampton'], teams['Crystal Palace'])
-    play_game(teams['Manchester United'], teams['West Ham'])
-    play_game(teams['Sheffield'], teams['Everton'])
-    play_game(teams['Watford'], teams['Manchester City'])
-    play_game(teams['Brighton'], teams['Newcastle'])
-    play_game(teams['Liverpool'], teams['Chelsea'])
-    # 38 Leg
-    play_game(teams['Burnley'], teams['Brighton'])
-    play_game(teams['Leicester'], teams['Manchester United'])
-    play_game(teams['Chelsea'], teams['Wolverhampton'])
-    play_game(teams['Crystal Palace'], teams['Tottenham'])
-    play_game(teams['Newcastle'], teams['Liverpool'])
-    play_game(teams['West Ham'], teams['Aston Villa'])
-    play_game(teams['Manchester City'], teams['Norwich'])
-    play_game(teams['Arsenal'], teams['Watford'])
-    play_game(teams['Southampton'], teams['Sheffield'])
-    play_game(teams['Everton'], teams['Bournemouth'])
-
-
-def save_data(file: str, data: Union[Dict[str, Club], int]) -> None:
-    """
-    Function that saves the data to pickle file
-    :param file: file name
-    :param data: dictionary to save
+
+def play_all_games(teams: Dict[str, Club], fixtures: List[tuple]) -> None:
     """
-    with open(file, 'wb') as handle:
-        pickle.dump(data, handle, protocol=pickle.HIGHEST_PROTOCOL)
+    Function that plays all games of the one league. Fixtures are read from the fixtures file only once (with
+    schedule.read_fixtures, more info about the file in schedule.py) and the same list is used for every season
+    :param teams: dictionary of teams
+    :param fixtures: list of tuples (matchday, home club name, away club name) in the order they are played
+    """
+    table = probability_table()
+    for _, home, away in fixtures:
+        play_game(teams[home], teams[away], table)
+
+
+def current_season(file: str = FIXTURES_FILE, results_file: str = RESULTS_FILE) -> league.League:
+    """
+    Function that prepares the season of this league (clubs_in_league and CONSTANTS) for the batch engine. If some
+    games were already played, their results are added to the copy of the clubs (so elo is the current one) and they
+    are put before the remaining games in the fixtures, so the engine simulates only the remaining games (more info in
+    engine.SeasonBatch). Other leagues are read from their config files (more info in league.py)
+    :param file: fixtures file
+    :param results_file: file with the results of the played games (None if the season didn't start yet)
+    :return: league with the current elo, fixtures (played games first) and the results of the played games
+    """
+    teams = copy.deepcopy(clubs_in_league)
+    results = schedule.read_results(results_file) if results_file else []
+    apply_results(teams, results)
+    return season_from_clubs(teams, results, schedule.remaining_games(schedule.read_fixtures(file), results))
+
+
+def season_from_clubs(teams: Dict[str, Club], results: List[tuple], remaining: List[tuple]) -> league.League:
+    """
+    Function that makes the league for the batch engine from the clubs that already have the played results (used by
+    current_season and by the service that adds the results one by one, more info in service.py)
+    :param teams: dictionary of teams with the results of the played games
+    :param results: results of the played games (schedule.read_results) in the order they were played
+    :param remaining: remaining games (schedule.remaining_games)
+    :return: league with the current elo, fixtures (played games first) and the results of the played games
+    """
+    clubs = engine.ClubTable(teams.values())
+    games = [(matchday, home, away) for matchday, home, away, _, _ in results] + list(remaining)
+    fixtures = schedule.index_fixtures(games, clubs.names)[0]
+    return league.League(LEAGUE_CONFIG['name'], CONSTANTS, clubs, fixtures, league.played_array(results), TIE_BREAKERS,
+                         LEAGUE_CONFIG.get('relegation_places', 3), CHECKPOINT_FILE)
+
+
+class LegacyUnpickler(pickle.Unpickler):
+    """
+    Unpickler for data1.pickle, Club objects in it were saved when this file was run as the script (module __main__),
+    so this finds the Club class even when the file is imported
+    """
+    def find_class(self, module: str, name: str):
+        if module == '__main__' and name == 'Club':
+            return Club
+        return super().find_class(module, name)
 
 
 def load_data(file: str) -> Dict[str, Club]:
     """
-    Function that loads the data about previously calculates standings
+    Function that loads the data about previously calculates standings (old data1.pickle/data2.pickle files, new
+    results are saved with checkpoint.py)
     :param file: file name
     :return: dictionary that contains the data about teams
     """
-    with open(file, 'rb') as handle:
-        return pickle.load(handle)
+    with open(file, 'rb') as handle, metrics.stage('pickle'):
+        return LegacyUnpickler(handle).load()
 
 
 """
-Dictionary used to store all clubs in the league, for each league you have to manually write that information
+Dictionary used to store all clubs in the league, they are the clubs of LEAGUE_FILE. For each league you have to
+manually write that information in the file (or fit it from the results of the previous seasons, python cli.py fit,
+more info in history.py)
 
 Info: Name, ELO at the start of the league, Home goals scored, Home goals received, Away goals scored and
-Away goals received (all of that last season last season)
-"""
-clubs_in_league = {}
-clubs_in_league['Liverpool'] = Club('Liverpool', 2043, 55, 10, 34, 12)
-clubs_in_league['Manchester City'] = Club('Manchester City', 2037, 57, 12, 38, 11)
-clubs_in_league['Tottenham'] = Club('Tottenham', 1891, 34, 16, 33, 23)
-clubs_in_league['Chelsea'] = Club('Chelsea', 1883, 39, 12, 24, 27)
-clubs_in_league['Arsenal'] = Club('Arsenal', 1866, 42, 16, 31, 35)
-clubs_in_league['Manchester United'] = Club('Manchester United', 1838, 33, 25, 32, 29)
-clubs_in_league['Everton'] = Club('Everton', 1769, 30, 21, 24, 25)
-clubs_in_league['Crystal Palace'] = Club('Crystal Palace', 1742, 19, 23, 32, 30)
-clubs_in_league['Leicester'] = Club('Leicester', 1738, 24, 20, 27, 28)
-clubs_in_league['West Ham'] = Club('West Ham', 1729, 32, 27, 20, 28)
-clubs_in_league['Wolverhampton'] = Club('Wolverhampton', 1719, 28, 21, 19, 25)
-clubs_in_league['Newcastle'] = Club('Newcastle', 1715, 24, 25, 18, 23)
-clubs_in_league['Bournemouth'] = Club('Bournemouth', 1690, 30, 25, 26, 45)
-clubs_in_league['Watford'] = Club('Watford', 1685, 26, 28, 26, 31)
-clubs_in_league['Burnley'] = Club('Burnley', 1681, 24, 32, 21, 36)
-clubs_in_league['Southampton'] = Club('Southampton', 1673, 27, 30, 18, 35)
-clubs_in_league['Brighton'] = Club('Brighton', 1616, 19, 28, 16, 32)
-# this clubs didn't play in Premier League so I took goals of teams that were relegated and added 3 to scored goals
-# if elo difference was > 20
-clubs_in_league['Norwich'] = Club('Norwich', 1631, 23, 38, 16, 31)
-clubs_in_league['Sheffield'] = Club('Sheffield', 1619, 25, 36, 15, 45)
-clubs_in_league['Aston Villa'] = Club('Aston Villa', 1612, 18, 31, 15, 45)
-
-
-def main() -> None:
-    """
-    Main function of the program. First it make all variables needed for it to run, then it loads the previous results
-    if there are any, than program starts the calculations, saves calculations on disc and calculate remaining time.
-    Once the program is done it prints out the results and user can write anyting to close the program
+Away goals received (all of that last season last season). Norwich, Sheffield and Aston Villa didn't play in Premier
+League, so I took goals of teams that were relegated and added 3 to scored goals if elo difference was > 20
+"""
+clubs_in_league = {club['name']: Club(club['name'], club['elo'], *club['goals']) for club in LEAGUE_CONFIG['clubs']}
+
+
+def run_fingerprint(season: league.League, static: bool = False) -> str:
     """
-    teams = copy.deepcopy(clubs_in_league)
-    standings_all = StandingsFull(name='Premier League', clubs=teams)
-    standings_all.standing_calculated = 0
-    if os.path.isfile('data1.pickle') and os.path.isfile('data2.pickle'):
-        standings_all.standing_calculated = load_data('data2.pickle')
-        standings_all.clubs = load_data('data1.pickle')
+    Function that calculates the fingerprint of everything that changes the results, results are continued only if
+    they were calculated with the same fingerprint (so after the new matchday is played, calculations start again)
+    :param season: league with all inputs of the calculations
+    :param static: results are calculated with the static ratings (STATIC_RATINGS)
+    :return: fingerprint
+    """
+    # batch size and the number of workers don't change the results (every season has its own random numbers), task
+    # size does, because the number of the first season of the next task is next_task * task_size
+    return season.fingerprint({'use_table': USE_TABLES and not static, 'task_size': parallel.TASK_SIZE,
+                               'random': 'philox', 'static': static})
+
+
+def load_results(season: league.League, file: str = None, seed: int = None,
+                 static: bool = False) -> checkpoint.Checkpoint:
+    """
+    Function that loads the previous results. If there is no checkpoint file, but there are old pickle files of this
+    league, they are converted (they don't have the random state, so the run continues with the new seed and they are
+    used only without the seed, and they were calculated before the season with the clubs and constants of
+    LEGACY_INPUTS, so they are used only for exactly these inputs). Checkpoint file of the newer version raises
+    ValueError
+    :param season: league with all inputs of the calculations
+    :param file: checkpoint file (checkpoint file of the league if it isn't given)
+    :param seed: seed of the new results (random seed if it isn't given)
+    :param static: results are calculated with the static ratings (old pickle files aren't)
+    :return: loaded checkpoint, or the new one with no seasons
+    """
+    state = checkpoint.load_checkpoint(file or season.checkpoint_file)
+    if state is not None:
+        return state
+    names = season.clubs.names
+    totals = engine.SeasonTotals(len(names))
+    if (seed is None and not static and season.fingerprint({}) == LEGACY_INPUTS and os.path.isfile('data1.pickle') and
+            os.path.isfile('data2.pickle')):
+        old_clubs = load_data('data1.pickle')
+        if set(old_clubs) == set(names):
+            for i, name in enumerate(names):
+                for attribute in engine.STAT_ATTRIBUTES + ('placings',):
+                    getattr(totals, attribute)[i] = getattr(old_clubs[name], attribute)
+            totals.n_seasons = load_data('data2.pickle')
+    return checkpoint.Checkpoint(totals, np.random.SeedSequence(seed).entropy, 0, run_fingerprint(season, static))
+
+
+def results_standings(totals: engine.SeasonTotals, season: league.League) -> StandingsFull:
+    """
+    Function that makes the full standings with the averages of the results (from the arrays of export.py, standings
+    are only the text renderer of them)
+    :param totals: sums of all calculated seasons
+    :param season: league the totals belong to
+    :return: sorted standings with averages
+    """
+    with metrics.stage('standings'):
+        arrays = export.forecast_arrays(totals, season)
+        clubs = {}
+        for i, (name, goals) in enumerate(zip(season.clubs.names, season.clubs.goals.tolist())):
+            club = Club(name, 0, *goals)
+            club.games = season.constants['games']
+            for attribute in engine.STAT_ATTRIBUTES:
+                setattr(club, attribute, float(arrays[attribute][i]))
+            club.placings = arrays['placing_counts'][i].tolist()
+            clubs[name] = club
+        standings_all = StandingsFull(name=season.name, clubs=clubs)
+        standings_all.standing_calculated = totals.n_seasons
+    with metrics.stage('sort_standings'):
+        standings_all.sort_standings()
+    return standings_all
+
+
+def save_results(state: checkpoint.Checkpoint, file: str = CHECKPOINT_FILE) -> float:
+    """
+    Function that saves the results
+    :param state: checkpoint to save
+    :param file: checkpoint file
+    :return: how long saving took (in seconds)
+    """
+    with metrics.stage('checkpoint'):
+        start = time.perf_counter()
+        checkpoint.save_checkpoint(file, state)
+        return time.perf_counter() - start
+
+
+def progress_record(totals: engine.SeasonTotals, calculated: int, elapsed: float, needed: float,
+                    rule: convergence.StoppingRule, checkpoint_seconds: float) -> Dict:
+    """
+    Function that makes the record about the progress of the calculations for the METRICS_FILE
+    :param totals: sums of all calculated seasons
+    :param calculated: number of seasons calculated in this run
+    :param elapsed: time since the start of this run (in seconds)
+    :param needed: estimated number of seasons needed
+    :param rule: stopping rule of the run
+    :param checkpoint_seconds: how long the last saving took (None if results weren't saved yet)
+    :return: dictionary with the progress and the stages (if PROFILE is True)
+    """
+    speed = calculated / elapsed if elapsed > 0 else 0.0
+    record = {'seasons': totals.n_seasons, 'calculated': calculated, 'seasons_per_second': speed,
+              'estimated_seasons': needed, 'remaining_seconds': (needed - totals.n_seasons) / speed if speed else None,
+              'error_ratio': rule.worst_ratio(totals), 'checkpoint_seconds': checkpoint_seconds}
+    if metrics.collector is not None:
+        record.update(metrics.collector.as_dict())
+    return record
+
+
+def simulate(workers: int = 1, max_seasons: int = MAX, seed: int = None, fixtures_file: str = FIXTURES_FILE,
+             results_file: str = RESULTS_FILE, checkpoint_file: str = None, tolerance: float = TOLERANCE,
+             metrics_file: str = METRICS_FILE, profile: bool = PROFILE, progress: Callable[[Dict], None] = None,
+             season: league.League = None, pool: Executor = None, static: bool = STATIC_RATINGS,
+             store_seasons: bool = STORE_SEASONS, result_cache: cache.ResultCache = None) -> tuple:
+    """
+    Function that does the calculations without printing anything or waiting for the user (main() and cli.py use it).
+    It loads the previous results if there are any, calculates the seasons (with the batch engine, on more processes if
+    workers > 1) until the results are within tolerance (or after max_seasons seasons), saves them on disc (every
+    CHECKPOINT_INTERVAL seconds and at the end) and writes the metrics to metrics_file (more info in metrics.py)
+    :param workers: number of processes used for calculations
+    :param max_seasons: max number of seasons (together with the previous results)
+    :param seed: seed of the random numbers, it is used only for the new results (random seed if it isn't given)
+    :param fixtures_file: file with all games of the league (only if season isn't given)
+    :param results_file: file with the results of the played games (only if season isn't given)
+    :param checkpoint_file: file where the results are saved (checkpoint file of the league if it isn't given)
+    :param tolerance: tolerance of the title and relegation odds (more info in convergence.py)
+    :param metrics_file: file for the JSON lines metrics (None if they aren't written)
+    :param profile: measure the stages of the calculations
+    :param progress: function that gets the progress record (same as in the metrics file) after every task
+    :param season: league to calculate (league from clubs_in_league and CONSTANTS if it isn't given)
+    :param pool: pool of the processes from parallel.make_pool shared with other runs (new one is made if it isn't
+                 given and workers > 1)
+    :param static: elo doesn't change during the season (more info in STATIC_RATINGS)
+    :param store_seasons: write every season to the store file (more info in STORE_SEASONS)
+    :param result_cache: cache of the results, the checkpoint file is its entry of the inputs and the seed (instead of
+                         the checkpoint_file) and old entries are removed after every saving (more info in cache.py)
+    :return: tuple (engine.SeasonTotals with all seasons, names of the clubs in the same order, full standings)
+    """
+    if season is None:
+        season = current_season(fixtures_file, results_file)
+    checkpoint_file = checkpoint_file or season.checkpoint_file
+    key = None
+    if result_cache is not None:
+        key = cache.cache_key(run_fingerprint(season, static), seed)
+        checkpoint_file = result_cache.file(key)
+    state = load_results(season, checkpoint_file, seed, static)
+    if state.fingerprint != run_fingerprint(season, static):
+        raise ValueError('{} was calculated with different clubs, fixtures, results or constants, move it somewhere '
+                         'else to start new calculations'.format(checkpoint_file))
+    if seed is not None and state.entropy != seed:
+        raise ValueError('{} was calculated with the seed {}, not {}'.format(checkpoint_file, state.entropy, seed))
+    clubs, totals = season.clubs, state.totals
+    season_store = None
+    if store_seasons:
+        season_store = store.SeasonStore.open_run(store.store_file(checkpoint_file), clubs.names,
+                                                  season.fixtures[len(season.played):].tolist(), state.fingerprint,
+                                                  state.entropy, state.next_task * parallel.TASK_SIZE)
+    rule = convergence.StoppingRule(tolerance, season.events, AVERAGE_TOLERANCE)
+    log = metrics.MetricsLog(metrics_file) if metrics_file else None
+    metrics.collector = metrics.Collector() if profile else None
     start_time = time.time_ns()
-    while standings_all.standing_calculated < MAX:
-        teams = copy.deepcopy(clubs_in_league)
-        standings = Standings(name='Premier League', clubs=teams)
-        play_all_games(standings.clubs)
-        standings.sort_standings()
-        for j in range(20):
-            standings_all.clubs[list(standings.clubs.keys())[j]].placings[j] += 1
-        standings_all.include(standings)
-        if not standings_all.standing_calculated % 1000:
-            save_data('data1.pickle', standings_all.clubs)
-            save_data('data2.pickle', standings_all.standing_calculated)
-            end_time = time.time_ns()
-            remaining_time = (MAX - standings_all.standing_calculated) * (end_time - start_time) / (10 ** 12)
-            print('Calculated {} outcomes. ({:9.4%} of total number).'.format(standings_all.standing_calculated,
-                                                                              (standings_all.standing_calculated/MAX)),
-                  end=' ')
-            m, s = divmod(remaining_time, 60)
-            h, m = divmod(m, 60)
-            print("Estimated remaining time: ({:02d} hours, {:02d} minutes, {:02d} seconds)".format(int(h), int(m),
-                                                                                                    int(s)))
-            start_time = time.time_ns()
-    save_data('data1.pickle', standings_all.clubs)
-    save_data('data2.pickle', standings_all.standing_calculated)
-    standings_all.sort_standings()
-    standings_all.get_average()
-    os.system('cls')
+    save_time = log_time = time.time()
+    checkpoint_seconds = None
+    calculated = 0
+    remaining = 0 if rule.converged(totals) else max(max_seasons - totals.n_seasons, 0)
+    try:
+        for task_totals in parallel.run(clubs.elo, clubs.goals, season.fixtures, remaining, season.constants, workers,
+                                        state.entropy, state.next_task, batch_size=BATCH_SIZE, use_table=USE_TABLES,
+                                        tie_breakers=season.tie_breakers, played=season.played, profile=profile,
+                                        pool=pool, static=static, use_kernel=USE_KERNEL, keep_rows=store_seasons):
+            totals.merge(task_totals)
+            if season_store is not None:
+                # rows are written before the checkpoint, seasons that aren't in it yet are removed by open_run if the
+                # run stops before the next save
+                with metrics.stage('store'):
+                    season_store.append(np.concatenate(task_totals.rows))
+            if task_totals.profile is not None:
+                metrics.collector.merge(task_totals.profile)
+            state.next_task += 1
+            calculated += task_totals.n_seasons
+            if rule.converged(totals):
+                break
+            if time.time() - save_time >= CHECKPOINT_INTERVAL:
+                checkpoint_seconds = save_results(state, checkpoint_file)
+                if result_cache is not None:
+                    result_cache.evict(key)
+                save_time = time.time()
+            record = dict(progress_record(totals, calculated, (time.time_ns() - start_time) / 10 ** 9,
+                                          min(rule.seasons_needed(totals), max_seasons), rule, checkpoint_seconds),
+                          league=season.name)
+            if progress is not None:
+                progress(record)
+            if log is not None and time.time() - log_time >= METRICS_INTERVAL:
+                log.write(record)
+                log_time = time.time()
+        checkpoint_seconds = save_results(state, checkpoint_file)
+        if result_cache is not None:
+            result_cache.evict(key)
+        standings_all = results_standings(totals, season)
+        if log is not None:
+            log.write(dict(progress_record(totals, calculated, (time.time_ns() - start_time) / 10 ** 9,
+                                           totals.n_seasons, rule, checkpoint_seconds), league=season.name, done=True))
+    finally:
+        if log is not None:
+            log.close()
+        metrics.collector = None
+    return totals, clubs.names, standings_all
+
+
+def simulate_leagues(seasons: List[league.League], workers: int = 1, max_seasons: int = MAX, seed: int = None,
+                     tolerance: float = TOLERANCE, metrics_file: str = METRICS_FILE, profile: bool = PROFILE,
+                     progress: Callable[[Dict], None] = None, static: bool = STATIC_RATINGS,
+                     store_seasons: bool = STORE_SEASONS, result_cache: cache.ResultCache = None) -> List[tuple]:
+    """
+    Function that calculates more leagues one after another on the same pool of processes, so the processes are
+    started only once and they keep the probability tables between the leagues (every league has its own checkpoint
+    file, more info in league.py)
+    :param seasons: leagues to calculate
+    :param workers: number of processes used for calculations
+    :param max_seasons: max number of seasons of every league
+    :param seed: seed of the random numbers of every league (only for the new results)
+    :param tolerance: tolerance of the title and relegation odds
+    :param metrics_file: file for the JSON lines metrics (records have the name of the league)
+    :param profile: measure the stages of the calculations
+    :param progress: function that gets the progress records
+    :param static: elo doesn't change during the season (more info in STATIC_RATINGS)
+    :param store_seasons: write every season to the store file of the league (more info in STORE_SEASONS)
+    :param result_cache: cache of the results of all leagues (checkpoint files of the leagues aren't used then)
+    :return: list of tuples from simulate in the same order as the leagues
+    """
+    pool = parallel.make_pool(workers)
+    try:
+        return [simulate(workers, max_seasons, seed, checkpoint_file=season.checkpoint_file, tolerance=tolerance,
+                         metrics_file=metrics_file, profile=profile, progress=progress, season=season, pool=pool,
+                         static=static, store_seasons=store_seasons, result_cache=result_cache)
+                for season in seasons]
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def replay_season(season: league.League, entropy: int, number: int, static: bool = STATIC_RATINGS) -> tuple:
+    """
+    Function that calculates one season of the run again with the same random numbers (more info in engine.py), so the
+    odd results (for example relegated top six club) can be looked at game by game without calculating the whole run
+    :param season: league of the run
+    :param entropy: seed of the run (entropy in the checkpoint file)
+    :param number: number of the season in the run (counted from 0)
+    :param static: run was calculated with the static ratings
+    :return: tuple (list of games, engine.SeasonTotals of this one season), every game is the tuple (home, away, home
+             goals, away goals, home elo, away elo), elo is the elo before the game (None for the played games)
+    """
+    clubs, fixtures, n_played = season.clubs, season.fixtures, len(season.played)
+    key = engine.season_key(entropy)
+    table = tables.get_table(season.constants) if USE_TABLES and not static else None
+    batch = engine.SeasonBatch(fixtures, len(clubs), 1, season.played)
+    elo_before = np.tile(clubs.elo, (len(fixtures), 1))
+    if not static:
+        # elo before the round is the elo after the rounds before it, numbers of every game are always the same, so
+        # playing only the first rounds gives the same results of those rounds
+        rounds = engine.group_rounds(fixtures, n_played)
+        sampler = engine.ScorelineSampler(*engine.poisson_averages(fixtures, clubs.goals, season.constants))
+        for number_of_rounds, games in enumerate(rounds):
+            engine.simulate_seasons(clubs.elo, clubs.goals, fixtures, 1, season.constants, key,
+                                    rounds[:number_of_rounds], sampler, table, batch, first_season=number)
+            elo_before[games] = batch.elo[0]
+    engine.simulate_seasons(clubs.elo, clubs.goals, fixtures, 1, season.constants, key, table=table, batch=batch,
+                            static=static, first_season=number)
+    games = []
+    for i, (home, away) in enumerate(fixtures.tolist()):
+        elo = (None, None) if i < n_played else (float(elo_before[i, home]), float(elo_before[i, away]))
+        games.append((clubs.names[home], clubs.names[away], int(batch.home_scored[0, i]),
+                      int(batch.away_scored[0, i])) + elo)
+    totals = engine.SeasonTotals(len(clubs))
+    totals.add_batch(batch, season.tie_breakers)
+    return games, totals
+
+
+def print_progress(record: Dict) -> None:
+    """
+    Function that prints the progress of the calculations and the remaining time
+    :param record: progress record from progress_record
+    """
+    print('Calculated {} outcomes. ({:9.4%} of estimated number, biggest error is {:.2f} times the tolerance).'
+          .format(record['seasons'], record['seasons'] / record['estimated_seasons'], record['error_ratio']), end=' ')
+    m, s = divmod(record['remaining_seconds'] or 0, 60)
+    h, m = divmod(m, 60)
+    print("Estimated remaining time: ({:02d} hours, {:02d} minutes, {:02d} seconds)".format(int(h), int(m), int(s)))
+
+
+def result_cache() -> cache.ResultCache:
+    """
+    Function that opens the cache of the results of main() and print_results()
+    :return: cache in RESULT_CACHE (None if it isn't used)
+    """
+    return None if RESULT_CACHE is None else cache.ResultCache(RESULT_CACHE, CACHE_BUDGET)
+
+
+def main(workers: int = 1) -> None:
+    """
+    Main function of the program. It sets the size of the screen, runs the calculations (more info in simulate) and
+    prints the remaining time (or writes it to METRICS_FILE). Once the program is done it prints out the results and
+    user can write anyting to close the program (for the calculations without the user use simulate or cli.py).
+    Results of the same inputs are taken from RESULT_CACHE (if it is used), so they are calculated only once
+    :param workers: number of processes used for calculations
+    """
+    resize_screen()
+    _, _, standings_all = simulate(workers, MAX, None, FIXTURES_FILE, RESULTS_FILE, CHECKPOINT_FILE, TOLERANCE,
+                                   METRICS_FILE, PROFILE, None if METRICS_FILE else print_progress,
+                                   static=STATIC_RATINGS, result_cache=result_cache())
+    clear_screen()
     print(standings_all)
     input()
 
 
 def print_results():
     """
-    Function used only for printing the result of calculations
+    Function used only for printing the result of calculations (the ones main() calculated with the current inputs)
     """
-    teams = copy.deepcopy(clubs_in_league)
-    standings_all = StandingsFull(name='Premier League', clubs=teams)
-    standings_all.standing_calculated = 0
-    if os.path.isfile('data1.pickle') and os.path.isfile('data2.pickle'):
-        standings_all.standing_calculated = load_data('data2.pickle')
-        standings_all.clubs = load_data('data1.pickle')
-    standings_all.sort_standings()
-    standings_all.get_average()
+    resize_screen()
+    season = current_season(FIXTURES_FILE, RESULTS_FILE)
+    results = result_cache()
+    file = CHECKPOINT_FILE if results is None else results.file(cache.cache_key(run_fingerprint(season,
+                                                                                                  STATIC_RATINGS)))
+    state = load_results(season, file, static=STATIC_RATINGS)
+    if state.fingerprint != run_fingerprint(season, STATIC_RATINGS):
+        print('Results in {} were calculated with different clubs, fixtures, results or constants'.format(file))
+        input()
+        return
+    if not state.totals.n_seasons:
+        print('There are no results of the current clubs, fixtures, results and constants yet, run main() first')
+        input()
+        return
+    standings_all = results_standings(state.totals, season)
     print(standings_all)
     # print(standings_all.percentages())
     input()
@@ -871,4 +926,11 @@ def print_results():
 
 if __name__ == '__main__':
     """ Use main() if you want to start calculations, otherwise use print_results() """
-    print_results()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=0,
+                        help='start the calculations on this number of processes (only print results if not given)')
+    arguments = parser.parse_args()
+    if arguments.workers:
+        main(arguments.workers)
+    else:
+        print_results()
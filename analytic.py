@@ -0,0 +1,171 @@
+"""
+Exact results without Monte Carlo for the frozen ratings. If elo doesn't change during the season, every game is
+independent of the others, so the probabilities of 1/X/2 (calculate_probabilities) and the distribution of the goals
+for every outcome (the same tables ScorelineSampler uses) give the exact expected points, wins, draws, losses and goals
+of every club. The distribution of the points of the club is the convolution of the distributions of its games
+({0, 1, 3} points with the probabilities of the outcomes), so it is also exact.
+
+Placings need the joint distribution of all clubs (clubs that play each other aren't independent), so they are only
+approximated: clubs are treated as independent and the club that has the same points is above or below with the same
+chance. It takes milliseconds, so it is good for the quick previews. With the Monte Carlo run that also has the frozen
+ratings (static mode of the engine or k_base == 0), the exact expected points are used as the control variate
+(controlled_placings), which makes the placing probabilities more precise with the same number of seasons.
+"""
+
+import numpy as np
+
+import engine
+import league
+
+"""
+Points the home and away club get for outcome codes 0 ('1'), 1 ('X') and 2 ('2')
+"""
+HOME_POINTS = (3, 1, 0)
+AWAY_POINTS = (0, 1, 3)
+
+
+class Forecast:
+    """
+    Class that holds the exact results of the season. Every attribute with the name from the Club class (points,
+    wins...) is the array of expected values with shape (n_clubs,), points_distribution[i, p] is the probability that
+    the club i finishes with p points and placings[i, j] is the (approximated) probability that the club i finishes on
+    the position j
+    """
+    def __init__(self, season: league.League) -> None:
+        self.season = season
+        n_clubs = len(season.clubs)
+        self.elo = season.clubs.elo.copy()
+        for attribute in engine.STAT_ATTRIBUTES[1:]:
+            setattr(self, attribute, np.zeros(n_clubs))
+        self.points_distribution = np.zeros((n_clubs, 1))
+        self.placings = np.zeros((n_clubs, n_clubs))
+
+
+def outcome_probabilities(season: league.League) -> np.ndarray:
+    """
+    Function that calculates the probabilities of the outcomes of all games (played games have probability 1 for their
+    real outcome)
+    :param season: league with the fixtures
+    :return: array with shape (n_fixtures, 3), columns are outcome codes
+    """
+    home, away = season.fixtures[:, 0], season.fixtures[:, 1]
+    difference_in_elo = season.clubs.elo[home] + season.constants['home_field_advantage'] - season.clubs.elo[away]
+    probabilities = np.stack(engine.match_probabilities(difference_in_elo, season.constants), axis=1)
+    n_played = len(season.played)
+    probabilities[:n_played] = 0
+    probabilities[np.arange(n_played), season.played[:, 0]] = 1
+    return probabilities
+
+
+def expected_goals(season: league.League) -> np.ndarray:
+    """
+    Function that calculates the expected goals of all games for every outcome (from the distribution add_goals draws
+    from, so the goals agree with the outcome). Played games have their real goals for every outcome
+    :param season: league with the fixtures
+    :return: array with shape (n_fixtures, 3, 2), last axis is (home goals, away goals)
+    """
+    cdf = engine.scoreline_cdf(*engine.poisson_averages(season.fixtures, season.clubs.goals, season.constants))
+    pmf = np.diff(cdf, axis=2, prepend=0)
+    home_goals, away_goals = np.divmod(np.arange(cdf.shape[2]), engine.MAX_GOALS + 1)
+    goals = np.stack((pmf @ home_goals, pmf @ away_goals), axis=2)
+    goals[:len(season.played)] = season.played[:, None, 1:]
+    return goals
+
+
+def points_distributions(season: league.League, probabilities: np.ndarray) -> np.ndarray:
+    """
+    Function that calculates the distribution of the points of every club (convolution of the distributions of its
+    games, one game at the time)
+    :param season: league with the fixtures
+    :param probabilities: array from outcome_probabilities
+    :return: array with shape (n_clubs, max points + 1)
+    """
+    n_clubs = len(season.clubs)
+    games = np.bincount(season.fixtures.ravel(), minlength=n_clubs)
+    distributions = np.zeros((n_clubs, 3 * games.max() + 1))
+    distributions[:, 0] = 1
+    for (home, away), probability in zip(season.fixtures.tolist(), probabilities):
+        for club, points in ((home, HOME_POINTS), (away, AWAY_POINTS)):
+            old = distributions[club].copy()
+            distributions[club] = 0
+            for outcome in range(3):
+                distributions[club, points[outcome]:] += probability[outcome] * old[:len(old) - points[outcome]]
+    return distributions
+
+
+def approximate_placings(distributions: np.ndarray) -> np.ndarray:
+    """
+    Function that approximates the placings from the distributions of the points (clubs are treated as independent,
+    club with the same points is above with the probability 0.5). For every club and every number of points the number
+    of the clubs above it has the Poisson binomial distribution, which is calculated one club at the time
+    :param distributions: array from points_distributions
+    :return: array with shape (n_clubs, n_clubs), placings[i, j] is the probability that the club i finishes j-th
+    """
+    n_clubs = len(distributions)
+    above = 1 - np.cumsum(distributions, axis=1) + 0.5 * distributions
+    placings = np.zeros((n_clubs, n_clubs))
+    for club in range(n_clubs):
+        # count[x, k] is the probability that k other clubs are above the club that has x points
+        count = np.zeros((distributions.shape[1], n_clubs))
+        count[:, 0] = 1
+        for other in range(n_clubs):
+            if other != club:
+                chance = above[other][:, None]
+                count[:, 1:] = count[:, 1:] * (1 - chance) + count[:, :-1] * chance
+                count[:, 0] *= 1 - chance[:, 0]
+        placings[club] = distributions[club] @ count
+    return placings
+
+
+def forecast(season: league.League) -> Forecast:
+    """
+    Function that calculates the exact results of the season with the frozen ratings
+    :param season: league with the clubs, fixtures and the played games
+    :return: forecast of the season
+    """
+    result = Forecast(season)
+    probabilities = outcome_probabilities(season)
+    goals = expected_goals(season)
+    home, away = season.fixtures[:, 0], season.fixtures[:, 1]
+    n_clubs = len(season.clubs)
+
+    def add(values: np.ndarray, clubs: np.ndarray) -> np.ndarray:
+        return np.bincount(clubs, weights=values, minlength=n_clubs)
+
+    result.wins = add(probabilities[:, 0], home) + add(probabilities[:, 2], away)
+    result.draws = add(probabilities[:, 1], home) + add(probabilities[:, 1], away)
+    result.losses = add(probabilities[:, 2], home) + add(probabilities[:, 0], away)
+    result.points = 3 * result.wins + result.draws
+    home_goals = (probabilities * goals[:, :, 0]).sum(axis=1)
+    away_goals = (probabilities * goals[:, :, 1]).sum(axis=1)
+    result.goals_scored = add(home_goals, home) + add(away_goals, away)
+    result.goals_received = add(away_goals, home) + add(home_goals, away)
+    result.points_distribution = points_distributions(season, probabilities)
+    result.placings = approximate_placings(result.points_distribution)
+    return result
+
+
+def controlled_placings(totals: engine.SeasonTotals, expected_points: np.ndarray) -> np.ndarray:
+    """
+    Function that improves the placing probabilities of the Monte Carlo run with the control variate. Points of the
+    club are correlated with its placings and their exact expected value is known, so the placing probabilities are
+    corrected by beta * (average points - expected points), where beta is the regression coefficient of the placing on
+    the points. It is right only if the Monte Carlo run had the same frozen ratings as the forecast (static mode or
+    k_base == 0). Correction can move the probability of the rare placing below 0 (or the sure one above 1), so they
+    are clipped to [0, 1] and every row is divided by its sum again
+    :param totals: sums of the Monte Carlo seasons
+    :param expected_points: points from forecast
+    :return: array with shape (n_clubs, n_clubs) with the corrected probabilities (rows sum to 1)
+    """
+    if totals.n_squared != totals.n_seasons or np.abs(totals.placing_points.sum(axis=1) - totals.points).max() > 0.5:
+        raise ValueError('Control variate needs totals where every season has squares and placing points')
+    n = totals.n_seasons
+    probability = totals.placings / n
+    mean = totals.points / n
+    variance = totals.squares[engine.STAT_ATTRIBUTES.index('points')] / n - mean ** 2
+    covariance = totals.placing_points / n - probability * mean[:, None]
+    beta = np.divide(covariance, variance[:, None], out=np.zeros_like(covariance), where=variance[:, None] > 0)
+    corrected = np.clip(probability - beta * (mean - expected_points)[:, None], 0, 1)
+    # every row had the sum 1 before clipping and clipping only raises the negative ones or lowers the one above 1 to
+    # 1, so the sum can't be 0
+    return corrected / corrected.sum(axis=1, keepdims=True)
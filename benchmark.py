@@ -0,0 +1,284 @@
+"""
+Benchmarks of the hot paths of the simulation. Every benchmark is run enough times to take a measurable time (with
+timeit, so the garbage collector doesn't change the numbers) and the best of a few repeats is kept, so one slow run
+because of the other programs on the PC doesn't count. Results are written as JSON, so the runs on different versions
+(or engines) can be compared:
+
+    python benchmark.py --output before.json
+    ... change the code ...
+    python benchmark.py --output after.json --compare before.json
+
+Comparison prints every benchmark that got slower than the threshold and exits with code 1 if there are any, so it can
+stop the deploy. Scalar functions from Main.py are measured in calls per second, batch engine and the parallel runner
+in seasons per second (the parallel numbers include the start of the processes, which is what main() pays too) and the
+elo replay of the historical results (history.py) in games per second.
+"""
+
+import argparse
+import copy
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+import numpy as np
+from typing import Callable, Dict, List, Sequence
+
+import Main
+import engine
+import history
+import kernel
+import parallel
+import schedule
+import tables
+
+"""
+Shape of the elo differences in the probability table benchmark (seasons of one batch, games of one round)
+"""
+ROUND_SHAPE = (1000, 10)
+
+"""
+Batch sizes and worker counts measured by default
+"""
+BATCH_SIZES = (100, 1000, 5000)
+WORKERS = (1, 2, 4)
+
+"""
+Number of seasons for the engine and parallel benchmarks (more seasons means less noise, but slower benchmark)
+"""
+SEASONS = 20000
+
+"""
+Number of seasons of the history in the elo replay benchmark
+"""
+HISTORY_SEASONS = 50
+
+"""
+Benchmark is a regression if it is slower than the baseline by more than this (0.1 == 10% slower)
+"""
+THRESHOLD = 0.1
+
+
+def measure(function: Callable, repeat: int = 5) -> Dict:
+    """
+    Function that measures how long one call of the function takes
+    :param function: function without parameters
+    :param repeat: number of measurements, the best one is used
+    :return: dictionary with the number of calls in one measurement, best and median time of one call (in seconds)
+    """
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    times = [time / number for time in timer.repeat(repeat, number)]
+    return {'calls': number, 'best': min(times), 'median': statistics.median(times)}
+
+
+def result(name: str, unit: str, timing: Dict, units_per_call: int = 1, **parameters) -> Dict:
+    """
+    Function that makes one row of the results
+    :param name: name of the benchmark
+    :param unit: what is counted (calls or seasons)
+    :param timing: dictionary from measure
+    :param units_per_call: how many units one call does (for example number of seasons)
+    :param parameters: parameters of the benchmark (batch size, workers...)
+    :return: dictionary with the name, parameters, time of one call and units per second
+    """
+    key = name + ''.join('[{}={}]'.format(parameter, value) for parameter, value in sorted(parameters.items()))
+    return {'key': key, 'name': name, 'parameters': parameters, 'unit': unit, 'seconds': timing['best'],
+            'median_seconds': timing['median'], 'per_second': units_per_call / timing['best']}
+
+
+def scalar_benchmarks(repeat: int) -> List[Dict]:
+    """
+    Function that measures the functions Main.py uses for one game/season (the ones that can use the probability
+    table are measured with and without it)
+    :param repeat: number of measurements of every function
+    :return: list of results
+    """
+    teams = copy.deepcopy(Main.clubs_in_league)
+    home, away = teams['Liverpool'], teams['Norwich']
+    standings = Main.Standings('Premier League', teams)
+    table = tables.get_table(Main.CONSTANTS)
+    benchmarks = {'add_goals': lambda: Main.add_goals(home, away, '1'),
+                  'play_game': lambda: Main.play_game(home, away),
+                  'sort_standings': standings.sort_standings}
+    results = [result(name, 'calls', measure(function, repeat)) for name, function in benchmarks.items()]
+    for use_table in (False, True):
+        used = table if use_table else None
+        results.append(result('calculate_probabilities', 'calls',
+                              measure(lambda: Main.calculate_probabilities(home, away, used), repeat),
+                              use_table=use_table))
+        results.append(result('elo_change', 'calls', measure(lambda: Main.elo_change(home, away, 1, used), repeat),
+                              use_table=use_table))
+    difference = np.random.default_rng(0).normal(Main.CONSTANTS['home_field_advantage'], 200, ROUND_SHAPE)
+    results.append(result('round_probabilities', 'games', measure(
+        lambda: (engine.match_probabilities(difference, Main.CONSTANTS),
+                 engine.expected_result(difference, Main.CONSTANTS)), repeat), difference.size, use_table=False))
+    results.append(result('round_probabilities', 'games', measure(lambda: table.lookup(difference), repeat),
+                          difference.size, use_table=True))
+    season = copy.deepcopy(Main.clubs_in_league)
+    fixtures = schedule.read_fixtures(Main.FIXTURES_FILE)
+    results.append(result('play_all_games', 'seasons', measure(lambda: Main.play_all_games(season, fixtures), repeat)))
+    return results
+
+
+def engine_benchmarks(batch_sizes: Sequence[int], seasons: int, repeat: int) -> List[Dict]:
+    """
+    Function that measures the batch engine in one process (parallel.simulate_totals, so ranking and adding up the
+    seasons are included), with the dynamic elo (with and without tables, with the compiled kernel if numba is
+    installed) and with the static ratings
+    :param batch_sizes: batch sizes to measure
+    :param seasons: number of seasons in one call
+    :param repeat: number of measurements
+    :return: list of results
+    """
+    season = Main.current_season()
+    results = []
+    for use_table in (False, True):
+        for batch_size in batch_sizes:
+            def run() -> None:
+                parallel.simulate_totals(season.clubs.elo, season.clubs.goals, season.fixtures, seasons,
+                                         season.constants, engine.season_key(0), batch_size, use_table,
+                                         season.tie_breakers, season.played)
+            results.append(result('simulate_totals', 'seasons', measure(run, repeat), seasons, batch_size=batch_size,
+                                  use_table=use_table))
+    for batch_size in batch_sizes:
+        def run_static() -> None:
+            parallel.simulate_totals(season.clubs.elo, season.clubs.goals, season.fixtures, seasons, season.constants,
+                                     engine.season_key(0), batch_size, tie_breakers=season.tie_breakers,
+                                     played=season.played, static=True)
+        results.append(result('simulate_totals', 'seasons', measure(run_static, repeat), seasons,
+                              batch_size=batch_size, static=True))
+    if kernel.AVAILABLE:
+        for batch_size in batch_sizes:
+            def run_kernel() -> None:
+                parallel.simulate_totals(season.clubs.elo, season.clubs.goals, season.fixtures, seasons,
+                                         season.constants, engine.season_key(0), batch_size,
+                                         tie_breakers=season.tie_breakers, played=season.played, use_kernel=True)
+            run_kernel()  # compiles the kernel (or loads it from the cache) before measuring
+            results.append(result('simulate_totals', 'seasons', measure(run_kernel, repeat), seasons,
+                                  batch_size=batch_size, kernel=True))
+    return results
+
+
+def history_benchmarks(seasons: int, repeat: int) -> List[Dict]:
+    """
+    Function that measures the elo replay over the historical results (random goals in the double round robin
+    seasons), with the numpy rounds and with the compiled loop if numba is installed
+    :param seasons: number of seasons of the history
+    :param repeat: number of measurements
+    :return: list of results
+    """
+    fixtures = np.tile(schedule.round_robin(Main.CONSTANTS['number_of_clubs'])[0], (seasons, 1))
+    generator = np.random.default_rng(0)
+    goal_difference = generator.poisson(1.5, len(fixtures)) - generator.poisson(1.2, len(fixtures))
+    results = []
+    for use_kernel in (False, True) if kernel.AVAILABLE else (False,):
+        def run() -> None:
+            elo = np.full(Main.CONSTANTS['number_of_clubs'], float(history.INITIAL_ELO))
+            history.replay_elo(elo, fixtures, goal_difference, Main.CONSTANTS, use_kernel)
+        run()  # compiles the kernel (or loads it from the cache) before measuring
+        results.append(result('replay_elo', 'games', measure(run, repeat), len(fixtures), kernel=use_kernel))
+    return results
+
+
+def parallel_benchmarks(workers: Sequence[int], seasons: int, repeat: int) -> List[Dict]:
+    """
+    Function that measures the whole run (the same thing main() does without saving and printing)
+    :param workers: worker counts to measure
+    :param seasons: number of seasons in one run
+    :param repeat: number of measurements
+    :return: list of results
+    """
+    season = Main.current_season()
+    task_size = max(seasons // (4 * max(workers)), 1)
+    results = []
+    for count in workers:
+        def run() -> None:
+            for _ in parallel.run(season.clubs.elo, season.clubs.goals, season.fixtures, seasons, season.constants,
+                                  count, 0, batch_size=Main.BATCH_SIZE, task_size=task_size,
+                                  use_table=Main.USE_TABLES, tie_breakers=season.tie_breakers, played=season.played,
+                                  use_kernel=Main.USE_KERNEL):
+                pass
+        results.append(result('run', 'seasons', measure(run, repeat), seasons, workers=count))
+    return results
+
+
+def environment() -> Dict:
+    """
+    Function that describes where the benchmark was run, numbers from different PCs shouldn't be compared
+    :return: dictionary with the versions, processor and git commit
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'python': platform.python_version(), 'numpy': np.__version__, 'platform': platform.platform(),
+            'processor': platform.processor(), 'cpu_count': os.cpu_count(), 'commit': commit,
+            'numba': kernel.version()}
+
+
+def compare(results: List[Dict], baseline: List[Dict], threshold: float = THRESHOLD) -> List[str]:
+    """
+    Function that compares the results with the results of the older run
+    :param results: new results
+    :param baseline: old results
+    :param threshold: allowed slowdown
+    :return: list of the lines that describe the regressions (empty if there aren't any)
+    """
+    old = {row['key']: row for row in baseline}
+    regressions = []
+    for row in results:
+        if row['key'] not in old:
+            continue
+        ratio = row['seconds'] / old[row['key']]['seconds']
+        print('{:<60} {:>14.1f} {}/s {:>+8.1%}'.format(row['key'], row['per_second'], row['unit'], ratio - 1))
+        if ratio > 1 + threshold:
+            regressions.append('{} is {:.1%} slower'.format(row['key'], ratio - 1))
+    return regressions
+
+
+def main(arguments: argparse.Namespace) -> int:
+    """
+    Function that runs the chosen benchmarks, saves them and compares them with the baseline
+    :param arguments: parsed command line arguments
+    :return: exit code (1 if there are regressions)
+    """
+    results = []
+    if 'scalar' in arguments.groups:
+        results += scalar_benchmarks(arguments.repeat)
+    if 'engine' in arguments.groups:
+        results += engine_benchmarks(arguments.batch_sizes, arguments.seasons, arguments.repeat)
+    if 'parallel' in arguments.groups:
+        results += parallel_benchmarks(arguments.workers, arguments.seasons, arguments.repeat)
+    if 'history' in arguments.groups:
+        results += history_benchmarks(HISTORY_SEASONS, arguments.repeat)
+    report = {'environment': environment(), 'results': results}
+    if arguments.output:
+        with open(arguments.output, 'w') as handle:
+            json.dump(report, handle, indent=2)
+    if not arguments.compare:
+        for row in results:
+            print('{:<60} {:>14.1f} {}/s'.format(row['key'], row['per_second'], row['unit']))
+        return 0
+    with open(arguments.compare) as handle:
+        regressions = compare(results, json.load(handle)['results'], arguments.threshold)
+    for line in regressions:
+        print('REGRESSION: ' + line)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmarks of the simulation')
+    parser.add_argument('--groups', nargs='+', default=['scalar', 'engine', 'parallel', 'history'],
+                        choices=['scalar', 'engine', 'parallel', 'history'], help='benchmarks to run')
+    parser.add_argument('--batch-sizes', nargs='+', type=int, default=BATCH_SIZES)
+    parser.add_argument('--workers', nargs='+', type=int, default=WORKERS)
+    parser.add_argument('--seasons', type=int, default=SEASONS, help='seasons in one engine/parallel call')
+    parser.add_argument('--repeat', type=int, default=5, help='measurements of every benchmark (best one is kept)')
+    parser.add_argument('--output', help='JSON file for the results')
+    parser.add_argument('--compare', help='JSON file with the results of the older run')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD, help='allowed slowdown (0.1 == 10%%)')
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,114 @@
+"""
+Content addressed cache of the results. Checkpoint file of the league holds the results of one set of inputs, so after
+the new matchday, the change of the constants or of the seed the old results were either thrown away or (with the old
+pickle files) merged with the new ones without any check. In the cache every set of inputs has its own entry, the
+name of the entry is the hash of all inputs of the run (run fingerprint from Main.run_fingerprint, which has the clubs,
+fixtures, played results, constants, tie breakers and the settings, and the seed):
+
+    cache/<key>.npz       checkpoint of the run (more info in checkpoint.py)
+    cache/<key>.seasons   store of the seasons, if the run writes it (more info in store.py and query.py)
+
+The run with the same inputs finds its entry: if the results are already within the tolerance they are returned at
+once, if not the run continues them (with the same random numbers, more info in parallel.py). The run with any other
+inputs gets the new entry, so it can never continue or mix the results of other inputs, and going back to the old
+inputs (for example the constants before the calibration) finds their results again. The run without the seed has its
+own entry (the seed of its results is the random one).
+
+Every use of the entry sets its time, and when all entries are bigger than the budget the ones that were not used the
+longest are removed (never the one of the current run).
+"""
+
+import glob
+import os
+import shutil
+from typing import List, Optional, Tuple
+
+import checkpoint
+
+"""
+Folder of the cache and the size of all entries (in bytes) after which the oldest ones are removed
+"""
+FOLDER = 'cache'
+BUDGET = 256 * 2 ** 20
+
+
+def cache_key(fingerprint: str, seed: Optional[int] = None) -> str:
+    """
+    Function that calculates the key of the entry
+    :param fingerprint: run fingerprint (Main.run_fingerprint)
+    :param seed: seed of the run (None if it is random)
+    :return: hexadecimal sha256 hash
+    """
+    return checkpoint.fingerprint((), {'run': fingerprint, 'seed': seed})
+
+
+class ResultCache:
+    """
+    Class that represents the folder of the cache, budget is the size of all entries in bytes
+    """
+    def __init__(self, folder: str = FOLDER, budget: int = BUDGET) -> None:
+        self.folder = folder
+        self.budget = budget
+
+    def file(self, key: str) -> str:
+        """
+        Method that makes the name of the checkpoint file of the entry (other files of the entry have the same name with
+        the other extension) and marks the entry as used
+        :param key: key from cache_key
+        :return: checkpoint file name
+        """
+        os.makedirs(self.folder, exist_ok=True)
+        file = os.path.join(self.folder, key + '.npz')
+        if os.path.isfile(file):
+            os.utime(file)
+        return file
+
+    def entries(self) -> List[Tuple[str, int, float]]:
+        """
+        Method that lists the entries of the cache
+        :return: list of tuples (key, size of all files of the entry in bytes, time of the last use), oldest first
+        """
+        entries = []
+        for file in glob.glob(os.path.join(self.folder, '*.npz')):
+            key = os.path.splitext(os.path.basename(file))[0]
+            try:
+                size = sum(entry_size(path) for path in glob.glob(os.path.join(self.folder, key + '.*')))
+                entries.append((key, size, os.path.getmtime(file)))
+            except OSError:
+                # entry was removed by another process in the meantime
+                continue
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def evict(self, keep: str = None) -> List[str]:
+        """
+        Method that removes the oldest entries until all entries are within the budget
+        :param keep: key of the entry that is never removed (the one of the current run)
+        :return: keys of the removed entries
+        """
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = []
+        for key, size, _ in entries:
+            if total <= self.budget:
+                break
+            if key == keep:
+                continue
+            for path in glob.glob(os.path.join(self.folder, key + '.*')):
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    os.remove(path)
+            total -= size
+            removed.append(key)
+        return removed
+
+
+def entry_size(path: str) -> int:
+    """
+    Function that calculates the size of one file of the entry (or of the folder, for example the index of the store)
+    :param path: file or folder name
+    :return: size in bytes
+    """
+    if not os.path.isdir(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(folder, name)) for folder, _, names in os.walk(path) for name in names)
@@ -0,0 +1,292 @@
+"""
+Calibration of the constants on the historical results (instead of setting them by hand from one season). Every set of
+constants is scored by how well the model would have predicted the games that were really played (backtest): elo is
+replayed over the history (history.replay_history) with these constants and every game gets
+
+    log_loss        -log of the probability calculate_probabilities gave to the real outcome
+    rps             ranked probability score of the 1/X/2 probabilities (outcomes are ordered, so the draw is a smaller
+                    mistake than the away win when the home club won)
+    goals_log_loss  -log of the probability add_goals gives to the real scoreline when the outcome is known
+    total_log_loss  log_loss + goals_log_loss, which is -log of the probability of the real scoreline
+
+Scores are the averages over the games after the first BURN_IN seasons (elo needs a few seasons to get from
+INITIAL_ELO to the real ratings, goals of the clubs are taken from the previous season). Lower is better for all of
+them.
+
+grid_search scores every combination of the given values and optimize does the compass search: it tries one step up
+and one step down in every parameter at the same time, moves to the best one and halves the steps when nothing is
+better. Candidates are scored in parallel (one task for every worker) and every score is written to the cache file
+(JSON lines, key is the fingerprint of the history and the constants), so the same candidate is never scored twice,
+not even in the next run.
+"""
+
+import json
+import os
+import numpy as np
+from concurrent.futures import Executor
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import checkpoint
+import engine
+import history
+import parallel
+
+"""
+Constants that are calibrated by default and the first steps of optimize
+"""
+PARAMETERS = ('home_field_advantage', 'k_base', 'lambda', 'draw_max', 'draw_variance', 'home_att', 'away_att')
+STEPS = {'home_field_advantage': 16, 'k_base': 4, 'lambda': 0.25, 'draw_max': 0.04, 'draw_variance': 50,
+         'home_att': 0.1, 'away_att': 0.1, 'c': 1, 'd': 50}
+
+"""
+Scores of the backtest and the one optimize and grid_search minimize by default
+"""
+SCORES = ('log_loss', 'rps', 'goals_log_loss', 'total_log_loss')
+OBJECTIVE = 'total_log_loss'
+
+"""
+Number of the first seasons of the history that aren't scored
+"""
+BURN_IN = 1
+
+"""
+optimize stops when the steps are this many times smaller than at the start
+"""
+MIN_SCALE = 1 / 64
+
+"""
+File with the scores that were already calculated
+"""
+CACHE_FILE = 'calibration.jsonl'
+
+
+class Backtest:
+    """
+    Class that holds everything the scoring needs that doesn't depend on the constants: the history, outcome code of
+    every game, goals of both clubs of every game (from the previous season, same columns as in engine.club_arrays, nan
+    in the first season) and the games that are scored
+    """
+    def __init__(self, results: history.History, number_of_games: int, burn_in: int = BURN_IN,
+                 initial_elo: float = history.INITIAL_ELO) -> None:
+        self.history = results
+        self.initial_elo = initial_elo
+        self.outcome = (1 - np.sign(results.goals[:, 0] - results.goals[:, 1])).astype(np.intp)
+        self.club_goals = np.full((len(results), 2, 4), np.nan)
+        elo = np.zeros(len(results.names))
+        for season in range(1, len(results.seasons)):
+            clubs = results.clubs(season)
+            goals = dict(zip(clubs, history.next_season(results, season - 1, [results.names[club] for club in clubs],
+                                                        elo, number_of_games)[1]))
+            fixtures = results.fixtures[results.seasons[season]]
+            self.club_goals[results.seasons[season]] = [(goals[home], goals[away]) for home, away in fixtures.tolist()]
+        self.scored = np.zeros(len(results), dtype=bool)
+        if burn_in < len(results.seasons):
+            self.scored[results.seasons[burn_in].start:] = True
+        self.fingerprint = checkpoint.fingerprint((results.fixtures, results.goals), {
+            'names': results.names, 'seasons': [(part.start, part.stop) for part in results.seasons],
+            'games': number_of_games, 'burn_in': burn_in, 'initial_elo': initial_elo})
+
+
+def scoreline_probabilities(home_average: np.ndarray, away_average: np.ndarray, home_goals: np.ndarray,
+                            away_goals: np.ndarray, outcome: np.ndarray) -> np.ndarray:
+    """
+    Function that calculates the probability add_goals gives to the scoreline when the outcome is known (same
+    distribution as engine.scoreline_cdf, without the tables of all scorelines)
+    :param home_average: expected home goals of every game
+    :param away_average: expected away goals of every game
+    :param home_goals: real home goals (more than MAX_GOALS are counted as MAX_GOALS)
+    :param away_goals: real away goals
+    :param outcome: outcome codes
+    :return: array of probabilities
+    """
+    home = engine.poisson_probabilities(home_average)
+    away = engine.poisson_probabilities(away_average)
+    rows = np.arange(len(home))
+    away_below = np.cumsum(away, axis=1) - away
+    home_win = (home * away_below).sum(axis=1)
+    draw = (home * away).sum(axis=1)
+    away_win = home.sum(axis=1) * away.sum(axis=1) - home_win - draw
+    region = np.stack((home_win, draw, away_win), axis=1)[rows, outcome]
+    home_goals = np.minimum(home_goals, engine.MAX_GOALS)
+    away_goals = np.minimum(away_goals, engine.MAX_GOALS)
+    return home[rows, home_goals] * away[rows, away_goals] / region
+
+
+def evaluate(backtest: Backtest, constants: Dict, use_kernel: bool = True) -> Dict[str, float]:
+    """
+    Function that scores the constants on the history
+    :param backtest: prepared history
+    :param constants: league constants
+    :param use_kernel: replay the elo with the compiled loop if numba is installed
+    :return: dictionary with the averages of SCORES and the number of scored games
+    """
+    ratings = np.zeros((len(backtest.history), 2))
+    history.replay_history(backtest.history, constants, backtest.initial_elo, use_kernel, ratings)
+    scored = np.flatnonzero(backtest.scored)
+    outcome = backtest.outcome[scored]
+    difference_in_elo = ratings[scored, 0] + constants['home_field_advantage'] - ratings[scored, 1]
+    probabilities = np.stack(engine.match_probabilities(difference_in_elo, constants), axis=1)
+    tiny = np.finfo(np.float64).tiny
+    log_loss = -np.log(np.maximum(probabilities[np.arange(len(scored)), outcome], tiny))
+    observed = np.zeros_like(probabilities)
+    observed[np.arange(len(scored)), outcome] = 1
+    rps = ((np.cumsum(probabilities, axis=1)[:, :2] - np.cumsum(observed, axis=1)[:, :2]) ** 2).sum(axis=1) / 2
+    # games of the clubs without goals from the previous season (first season) have only the outcome scores
+    with_goals = ~np.isnan(backtest.club_goals[scored]).any(axis=(1, 2))
+    games = scored[with_goals]
+    pairs = np.arange(2 * len(games)).reshape(-1, 2)
+    averages = engine.poisson_averages(pairs, backtest.club_goals[games].reshape(-1, 4), constants)
+    goals = backtest.history.goals[games]
+    goals_log_loss = -np.log(np.maximum(scoreline_probabilities(*averages, goals[:, 0], goals[:, 1],
+                                                                backtest.outcome[games]), tiny))
+    scores = {'log_loss': float(log_loss.mean()), 'rps': float(rps.mean()),
+              'goals_log_loss': float(goals_log_loss.mean()), 'games': len(scored)}
+    scores['total_log_loss'] = scores['log_loss'] + scores['goals_log_loss']
+    return scores
+
+
+def evaluate_all(backtest: Backtest, candidates: List[Dict]) -> List[Dict[str, float]]:
+    """
+    Function that scores more sets of constants (the task of one worker)
+    :param backtest: prepared history
+    :param candidates: list of constants
+    :return: list of scores in the same order
+    """
+    return [evaluate(backtest, constants) for constants in candidates]
+
+
+class Cache:
+    """
+    Class that holds the scores that were already calculated, they are also appended to the file (if it isn't None)
+    """
+    def __init__(self, file: Optional[str] = CACHE_FILE) -> None:
+        self.file = file
+        self.scores = {}
+        if file is not None and os.path.isfile(file):
+            with open(file, encoding='utf-8') as handle:
+                for line in handle:
+                    if line.strip():
+                        record = json.loads(line)
+                        self.scores[record['key']] = record['scores']
+
+    def key(self, backtest: Backtest, constants: Dict) -> str:
+        """
+        Method that calculates the key of the score
+        :param backtest: prepared history
+        :param constants: league constants
+        :return: fingerprint of the history and the constants
+        """
+        return checkpoint.fingerprint((), {'history': backtest.fingerprint, 'constants': constants})
+
+    def add(self, key: str, constants: Dict, scores: Dict[str, float]) -> None:
+        """
+        Method that adds the new score
+        :param key: key from the key method
+        :param constants: league constants
+        :param scores: scores from evaluate
+        """
+        self.scores[key] = scores
+        if self.file is not None:
+            with open(self.file, 'a', encoding='utf-8') as handle:
+                handle.write(json.dumps({'key': key, 'constants': constants, 'scores': scores}) + '\n')
+
+
+def score(backtest: Backtest, candidates: List[Dict], cache: Cache, pool: Executor = None,
+          workers: int = 1) -> List[Dict[str, float]]:
+    """
+    Function that scores the candidates, the ones that aren't in the cache are split between the workers
+    :param backtest: prepared history
+    :param candidates: list of constants
+    :param cache: cache of the scores
+    :param pool: pool of the processes (everything is calculated in this process if it is None)
+    :param workers: number of processes in the pool
+    :return: list of scores in the same order as the candidates
+    """
+    keys = [cache.key(backtest, constants) for constants in candidates]
+    missing = list({key: constants for key, constants in zip(keys, candidates) if key not in cache.scores}.items())
+    if pool is None or len(missing) < 2:
+        results = evaluate_all(backtest, [constants for _, constants in missing])
+    else:
+        chunks = [missing[i::workers] for i in range(workers)]
+        tasks = [pool.submit(evaluate_all, backtest, [constants for _, constants in chunk]) for chunk in chunks]
+        order = [item for chunk in chunks for item in chunk]
+        missing, results = order, [scores for task in tasks for scores in task.result()]
+    for (key, constants), scores in zip(missing, results):
+        cache.add(key, constants, scores)
+    return [cache.scores[key] for key in keys]
+
+
+def valid(constants: Dict) -> bool:
+    """
+    Function that checks if the constants can be used (all calibrated constants are positive, draw_max is less than 1)
+    :param constants: league constants
+    :return: True if they are valid
+    """
+    return all(constants[name] > 0 for name in STEPS if name in constants) and constants['draw_max'] < 1
+
+
+def grid_search(backtest: Backtest, constants: Dict, grid: Dict[str, Sequence[float]], objective: str = OBJECTIVE,
+                workers: int = 1, cache: Cache = None) -> List[Tuple[Dict, Dict[str, float]]]:
+    """
+    Function that scores every combination of the values of the grid
+    :param backtest: prepared history
+    :param constants: league constants (values of the parameters that aren't in the grid)
+    :param grid: dictionary parameter: list of values
+    :param objective: score that is used for sorting
+    :param workers: number of processes
+    :param cache: cache of the scores (no cache file if it is None)
+    :return: list of tuples (constants, scores) sorted from the best
+    """
+    cache = Cache(None) if cache is None else cache
+    candidates = [dict(constants)]
+    for name, values in grid.items():
+        candidates = [dict(candidate, **{name: round(float(value), 6)}) for candidate in candidates for value in values]
+    candidates = [candidate for candidate in candidates if valid(candidate)]
+    pool = parallel.make_pool(workers)
+    try:
+        results = score(backtest, candidates, cache, pool, workers)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return sorted(zip(candidates, results), key=lambda item: item[1][objective])
+
+
+def optimize(backtest: Backtest, constants: Dict, parameters: Iterable[str] = PARAMETERS, objective: str = OBJECTIVE,
+             workers: int = 1, cache: Cache = None, steps: Dict[str, float] = None,
+             progress: Callable[[Dict, Dict[str, float], float], None] = None) -> Tuple[Dict, Dict[str, float]]:
+    """
+    Function that finds the best constants with the compass search
+    :param backtest: prepared history
+    :param constants: constants the search starts from
+    :param parameters: names of the constants that are changed
+    :param objective: score that is minimized
+    :param workers: number of processes
+    :param cache: cache of the scores (no cache file if it is None)
+    :param steps: first steps of the parameters (STEPS if it isn't given)
+    :param progress: function called after every iteration with the best constants, their scores and the scale of the
+                     steps
+    :return: tuple (best constants, their scores)
+    """
+    cache = Cache(None) if cache is None else cache
+    steps = dict(STEPS, **(steps or {}))
+    parameters = list(parameters)
+    pool = parallel.make_pool(workers)
+    try:
+        best = dict(constants)
+        best_scores = score(backtest, [best], cache)[0]
+        scale = 1.0
+        while scale >= MIN_SCALE:
+            candidates = [dict(best, **{name: round(best[name] + sign * steps[name] * scale, 6)})
+                          for name in parameters for sign in (1, -1)]
+            candidates = [candidate for candidate in candidates if valid(candidate)]
+            results = score(backtest, candidates, cache, pool, workers)
+            if results and min(result[objective] for result in results) < best_scores[objective]:
+                best, best_scores = min(zip(candidates, results), key=lambda item: item[1][objective])
+            else:
+                scale /= 2
+            if progress is not None:
+                progress(best, best_scores, scale)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return best, best_scores
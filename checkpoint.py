@@ -0,0 +1,108 @@
+"""
+Saving and loading of the calculations. Everything needed to continue the calculations is in one .npz file: sums of all
+seasons (SeasonTotals arrays), number of the seasons, state of the random numbers (seed of the run and the number of
+the next task, more info in parallel.py) and the fingerprint of the inputs. The file is first written to the temporary
+file in the same folder and then renamed, so the old file stays untouched if the program crashes while saving.
+Fingerprint is the hash of everything that changes the results (clubs, fixtures, constants...), so the results of
+different inputs are never mixed.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import numpy as np
+from typing import Dict, Optional, Sequence
+
+import engine
+
+"""
+Version of the file layout. Files with the newer version can't be read (load_checkpoint raises ValueError), files
+with the older version are loaded and the arrays they don't have stay empty (version 1 doesn't have squares, so their
+seasons don't count in n_squared, version 2 doesn't have placing_points)
+"""
+VERSION = 3
+
+
+class Checkpoint:
+    """
+    Class that represents the content of the checkpoint file
+    """
+    def __init__(self, totals: engine.SeasonTotals, entropy: int, next_task: int, fingerprint: str) -> None:
+        self.totals = totals
+        self.entropy = entropy
+        self.next_task = next_task
+        self.fingerprint = fingerprint
+
+
+def fingerprint(arrays: Sequence[np.ndarray], settings: Dict) -> str:
+    """
+    Function that calculates the hash of the inputs of the calculations
+    :param arrays: arrays that change the results (elo, goals, fixtures...)
+    :param settings: other things that change the results (constants, tie breakers...), it has to be JSON serializable
+    :return: hexadecimal sha256 hash
+    """
+    digest = hashlib.sha256()
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(str((array.dtype.str, array.shape)).encode())
+        digest.update(array.tobytes())
+    digest.update(json.dumps(settings, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def save_checkpoint(file: str, state: Checkpoint) -> None:
+    """
+    Function that saves the checkpoint (atomically: other processes see either old or new file, never half of it). The
+    temporary file is made only for this user, so before it is renamed it gets the same permissions as any new file
+    :param file: file name
+    :param state: checkpoint to save
+    """
+    arrays = {attribute: getattr(state.totals, attribute)
+              for attribute in engine.STAT_ATTRIBUTES + ('placings', 'squares', 'placing_points')}
+    directory = os.path.dirname(os.path.abspath(file))
+    handle, temporary = tempfile.mkstemp(dir=directory, prefix='.checkpoint-', suffix='.npz')
+    try:
+        with os.fdopen(handle, 'wb') as temporary_file:
+            np.savez(temporary_file, version=VERSION, n_seasons=state.totals.n_seasons,
+                     n_squared=state.totals.n_squared, entropy=str(state.entropy), next_task=state.next_task,
+                     fingerprint=state.fingerprint, **arrays)
+            temporary_file.flush()
+            os.fsync(temporary_file.fileno())
+        os.chmod(temporary, 0o666 & ~current_umask())
+        os.replace(temporary, file)
+    except BaseException:
+        os.remove(temporary)
+        raise
+
+
+def current_umask() -> int:
+    """
+    Function that finds the umask of the process (it can only be read by setting it, so it is set back at once)
+    :return: umask
+    """
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+
+def load_checkpoint(file: str) -> Optional[Checkpoint]:
+    """
+    Function that loads the checkpoint, file written by the newer version of the program raises ValueError (its arrays
+    can mean something else, so it is never read and never overwritten)
+    :param file: file name
+    :return: checkpoint from the file or None if the file doesn't exist
+    """
+    if not os.path.isfile(file):
+        return None
+    with np.load(file, allow_pickle=False) as data:
+        if int(data['version']) > VERSION:
+            raise ValueError('{} has version {}, this program reads versions up to {}'.format(
+                file, int(data['version']), VERSION))
+        totals = engine.SeasonTotals(len(data['points']))
+        for attribute in engine.STAT_ATTRIBUTES + ('placings', 'squares', 'placing_points'):
+            if attribute in data:
+                getattr(totals, attribute)[:] = data[attribute]
+        totals.n_seasons = int(data['n_seasons'])
+        totals.n_squared = int(data['n_squared']) if 'n_squared' in data else 0
+        return Checkpoint(totals, int(str(data['entropy'])), int(data['next_task']), str(data['fingerprint']))
@@ -0,0 +1,514 @@
+"""
+Command line interface that never waits for the user, so it can be used from scheduled jobs and scripts (Main.py is
+for the interactive use, it sets the size of cmd and waits for the key at the end). There are nine commands:
+
+    python cli.py simulate --seasons 1000000 --workers 4 --seed 42 --format json --output forecast.json
+    python cli.py report --format csv
+    python cli.py analytic
+    python cli.py replay --season 123456
+    python cli.py query "Arsenal above Tottenham" "Norwich relegated given Norwich - Watford 2"
+    python cli.py serve --port 8000 --workers 4
+    python cli.py fit history/premier_league_*.csv --league leagues/premier_league_2019.json --output clubs.json
+    python cli.py backtest history/premier_league_*.csv --league leagues/premier_league_2019.json
+    python cli.py calibrate history/premier_league_*.csv --workers 8 --output constants.json
+
+    python cli.py simulate --league leagues/premier_league_2019.json other_league.json --workers 8
+
+simulate calculates the seasons (continuing the results in the checkpoint file) and writes the forecast, report only
+writes the forecast from the checkpoint file and analytic writes the exact forecast with the frozen ratings in a few
+milliseconds (more info in analytic.py). replay calculates one season of the run again with the same random numbers and
+writes all its games and its final table (seed is taken from the checkpoint file if it isn't given). query answers the
+questions about the seasons in the store file of simulate --store (more info in query.py). serve starts the local HTTP
+service that keeps the forecast in memory and calculates it again when the new result comes (more info in service.py).
+fit calculates the elo and the goals of the clubs from the results of the previous seasons and writes them as the clubs
+of the league config file (more info in history.py). backtest scores the constants on the results of the previous
+seasons and calibrate searches for the constants with the best score (more info in calibration.py).
+
+The league is the one from Main.py (clubs_in_league and CONSTANTS) if --league isn't given, with --league the leagues
+are read from their config files (more info in league.py) and calculated on the same processes. Forecast can be the text
+table, JSON or CSV on the screen or in the file, or the arrays (npz) and Parquet in the file (more info in export.py).
+Progress is written to the standard error, so the standard output has only the forecast.
+
+    python cli.py report --format npz --output forecast.npz
+
+With --cache the results are kept in the content addressed cache instead of the checkpoint file, every set of inputs
+and seed has its own entry, so the same run is never calculated twice (more info in cache.py):
+
+    python cli.py simulate --cache cache --seed 42
+    python cli.py report --cache cache --seed 42
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import json
+import sys
+from typing import Dict, List
+
+import Main
+import analytic
+import cache
+import calibration
+import checkpoint
+import export
+import history
+import league
+import query
+import service
+import store
+
+
+def check_output(arguments: argparse.Namespace) -> None:
+    """
+    Function that checks if the forecast can be written where the arguments say (binary formats need the file), so the
+    command fails before the calculations
+    :param arguments: parsed command line arguments
+    """
+    if arguments.format in export.BINARY_FORMATS and arguments.output is None:
+        raise ValueError('--format {} needs --output'.format(arguments.format))
+    if arguments.format == 'parquet' and not export.parquet_available():
+        raise ValueError('--format parquet needs pyarrow (pip install pyarrow)')
+
+
+def print_progress(record: Dict) -> None:
+    """
+    Function that writes the progress of the calculations to the standard error
+    :param record: progress record from Main.progress_record
+    """
+    print('{}: {} seasons, {:.0f} seasons/s, error {:.2f} times the tolerance'.format(
+        record['league'], record['seasons'], record['seasons_per_second'], record['error_ratio']), file=sys.stderr)
+
+
+def load_leagues(arguments: argparse.Namespace) -> List[league.League]:
+    """
+    Function that loads the leagues from the command line arguments
+    :param arguments: parsed command line arguments
+    :return: list of leagues
+    """
+    if not arguments.league:
+        seasons = [Main.current_season(arguments.fixtures, arguments.played)]
+    else:
+        seasons = [league.load_league(file) for file in arguments.league]
+    if arguments.checkpoint:
+        if len(seasons) > 1:
+            raise ValueError('--checkpoint can be used only with one league')
+        seasons[0].checkpoint_file = arguments.checkpoint
+    return seasons
+
+
+def open_cache(arguments: argparse.Namespace) -> cache.ResultCache:
+    """
+    Function that opens the cache of the results from the command line arguments
+    :param arguments: parsed command line arguments
+    :return: cache (None if --cache isn't given)
+    """
+    return None if arguments.cache is None else cache.ResultCache(arguments.cache, arguments.cache_budget * 2 ** 20)
+
+
+def simulate_command(arguments: argparse.Namespace) -> int:
+    """
+    Function that runs the simulate command
+    :param arguments: parsed command line arguments
+    :return: exit code (1 if the checkpoint was calculated with other inputs or seed)
+    """
+    try:
+        check_output(arguments)
+        seasons = load_leagues(arguments)
+        if arguments.control_variate and not arguments.static and any(season.constants['k_base'] for season in seasons):
+            raise ValueError('--control-variate needs the frozen ratings (--static or k_base 0)')
+        results = Main.simulate_leagues(seasons, arguments.workers, arguments.seasons, arguments.seed,
+                                        arguments.tolerance, arguments.metrics, arguments.profile,
+                                        None if arguments.quiet else print_progress, arguments.static,
+                                        arguments.store, open_cache(arguments))
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 1
+    leagues = []
+    for season, (totals, _, _) in zip(seasons, results):
+        placings = None
+        if arguments.control_variate:
+            try:
+                placings = analytic.controlled_placings(totals, analytic.forecast(season).points)
+            except ValueError as error:
+                print(error, file=sys.stderr)
+                return 1
+        leagues.append((season, export.forecast_arrays(totals, season, placings)))
+    export.write(arguments.output, leagues, arguments.format)
+    return 0
+
+
+def report_command(arguments: argparse.Namespace) -> int:
+    """
+    Function that runs the report command
+    :param arguments: parsed command line arguments
+    :return: exit code (1 if the checkpoint was calculated with other inputs or seed)
+    """
+    try:
+        check_output(arguments)
+        seasons = load_leagues(arguments)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 1
+    result_cache = open_cache(arguments)
+    leagues = []
+    for season in seasons:
+        fingerprint = Main.run_fingerprint(season, arguments.static)
+        file = (season.checkpoint_file if result_cache is None else
+                result_cache.file(cache.cache_key(fingerprint, arguments.seed)))
+        try:
+            state = Main.load_results(season, file, arguments.seed, arguments.static)
+        except ValueError as error:
+            print(error, file=sys.stderr)
+            return 1
+        if state.fingerprint != fingerprint:
+            print('{} was calculated with different clubs, fixtures, results or constants'.format(file),
+                  file=sys.stderr)
+            return 1
+        if arguments.seed is not None and state.entropy != arguments.seed:
+            print('{} was calculated with the seed {}, not {}'.format(file, state.entropy, arguments.seed),
+                  file=sys.stderr)
+            return 1
+        leagues.append((season, export.forecast_arrays(state.totals, season)))
+    export.write(arguments.output, leagues, arguments.format)
+    return 0
+
+
+def analytic_command(arguments: argparse.Namespace) -> int:
+    """
+    Function that runs the analytic command
+    :param arguments: parsed command line arguments
+    :return: exit code
+    """
+    try:
+        check_output(arguments)
+        seasons = load_leagues(arguments)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 1
+    export.write(arguments.output, [(season, export.analytic_arrays(analytic.forecast(season))) for season in seasons],
+                 arguments.format)
+    return 0
+
+
+def format_replay(games: List[tuple], rows: List[Dict], number: int, entropy: int, output_format: str) -> str:
+    """
+    Function that converts the replayed season to the text
+    :param games: games from Main.replay_season
+    :param rows: forecast of the season (from export.rows)
+    :param number: number of the season
+    :param entropy: seed of the run
+    :param output_format: 'text', 'json' or 'csv' (csv has only the games, npz and parquet aren't supported)
+    :return: text of the season
+    """
+    columns = ('home', 'away', 'home_goals', 'away_goals', 'home_elo', 'away_elo')
+    if output_format == 'json':
+        return json.dumps({'season': number, 'seed': entropy, 'games': [dict(zip(columns, game)) for game in games],
+                           'standings': rows}, indent=2) + '\n'
+    if output_format == 'csv':
+        handle = io.StringIO()
+        writer = csv.writer(handle, lineterminator='\n')
+        writer.writerow(columns)
+        writer.writerows(games)
+        return handle.getvalue()
+    lines = ['Season {} of the run with the seed {}'.format(number, entropy)]
+    for home, away, home_goals, away_goals, home_elo, away_elo in games:
+        elo = 'played' if home_elo is None else '{:7.1f} - {:<7.1f}'.format(home_elo, away_elo)
+        lines.append('{:>20} {:>2}:{:<2} {:<20} {}'.format(home, home_goals, away_goals, away, elo).rstrip())
+    return '\n'.join(lines) + '\n\n' + export.format_rows(rows, 'text')
+
+
+def replay_command(arguments: argparse.Namespace) -> int:
+    """
+    Function that runs the replay command
+    :param arguments: parsed command line arguments
+    :return: exit code (1 if there is no seed)
+    """
+    try:
+        if arguments.format in export.BINARY_FORMATS:
+            raise ValueError('replay can be written only as text, json or csv')
+        seasons = load_leagues(arguments)
+        if len(seasons) > 1:
+            raise ValueError('replay can be used only with one league')
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 1
+    season = seasons[0]
+    entropy = arguments.seed
+    if entropy is None:
+        try:
+            state = checkpoint.load_checkpoint(season.checkpoint_file)
+        except ValueError as error:
+            print(error, file=sys.stderr)
+            return 1
+        if state is None:
+            print('{} has no results, use --seed'.format(season.checkpoint_file), file=sys.stderr)
+            return 1
+        entropy = state.entropy
+    games, totals = Main.replay_season(season, entropy, arguments.season, arguments.static)
+    rows = export.rows(export.forecast_arrays(totals, season), season)
+    export.write_text(arguments.output, format_replay(games, rows, arguments.season, entropy, arguments.format))
+    return 0
+
+
+def format_answers(answers: List[Dict], output_format: str) -> str:
+    """
+    Function that converts the answers of the questions to the text
+    :param answers: answers from query.QueryEngine.ask
+    :param output_format: 'text', 'json' or 'csv'
+    :return: text of the answers (probability of the condition that is true in no season is null in JSON, empty in CSV)
+    """
+    columns = ('question', 'probability', 'error', 'hits', 'seasons', 'cached')
+    if output_format == 'json':
+        return json.dumps([{column: answer[column] for column in columns} for answer in answers], indent=2) + '\n'
+    if output_format == 'csv':
+        handle = io.StringIO()
+        writer = csv.writer(handle, lineterminator='\n')
+        writer.writerow(columns)
+        writer.writerows([answer[column] for column in columns] for answer in answers)
+        return handle.getvalue()
+    return ''.join('{:>9.4%} \u00b1 {:.4%}  {}  ({} of {} seasons)\n'.format(
+        answer['probability'], answer['error'], answer['question'], answer['hits'], answer['seasons'])
+                   if answer['seasons'] else '{:>19}  {}  (no matching seasons)\n'.format('-', answer['question'])
+                   for answer in answers)
+
+
+def query_command(arguments: argparse.Namespace) -> int:
+    """
+    Function that runs the query command
+    :param arguments: parsed command line arguments
+    :return: exit code (1 if there is no store or the question can't be answered)
+    """
+    try:
+        if arguments.format in export.BINARY_FORMATS:
+            raise ValueError('query can be written only as text, json or csv')
+        seasons = load_leagues(arguments)
+        if len(seasons) > 1:
+            raise ValueError('query can be used only with one league')
+        file = arguments.store or store.store_file(seasons[0].checkpoint_file)
+        engine = query.QueryEngine(store.SeasonStore(file), seasons[0].relegation_places)
+        answers = [engine.ask(question) for question in arguments.questions]
+    except (ValueError, OSError) as error:
+        print(error, file=sys.stderr)
+        return 1
+    export.write_text(arguments.output, format_answers(answers, arguments.format))
+    return 0
+
+
+def serve_command(arguments: argparse.Namespace) -> int:
+    """
+    Function that runs the serve command (until it is stopped with ctrl+c)
+    :param arguments: parsed command line arguments
+    :return: exit code (1 if the fixtures or results can't be read or the checkpoint was calculated with other seed)
+    """
+    try:
+        forecast_service = service.ForecastService(arguments.workers, arguments.seasons, arguments.seed,
+                                                   arguments.tolerance, arguments.static, arguments.fixtures,
+                                                   arguments.played, arguments.checkpoint or Main.CHECKPOINT_FILE)
+    except (ValueError, KeyError, OSError) as error:
+        print(error, file=sys.stderr)
+        return 1
+    if not arguments.quiet:
+        print('Serving the forecast on http://{}:{}'.format(arguments.host, arguments.port), file=sys.stderr)
+    try:
+        asyncio.run(service.serve(forecast_service, arguments.host, arguments.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def fit_command(arguments: argparse.Namespace) -> int:
+    """
+    Function that runs the fit command
+    :param arguments: parsed command line arguments
+    :return: exit code (1 if the history files can't be used)
+    """
+    constants, names = Main.CONSTANTS, None
+    if arguments.league:
+        season = league.load_league(arguments.league)
+        constants, names = season.constants, season.clubs.names
+    try:
+        clubs = history.fit(arguments.files, constants, names, arguments.initial_elo)
+    except (KeyError, ValueError, OSError) as error:
+        print(error, file=sys.stderr)
+        return 1
+    # one club in every line, same as in the league config files
+    export.write_text(arguments.output, '[\n' + ',\n'.join('  ' + json.dumps(club)
+                                                          for club in history.club_configs(clubs)) + '\n]\n')
+    return 0
+
+
+def load_backtest(arguments: argparse.Namespace) -> tuple:
+    """
+    Function that loads the history and the constants of the backtest and calibrate commands
+    :param arguments: parsed command line arguments
+    :return: tuple (calibration.Backtest, constants)
+    """
+    constants = league.load_league(arguments.league).constants if arguments.league else Main.CONSTANTS
+    backtest = calibration.Backtest(history.load_history(arguments.files), constants['games'], arguments.burn_in,
+                                    arguments.initial_elo)
+    return backtest, dict(constants)
+
+
+def backtest_command(arguments: argparse.Namespace) -> int:
+    """
+    Function that runs the backtest command
+    :param arguments: parsed command line arguments
+    :return: exit code (1 if the history files can't be used)
+    """
+    try:
+        backtest, constants = load_backtest(arguments)
+    except (KeyError, ValueError, OSError) as error:
+        print(error, file=sys.stderr)
+        return 1
+    scores = calibration.evaluate(backtest, constants)
+    export.write_text(arguments.output, json.dumps({'constants': constants, 'scores': scores}, indent=2) + '\n')
+    return 0
+
+
+def calibrate_command(arguments: argparse.Namespace) -> int:
+    """
+    Function that runs the calibrate command
+    :param arguments: parsed command line arguments
+    :return: exit code (1 if the history files or the grid can't be used)
+    """
+    try:
+        backtest, constants = load_backtest(arguments)
+        grid = {}
+        for item in arguments.grid or []:
+            name, values = item.split('=')
+            if name not in constants:
+                raise KeyError('Unknown constant in --grid: {}'.format(name))
+            grid[name] = [float(value) for value in values.split(',')]
+    except (KeyError, ValueError, OSError) as error:
+        print(error, file=sys.stderr)
+        return 1
+
+    def progress(best: Dict, scores: Dict, scale: float) -> None:
+        print('{} {:.6f}, steps {:.4f}, {}'.format(arguments.objective, scores[arguments.objective], scale, ', '.join(
+            '{} {:g}'.format(name, best[name]) for name in arguments.parameters)), file=sys.stderr)
+
+    cache = calibration.Cache(arguments.cache)
+    start = calibration.score(backtest, [constants], cache)[0]
+    if grid:
+        best, scores = calibration.grid_search(backtest, constants, grid, arguments.objective, arguments.workers,
+                                               cache)[0]
+    else:
+        best, scores = calibration.optimize(backtest, constants, arguments.parameters, arguments.objective,
+                                            arguments.workers, cache, progress=None if arguments.quiet else progress)
+    export.write_text(arguments.output, json.dumps({'constants': best, 'scores': scores, 'start_scores': start},
+                                                   indent=2) + '\n')
+    return 0
+
+
+def make_parser() -> argparse.ArgumentParser:
+    """
+    Function that makes the parser of the command line arguments
+    :return: parser
+    """
+    parser = argparse.ArgumentParser(description='League forecast without any interaction')
+    commands = parser.add_subparsers(dest='command', required=True)
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--league', nargs='+', help='config files of the leagues (league from Main.py if not given)')
+    common.add_argument('--fixtures', default=Main.FIXTURES_FILE,
+                        help='file with all games of the league (only without --league)')
+    common.add_argument('--played', default=Main.RESULTS_FILE,
+                        help='file with the results of the played games (only without --league)')
+    common.add_argument('--checkpoint', help='file with the calculated results (only for one league)')
+    common.add_argument('--format', choices=export.FORMATS, default='text',
+                        help='format of the forecast (npz and parquet only with --output)')
+    common.add_argument('--output', help='file for the forecast (standard output if not given)')
+    static = argparse.ArgumentParser(add_help=False)
+    static.add_argument('--static', action='store_true', default=Main.STATIC_RATINGS,
+                        help='elo of the clubs does not change during the season (faster, more info in engine.py)')
+    cached = argparse.ArgumentParser(add_help=False)
+    cached.add_argument('--cache', default=Main.RESULT_CACHE,
+                        help='folder of the cache of the results (used instead of the checkpoint file)')
+    cached.add_argument('--cache-budget', type=int, default=Main.CACHE_BUDGET // 2 ** 20,
+                        help='size of the cache in MB after which the results not used the longest are removed')
+    simulate = commands.add_parser('simulate', parents=[common, static, cached],
+                                   help='calculate the seasons and write the forecast')
+    simulate.add_argument('--seasons', type=int, default=Main.MAX, help='max number of seasons')
+    simulate.add_argument('--tolerance', type=float, default=Main.TOLERANCE,
+                          help='stop when title and relegation odds are this precise')
+    simulate.add_argument('--seed', type=int, help='seed of the random numbers (only for the new results)')
+    simulate.add_argument('--workers', type=int, default=1, help='number of processes')
+    simulate.add_argument('--metrics', default=Main.METRICS_FILE, help='file for the JSON lines metrics')
+    simulate.add_argument('--profile', action='store_true', help='measure the stages of the calculations')
+    simulate.add_argument('--quiet', action='store_true', help="don't write the progress")
+    simulate.add_argument('--store', action='store_true', default=Main.STORE_SEASONS,
+                          help='also write every season to the store file (.seasons next to the checkpoint file)')
+    simulate.add_argument('--control-variate', action='store_true',
+                          help='correct the placings with the exact expected points (only with --static or k_base 0)')
+    simulate.set_defaults(function=simulate_command)
+    report = commands.add_parser('report', parents=[common, static, cached],
+                                 help='write the forecast from the checkpoint file')
+    report.add_argument('--seed', type=int, help='seed of the run (checkpoint of the other seed is rejected, with '
+                                                 '--cache the run without the seed if not given)')
+    report.set_defaults(function=report_command)
+    exact = commands.add_parser('analytic', parents=[common],
+                                help='write the exact forecast with the frozen ratings (placings are approximated)')
+    exact.set_defaults(function=analytic_command)
+    replay = commands.add_parser('replay', parents=[common, static], help='calculate one season of the run again')
+    replay.add_argument('--season', type=int, required=True, help='number of the season (counted from 0)')
+    replay.add_argument('--seed', type=int, help='seed of the run (from the checkpoint file if not given)')
+    replay.set_defaults(function=replay_command)
+    ask = commands.add_parser('query', parents=[common], help='answer the questions about the stored seasons')
+    ask.add_argument('questions', nargs='+', help='questions, for example "Arsenal above Tottenham" (more info in '
+                                                  'query.py)')
+    ask.add_argument('--store', help='store file (.seasons next to the checkpoint file if not given)')
+    ask.set_defaults(function=query_command)
+    serve = commands.add_parser('serve', parents=[static],
+                                help='start the local HTTP service with the forecast of the league from Main.py')
+    serve.add_argument('--host', default=service.HOST, help='address the service listens on')
+    serve.add_argument('--port', type=int, default=service.PORT, help='port the service listens on')
+    serve.add_argument('--fixtures', default=Main.FIXTURES_FILE, help='file with all games of the league')
+    serve.add_argument('--played', default=Main.RESULTS_FILE, help='file with the results of the played games')
+    serve.add_argument('--checkpoint', help='file with the calculated results')
+    serve.add_argument('--seasons', type=int, default=Main.MAX, help='max number of seasons of every forecast')
+    serve.add_argument('--tolerance', type=float, default=Main.TOLERANCE,
+                       help='stop when title and relegation odds are this precise')
+    serve.add_argument('--seed', type=int, help='seed of the random numbers')
+    serve.add_argument('--workers', type=int, default=1, help='number of processes')
+    serve.add_argument('--quiet', action='store_true', help="don't write the address")
+    serve.set_defaults(function=serve_command)
+    fit = commands.add_parser('fit',
+                              help='calculate elo and goals of the clubs from the results of the previous seasons')
+    fit.add_argument('files', nargs='+',
+                     help='results of the previous seasons, one file for every season, oldest first')
+    fit.add_argument('--league', help='config file of the league (constants and clubs of the new season)')
+    fit.add_argument('--initial-elo', type=float, default=history.INITIAL_ELO,
+                     help='elo of the clubs in the first file')
+    fit.add_argument('--output', help='file for the clubs (standard output if not given)')
+    fit.set_defaults(function=fit_command)
+    past = argparse.ArgumentParser(add_help=False)
+    past.add_argument('files', nargs='+',
+                      help='results of the previous seasons, one file for every season, oldest first')
+    past.add_argument('--league', help='config file of the league with the constants (CONSTANTS from Main.py if not '
+                                       'given)')
+    past.add_argument('--burn-in', type=int, default=calibration.BURN_IN, help='number of the first seasons not scored')
+    past.add_argument('--initial-elo', type=float, default=history.INITIAL_ELO,
+                      help='elo of the clubs in the first file')
+    past.add_argument('--output', help='file for the JSON results (standard output if not given)')
+    backtest = commands.add_parser('backtest', parents=[past],
+                                   help='score the constants on the results of the previous seasons')
+    backtest.set_defaults(function=backtest_command)
+    calibrate = commands.add_parser('calibrate', parents=[past],
+                                    help='search for the constants with the best score on the previous seasons')
+    calibrate.add_argument('--parameters', nargs='+', default=calibration.PARAMETERS,
+                           choices=sorted(calibration.STEPS), help='constants that are changed by the search')
+    calibrate.add_argument('--grid', nargs='+', metavar='NAME=VALUES',
+                           help='score every combination of the values (for example draw_max=0.2,0.25,0.3) instead of '
+                                'the search')
+    calibrate.add_argument('--objective', choices=calibration.SCORES, default=calibration.OBJECTIVE,
+                           help='score that is minimized')
+    calibrate.add_argument('--workers', type=int, default=1, help='number of processes')
+    calibrate.add_argument('--cache', default=calibration.CACHE_FILE, help='file with the scores already calculated')
+    calibrate.add_argument('--quiet', action='store_true', help="don't write the progress")
+    calibrate.set_defaults(function=calibrate_command)
+    return parser
+
+
+if __name__ == '__main__':
+    arguments = make_parser().parse_args()
+    sys.exit(arguments.function(arguments))
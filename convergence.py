@@ -0,0 +1,119 @@
+"""
+Monte Carlo errors of the results and the rule that decides when there are enough seasons. Every placing probability
+is the share of the seasons in which the club finished on that position, so its standard error is
+sqrt(p * (1 - p) / n). Averages (points, wins, goals...) have the standard error sqrt(variance / n), where the variance
+is calculated from the sums and the sums of squares in SeasonTotals. Errors get smaller with the square root of the
+number of seasons, so 4 times more seasons are needed for a 2 times smaller error, which is also how the number of
+seasons still needed is estimated.
+
+Tolerance is the half width of the confidence interval (Z standard errors), so tolerance 0.001 means that title and
+relegation odds are within +-0.1 percentage points of the exact values in 95% of the runs.
+"""
+
+import numpy as np
+from typing import Optional, Sequence
+
+import engine
+
+"""
+Number of standard errors in the confidence interval (1.96 is 95% confidence)
+"""
+Z = 1.96
+
+"""
+Positions of the events the stopping rule looks at by default (negative positions count from the bottom, so it works
+for the leagues with any number of clubs)
+"""
+TITLE = (0,)
+RELEGATION = (-3, -2, -1)
+
+
+def placing_errors(totals: engine.SeasonTotals) -> np.ndarray:
+    """
+    Function that calculates the standard errors of all placing probabilities
+    :param totals: sums of the calculated seasons
+    :return: array with shape (n_clubs, n_positions), same as totals.placings
+    """
+    if totals.n_seasons == 0:
+        return np.full(totals.placings.shape, np.inf)
+    probability = totals.placings / totals.n_seasons
+    return np.sqrt(probability * (1 - probability) / totals.n_seasons)
+
+
+def event_errors(totals: engine.SeasonTotals, positions: Sequence[int]) -> np.ndarray:
+    """
+    Function that calculates the standard errors of the probabilities that the clubs finish on one of the positions
+    (for example in the relegation zone)
+    :param totals: sums of the calculated seasons
+    :param positions: positions of the event
+    :return: array with shape (n_clubs,)
+    """
+    if totals.n_seasons == 0:
+        return np.full(len(totals.placings), np.inf)
+    probability = totals.placings[:, list(positions)].sum(axis=1) / totals.n_seasons
+    return np.sqrt(probability * (1 - probability) / totals.n_seasons)
+
+
+def average_errors(totals: engine.SeasonTotals) -> np.ndarray:
+    """
+    Function that calculates the standard errors of the averages StandingsFull shows. Variance is calculated only from
+    the seasons that have squares (n_squared), but the error is for all seasons in the average
+    :param totals: sums of the calculated seasons
+    :return: array with shape (len(STAT_ATTRIBUTES), n_clubs), rows are in the STAT_ATTRIBUTES order
+    """
+    if totals.n_squared < 2:
+        return np.full(totals.squares.shape, np.inf)
+    sums = np.stack([getattr(totals, attribute) for attribute in engine.STAT_ATTRIBUTES]).astype(np.float64)
+    mean = sums / totals.n_seasons
+    variance = np.maximum(totals.squares / totals.n_squared - mean ** 2, 0) * totals.n_squared / (totals.n_squared - 1)
+    return np.sqrt(variance / totals.n_seasons)
+
+
+class StoppingRule:
+    """
+    Class that decides when the calculations can stop. It stops when the odds of every club for every event (title and
+    relegation by default) are within tolerance, and if average_tolerance is given, also when every average is within
+    it (in the units of the average, for example 0.05 points). Errors of very rare events are tiny after just a few
+    seasons only because the event didn't happen yet, so the rule never stops before min_seasons.
+    """
+    def __init__(self, tolerance: float = 0.001, events: Sequence[Sequence[int]] = (TITLE, RELEGATION),
+                 average_tolerance: Optional[float] = None, min_seasons: int = 10000, z: float = Z) -> None:
+        self.tolerance = tolerance
+        self.events = events
+        self.average_tolerance = average_tolerance
+        self.min_seasons = min_seasons
+        self.z = z
+
+    def __repr__(self) -> str:
+        return 'StoppingRule(+-{:.4%} on {} events, averages +-{}, at least {} seasons)'.format(
+            self.tolerance, len(self.events), self.average_tolerance, self.min_seasons)
+
+    def worst_ratio(self, totals: engine.SeasonTotals) -> float:
+        """
+        Method that finds how far the results are from the tolerance
+        :param totals: sums of the calculated seasons
+        :return: biggest confidence interval half width divided by its tolerance (1 or less means it is precise enough)
+        """
+        ratio = max(float(event_errors(totals, positions).max()) for positions in self.events) * self.z / self.tolerance
+        if self.average_tolerance is not None:
+            ratio = max(ratio, float(average_errors(totals).max()) * self.z / self.average_tolerance)
+        return ratio
+
+    def converged(self, totals: engine.SeasonTotals) -> bool:
+        """
+        Method that says if there are enough seasons
+        :param totals: sums of the calculated seasons
+        :return: True if the calculations can stop
+        """
+        return totals.n_seasons >= self.min_seasons and self.worst_ratio(totals) <= 1
+
+    def seasons_needed(self, totals: engine.SeasonTotals) -> float:
+        """
+        Method that estimates the total number of seasons needed to reach the tolerance (errors are proportional to
+        1 / sqrt(n_seasons), so the number of seasons has to grow with the square of the ratio)
+        :param totals: sums of the calculated seasons
+        :return: estimated number of seasons (inf if nothing was calculated yet)
+        """
+        if totals.n_seasons == 0:
+            return np.inf
+        return max(self.min_seasons, totals.n_seasons * self.worst_ratio(totals) ** 2)
@@ -0,0 +1,605 @@
+"""
+Batch simulation engine. Main.py plays one season at a time with Club objects, which means a few numpy calls on python
+scalars for every single match. Here the state of many seasons is kept in (n_seasons, n_clubs) arrays and one whole
+matchday of every season is played with a handful of numpy calls, so the python overhead is paid once per matchday
+instead of once per match. The formulas are the same as in calculate_probabilities, add_goals and elo_change in
+Main.py (more info on LINK 1 and LINK 5 there), so the results have the same distribution as the play_game path.
+
+With static=True elo doesn't change during the season (the same thing as k_base == 0, but faster). Then the games
+don't depend on each other, so all remaining games of all seasons are played at once (play_static with
+StaticSampler), which is good for the quick screening runs. Exact results of this mode can also be calculated without
+simulating (analytic.py).
+
+Random numbers come from the counter based generator (Philox). Season number k of the run (seasons are counted from
+0 over all tasks) always gets the same block of numbers, made only from the key of the run and k: one number for the
+outcome and one for the goals of every fixture (season_generator). So the results don't depend on the batch size or on
+the number of processes, and any season can be calculated again on its own (cli.py replay) without the seasons
+before it.
+
+If numba is installed, the dynamic elo path can also be played by the compiled kernel (use_kernel, more info in
+kernel.py), it gives the same seasons without the python loop over the rounds.
+
+This module doesn't know anything about Club objects or the league, it only works with arrays and the CONSTANTS
+dictionary, so it can be used for every league and from other processes.
+"""
+
+import numpy as np
+from typing import Dict, Iterable, List, Sequence, Union
+
+import kernel
+import metrics
+import ranking
+import store
+
+"""
+Outcome codes used in the arrays (same order as possible_outcomes in add_result): 0 == '1', 1 == 'X', 2 == '2'
+"""
+HOME_WIN = 0
+DRAW = 1
+AWAY_WIN = 2
+
+"""
+Max number of goals one club can score in the game when goals are drawn by ScorelineSampler (probability of more than
+20 goals is around 1e-8 even for the best attack in the Premier League, which is expected to score 4.5 goals)
+"""
+MAX_GOALS = 20
+
+"""
+Philox makes 4 random numbers from one value of the counter, so every season starts at the new counter value
+"""
+PHILOX_BLOCK = 4
+
+"""
+Attributes of the SeasonBatch/SeasonTotals that are summed over the seasons (same names as in the Club class)
+"""
+STAT_ATTRIBUTES = ('elo', 'points', 'wins', 'draws', 'losses', 'goals_scored', 'goals_received')
+
+
+class ClubTable:
+    """
+    Class that holds all clubs of the league as arrays (struct of arrays instead of the dictionary of Club objects).
+    Names are stored only once and the index of the club is the position of its name. It holds only the data that
+    doesn't change during the season, state of the seasons is in SeasonBatch.
+    """
+    __slots__ = ('names', 'index', 'elo', 'goals')
+
+    def __init__(self, clubs: Iterable) -> None:
+        clubs = list(clubs)
+        self.names = [club.name for club in clubs]
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.elo, self.goals = club_arrays(clubs)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def from_arrays(cls, names: List[str], elo: np.ndarray, goals: np.ndarray) -> 'ClubTable':
+        """
+        Method that makes the table directly from the arrays (for example from the league config file), without Club
+        objects
+        :param names: names of the clubs
+        :param elo: elo of the clubs
+        :param goals: goals array with shape (n_clubs, 4), same columns as in club_arrays
+        :return: new table
+        """
+        table = cls.__new__(cls)
+        table.names = list(names)
+        table.index = {name: i for i, name in enumerate(table.names)}
+        table.elo = np.array(elo, dtype=np.float64)
+        table.goals = np.array(goals, dtype=np.float64).reshape(-1, 4)
+        return table
+
+
+class SeasonBatch:
+    """
+    Class that holds the state of n_seasons seasons. Results of every game are stored in the arrays with shape
+    (n_seasons, n_fixtures) (outcome codes and goals) and once all games are played count_results fills the attributes
+    with the same names as in the Club class (games, points, wins...), which are arrays with shape (n_seasons, n_clubs),
+    so batch.points[i, j] is number of points club with index j has in the season i. Elo is updated after every round.
+    Arrays are made once for capacity seasons and reset fills them again for the next batch (with n_seasons <=
+    capacity), so running millions of seasons doesn't allocate new memory for every batch. In the middle of the season
+    the games that were already played are the first fixtures and played holds their real results (rows are outcome
+    code, home goals and away goals), reset writes them in every season, so only the remaining fixtures are simulated,
+    but the standings (and the tie breakers) count all games. uniform holds the random numbers of the seasons (more
+    info in season_generator), uniform[i, j] is used for the outcome of the fixture j in the season i and
+    goal_uniform[i, j] for its goals.
+    """
+    def __init__(self, fixtures: np.ndarray, n_clubs: int, capacity: int, played: np.ndarray = None) -> None:
+        n_fixtures = len(fixtures)
+        self.fixtures = fixtures
+        self.played = np.zeros((0, 3), dtype=np.int16) if played is None else played
+        self.capacity = capacity
+        self.n_seasons = capacity
+        self._elo = np.zeros((capacity, n_clubs), dtype=np.float64)
+        self._outcome = np.zeros((capacity, n_fixtures), dtype=np.int8)
+        self._home_scored = np.zeros((capacity, n_fixtures), dtype=np.int16)
+        self._away_scored = np.zeros((capacity, n_fixtures), dtype=np.int16)
+        self._uniform = np.zeros((capacity, season_numbers(n_fixtures)), dtype=np.float64)
+        # matrices that say which club played home/away in which fixture (home_games[i, j] == 1 if club j played home
+        # in fixture i), multiplying the results of the fixtures with them adds up the results of the clubs
+        self.home_games = np.zeros((n_fixtures, n_clubs), dtype=np.float32)
+        self.away_games = np.zeros((n_fixtures, n_clubs), dtype=np.float32)
+        self.home_games[np.arange(n_fixtures), fixtures[:, 0]] = 1
+        self.away_games[np.arange(n_fixtures), fixtures[:, 1]] = 1
+        self.reset(self._elo[0], capacity)
+
+    def reset(self, elo: np.ndarray, n_seasons: int) -> None:
+        """
+        Method that prepares the batch for the new seasons (in place, without new arrays)
+        :param elo: elo of the clubs at the start of the season
+        :param n_seasons: number of seasons in the batch
+        """
+        if n_seasons > self.capacity:
+            raise ValueError('Batch has room for {} seasons, not {}'.format(self.capacity, n_seasons))
+        self.n_seasons = n_seasons
+        self.elo = self._elo[:n_seasons]
+        self.outcome = self._outcome[:n_seasons]
+        self.home_scored = self._home_scored[:n_seasons]
+        self.away_scored = self._away_scored[:n_seasons]
+        self.uniform = self._uniform[:n_seasons]
+        self.goal_uniform = self.uniform[:, len(self.fixtures):2 * len(self.fixtures)]
+        self.elo[:] = elo
+        self.outcome.fill(0)
+        self.home_scored.fill(0)
+        self.away_scored.fill(0)
+        n_played = len(self.played)
+        self.outcome[:, :n_played] = self.played[:, 0]
+        self.home_scored[:, :n_played] = self.played[:, 1]
+        self.away_scored[:, :n_played] = self.played[:, 2]
+
+    def count_results(self) -> None:
+        """
+        Method that adds up the results of all games for every club. Instead of adding the results club by club after
+        every game, the results are multiplied by the matrices that say which club played home/away in which fixture
+        """
+        home, away = self.home_games, self.away_games
+        home_wins = (self.outcome == HOME_WIN).astype(np.float32)
+        draws = (self.outcome == DRAW).astype(np.float32)
+        away_wins = (self.outcome == AWAY_WIN).astype(np.float32)
+        home_scored = self.home_scored.astype(np.float32)
+        away_scored = self.away_scored.astype(np.float32)
+        self.games = np.broadcast_to((home + away).sum(axis=0).astype(np.int32), self.elo.shape)
+        self.wins = (home_wins @ home + away_wins @ away).astype(np.int32)
+        self.draws = (draws @ (home + away)).astype(np.int32)
+        self.losses = (away_wins @ home + home_wins @ away).astype(np.int32)
+        self.points = 3 * self.wins + self.draws
+        self.goals_scored = (home_scored @ home + away_scored @ away).astype(np.int32)
+        self.goals_received = (away_scored @ home + home_scored @ away).astype(np.int32)
+
+
+class SeasonTotals:
+    """
+    Class that holds the sums of many seasons (the same thing StandingsFull stores in the clubs, but as arrays). Every
+    attribute with the name from the Club class is the array with shape (n_clubs,) and placings is the array with shape
+    (n_clubs, n_positions). squares holds the sums of the squares of the same attributes (rows in the STAT_ATTRIBUTES
+    order), they are needed for the standard errors of the averages (more info in convergence.py). n_squared is the
+    number of seasons in squares, it is smaller than n_seasons only if the totals were converted from the old pickle
+    files, which don't have squares. placing_points[i, j] is the sum of the points of the club i in the seasons it
+    finished j-th (needed for the control variate in analytic.py). Totals from different processes can be merged, the
+    result is the same as if all seasons were added to the same totals. profile holds the numbers measured while the
+    totals were calculated (more info in metrics.py), it is None if nothing was measured. rows is the list of the rows
+    of every season (more info in store.py), it is None if the seasons aren't kept.
+    """
+    def __init__(self, n_clubs: int, keep_rows: bool = False) -> None:
+        self.n_seasons = 0
+        self.elo = np.zeros(n_clubs, dtype=np.float64)
+        self.points = np.zeros(n_clubs, dtype=np.int64)
+        self.wins = np.zeros(n_clubs, dtype=np.int64)
+        self.draws = np.zeros(n_clubs, dtype=np.int64)
+        self.losses = np.zeros(n_clubs, dtype=np.int64)
+        self.goals_scored = np.zeros(n_clubs, dtype=np.int64)
+        self.goals_received = np.zeros(n_clubs, dtype=np.int64)
+        self.placings = np.zeros((n_clubs, n_clubs), dtype=np.int64)
+        self.squares = np.zeros((len(STAT_ATTRIBUTES), n_clubs), dtype=np.float64)
+        self.placing_points = np.zeros((n_clubs, n_clubs), dtype=np.int64)
+        self.n_squared = 0
+        self.profile = None
+        self.rows = [] if keep_rows else None
+
+    def add_batch(self, batch: SeasonBatch, tie_breakers: Sequence[str] = ranking.DEFAULT_TIE_BREAKERS,
+                  first_season: int = 0) -> None:
+        """
+        Method that adds all seasons of the batch to the totals
+        :param batch: seasons calculated by simulate_seasons
+        :param tie_breakers: tie breakers used to rank the clubs (more info in ranking.py)
+        :param first_season: number of the first season of the batch in the run (only for the rows)
+        """
+        with metrics.stage('totals'):
+            for row, attribute in enumerate(STAT_ATTRIBUTES):
+                values = getattr(batch, attribute)
+                getattr(self, attribute)[:] += values.sum(axis=0)
+                self.squares[row] += np.square(values, dtype=np.float64).sum(axis=0)
+        with metrics.stage('ranking'):
+            order = ranking.rank_seasons(batch, tie_breakers)
+            self.placings += ranking.count_placings(order)
+            self.placing_points += ranking.count_placings(order, np.take_along_axis(batch.points, order, axis=1))
+        if self.rows is not None:
+            with metrics.stage('rows'):
+                self.rows.append(store.season_rows(first_season, batch.points, batch.goals_scored -
+                                                   batch.goals_received, order, batch.outcome[:, len(batch.played):]))
+        self.n_seasons += batch.n_seasons
+        self.n_squared += batch.n_seasons
+
+    def merge(self, other: 'SeasonTotals') -> 'SeasonTotals':
+        """
+        Method that adds the totals calculated somewhere else (for example in other process) to these totals
+        :param other: totals that are being added
+        :return: self, so merging can be chained
+        """
+        for attribute in STAT_ATTRIBUTES + ('placings', 'squares', 'placing_points'):
+            getattr(self, attribute)[:] += getattr(other, attribute)
+        if self.rows is not None and other.rows is not None:
+            self.rows += other.rows
+        self.n_seasons += other.n_seasons
+        self.n_squared += other.n_squared
+        return self
+
+
+def club_arrays(clubs: Iterable) -> tuple:
+    """
+    Function that converts the clubs to arrays used by the engine. Index of the club in the arrays is the position of
+    the club in the iterable
+    :param clubs: iterable of Club objects (or anything that has the same attributes)
+    :return: tuple (elo array with shape (n_clubs,), goals array with shape (n_clubs, 4) where the columns are home
+             goals scored, home goals received, away goals scored and away goals received)
+    """
+    clubs = list(clubs)
+    elo = np.array([club.elo for club in clubs], dtype=np.float64)
+    goals = np.array([[club.home_goals_scored, club.home_goals_received, club.away_goals_scored,
+                       club.away_goals_received] for club in clubs], dtype=np.float64)
+    return elo, goals
+
+
+def group_rounds(fixtures: np.ndarray, start: int = 0) -> List[slice]:
+    """
+    Function that splits the list of fixtures into rounds in which every club plays at most once, so the whole round
+    can be played at the same time. Order of the fixtures is kept (new round starts when the club that already plays in
+    the current round shows up), so the elo of the clubs changes in the same order as when games are played one by one
+    :param fixtures: array with shape (n_fixtures, 2) where every row is (home club index, away club index)
+    :param start: number of the first fixtures that are skipped (games that were already played)
+    :return: list of slices, fixtures[rounds[i]] are the fixtures of the round i
+    """
+    rounds = []
+    playing = set()
+    for i, (home, away) in enumerate(fixtures.tolist()[start:], start):
+        if home in playing or away in playing:
+            rounds.append(slice(start, i))
+            start = i
+            playing = set()
+        playing.update((home, away))
+    if start < len(fixtures):
+        rounds.append(slice(start, len(fixtures)))
+    return rounds
+
+
+def match_probabilities(difference_in_elo: np.ndarray, constants: Dict) -> tuple:
+    """
+    Array version of calculate_probabilities
+    :param difference_in_elo: home elo + home field advantage - away elo
+    :param constants: league constants
+    :return: tuple of arrays (home_win, draw, away_win)
+    """
+    draw_chance = constants['draw_max'] * np.exp(-difference_in_elo ** 2 / (2 * constants['draw_variance'] ** 2))
+    home_win = 1 / (1 + np.power(constants['c'], -difference_in_elo / constants['d'])) * (1 - draw_chance)
+    away_win = 1 / (1 + np.power(constants['c'], difference_in_elo / constants['d'])) * (1 - draw_chance)
+    return home_win, draw_chance, away_win
+
+
+def season_numbers(n_fixtures: int) -> int:
+    """
+    Function that calculates how many random numbers one season gets (two for every fixture, rounded up to the whole
+    Philox block)
+    :param n_fixtures: number of all fixtures of the season
+    :return: number of random numbers
+    """
+    return -(-2 * n_fixtures // PHILOX_BLOCK) * PHILOX_BLOCK
+
+
+def season_key(entropy: int) -> int:
+    """
+    Function that makes the Philox key (128 bit number) from the seed of the run
+    :param entropy: seed of the run
+    :return: key
+    """
+    return int.from_bytes(np.random.SeedSequence(entropy).generate_state(2, np.uint64).tobytes(), 'little')
+
+
+def season_generator(key: int, first_season: int, n_fixtures: int) -> np.random.Generator:
+    """
+    Function that makes the generator whose numbers are the numbers of the seasons first_season, first_season + 1...
+    one after another. Season k starts at the counter k * season_numbers / PHILOX_BLOCK, so its numbers are always the
+    same, no matter which generator (or process) makes them
+    :param key: key from season_key
+    :param first_season: number of the first season
+    :param n_fixtures: number of all fixtures of the season
+    :return: generator, generator.random((n_seasons, season_numbers(n_fixtures))) gives the numbers of n_seasons seasons
+    """
+    counter = first_season * (season_numbers(n_fixtures) // PHILOX_BLOCK)
+    return np.random.Generator(np.random.Philox(key=key, counter=counter))
+
+
+def draw_outcomes(home_win: np.ndarray, draw: np.ndarray, uniform: np.ndarray) -> np.ndarray:
+    """
+    Array version of add_result, it picks the outcome codes with one uniform number for every match
+    :param home_win: probabilities of home win
+    :param draw: probabilities of draw
+    :param uniform: uniform random numbers with the same shape
+    :return: array of outcome codes
+    """
+    return (uniform >= home_win).astype(np.int8) + (uniform >= home_win + draw)
+
+
+def poisson_averages(fixtures: np.ndarray, goals: np.ndarray, constants: Dict) -> tuple:
+    """
+    Function that calculates the expected number of goals for every fixture, formulas are the same as in add_goals.
+    They don't depend on elo, so they are calculated only once
+    :param fixtures: array with shape (n_fixtures, 2)
+    :param goals: goals array from club_arrays
+    :param constants: league constants
+    :return: tuple of arrays (home_average, away_average) with shape (n_fixtures,)
+    """
+    games = constants['games'] / 2
+    home = goals[fixtures[:, 0]]
+    away = goals[fixtures[:, 1]]
+    home_att = (home[:, 0] / games) / constants['home_att']
+    away_def = (away[:, 3] / games) / constants['home_att']
+    home_average = home_att * away_def * constants['home_att']
+    away_att = (away[:, 2] / games) / constants['away_att']
+    # add_goals uses home goals received of the away club here, keep it the same so the results match
+    home_def = (away[:, 1] / games) / constants['away_att']
+    away_average = away_att * home_def * constants['away_att']
+    return home_average, away_average
+
+
+def poisson_probabilities(average: np.ndarray, max_goals: int = MAX_GOALS) -> np.ndarray:
+    """
+    Function that calculates the Poisson probabilities of 0 to max_goals goals
+    :param average: expected goals, any shape
+    :param max_goals: max number of goals
+    :return: array with the shape of average and one more axis with max_goals + 1 probabilities
+    """
+    average = np.asarray(average, dtype=np.float64)
+    goals = np.arange(max_goals + 1)
+    # recurrence p(k) = p(k - 1) * lambda / k, so there is no overflow of k!
+    ratios = np.ones(average.shape + (max_goals + 1,))
+    ratios[..., 1:] = average[..., None] / goals[1:]
+    return np.exp(-average)[..., None] * np.cumprod(ratios, axis=-1)
+
+
+def scoreline_cdf(home_average: np.ndarray, away_average: np.ndarray, max_goals: int = MAX_GOALS) -> np.ndarray:
+    """
+    Function that calculates the distribution of the scorelines for every fixture and every outcome. Scoreline (home,
+    away) is the cell home * (max_goals + 1) + away, probability of the cell is the product of two Poisson
+    probabilities and for each outcome only the cells that agree with it are kept and divided by their sum. That is
+    exactly the distribution add_goals gets by drawing again until goals agree with the outcome, only without the
+    scorelines with more than max_goals goals (which are practically impossible)
+    :param home_average: expected home goals, shape (n_fixtures,)
+    :param away_average: expected away goals, shape (n_fixtures,)
+    :param max_goals: max number of goals one club can score
+    :return: array with shape (n_fixtures, 3, (max_goals + 1) ** 2), cdf[i, outcome] is the cumulative distribution of
+             the cells for the fixture i and outcome code
+    """
+    home_average = np.atleast_1d(np.asarray(home_average, dtype=np.float64))
+    poisson = poisson_probabilities(np.stack((home_average, np.atleast_1d(away_average))), max_goals)
+    goals = np.arange(max_goals + 1)
+    joint = (poisson[0][:, :, None] * poisson[1][:, None, :]).reshape(len(home_average), 1, (max_goals + 1) ** 2)
+    sign = np.sign(goals[:, None] - goals[None, :]).ravel()
+    agrees = np.stack([sign == 1 - outcome for outcome in (HOME_WIN, DRAW, AWAY_WIN)])
+    cdf = np.cumsum(joint * agrees, axis=2)
+    cdf /= cdf[:, :, -1:]
+    cdf[:, :, -1] = 1
+    return cdf
+
+
+class ScorelineSampler:
+    """
+    Class that draws the goals for the given outcomes directly from the scoreline_cdf tables (instead of drawing
+    Poisson numbers again and again like add_goals). All tables are put in one long array where the table number r
+    is moved up by r, so one np.searchsorted finds the cells of all matches at once and every match costs the same,
+    no matter how unlikely the outcome was.
+    """
+    def __init__(self, home_average: np.ndarray, away_average: np.ndarray, max_goals: int = MAX_GOALS) -> None:
+        cdf = scoreline_cdf(home_average, away_average, max_goals)
+        self.max_goals = max_goals
+        self.cells = cdf.shape[2]
+        self.table = (cdf + np.arange(cdf.shape[0] * 3).reshape(-1, 3, 1)).ravel()
+        # random number + r can be rounded up to r + 1 which is already in the next table, so the cell is limited to
+        # the last cell of its own table that can happen
+        self.last = (cdf < 1).sum(axis=2).ravel()
+
+    def sample(self, fixtures: Union[slice, np.ndarray], outcome: np.ndarray, uniform: np.ndarray) -> tuple:
+        """
+        Method that draws the goals of the matches
+        :param fixtures: indexes (or slice) of the fixtures the outcomes belong to
+        :param outcome: outcome codes, shape (n_seasons, n_fixtures)
+        :param uniform: uniform random numbers with the same shape as outcome
+        :return: tuple of arrays (home_scored, away_scored) with the same shape as outcome
+        """
+        metrics.count('scoreline_sampler_matches', outcome.size)
+        row = np.arange(self.table.size // (3 * self.cells))[fixtures] * 3 + outcome
+        cell = np.searchsorted(self.table, uniform + row, side='right') - row * self.cells
+        np.minimum(cell, self.last[row], out=cell)
+        return np.divmod(cell, self.max_goals + 1)
+
+
+class StaticSampler:
+    """
+    Class that draws the whole result (outcome and goals) of the matches when elo doesn't change. Then the
+    probability of every scoreline is known before the season (probability of its outcome times its probability in
+    scoreline_cdf), so one random number per match is enough and the outcome is the sign of the goal difference. Cell is
+    found with the guide table: guide[i, j] is the first cell of the fixture i that can be the result when the random
+    number is between j / cells and (j + 1) / cells, from there it is usually only one or two steps, matches that need
+    more steps than STEPS are finished with np.searchsorted
+    """
+    STEPS = 4
+
+    def __init__(self, elo: np.ndarray, goals: np.ndarray, fixtures: np.ndarray, constants: Dict,
+                 max_goals: int = MAX_GOALS) -> None:
+        difference_in_elo = elo[fixtures[:, 0]] + constants['home_field_advantage'] - elo[fixtures[:, 1]]
+        outcome = np.stack(match_probabilities(difference_in_elo, constants), axis=1)
+        cdf = scoreline_cdf(*poisson_averages(fixtures, goals, constants), max_goals)
+        # every cell agrees with only one outcome, so adding the outcomes gives the probability of the cell
+        cdf = np.cumsum((np.diff(cdf, axis=2, prepend=0) * outcome[:, :, None]).sum(axis=1), axis=1)
+        cdf /= cdf[:, -1:]
+        cdf[:, -1] = 1
+        self.max_goals = max_goals
+        self.cells = cdf.shape[1]
+        self.cdf = cdf.ravel()
+        # the same trick as in ScorelineSampler, table of the fixture i is moved up by i
+        self.table = (cdf + np.arange(len(cdf))[:, None]).ravel()
+        buckets = np.arange(self.cells) / self.cells
+        # when all games were already played there are no fixtures and the guide is empty
+        self.guide = np.array([np.searchsorted(row, buckets, side='right') + i * self.cells
+                               for i, row in enumerate(cdf)], dtype=np.intp).ravel()
+
+    def sample(self, uniform: np.ndarray) -> tuple:
+        """
+        Method that draws the results of all fixtures in many seasons
+        :param uniform: uniform random numbers with shape (n_seasons, n_fixtures)
+        :return: tuple of arrays (outcome, home_scored, away_scored) with the same shape as uniform
+        """
+        n_seasons, n_fixtures = uniform.shape
+        metrics.count('static_sampler_matches', uniform.size)
+        uniform = uniform.ravel()
+        row = np.tile(np.arange(n_fixtures) * self.cells, n_seasons)
+        cell = self.guide[row + (uniform * self.cells).astype(np.intp)]
+        wrong = np.flatnonzero(self.cdf[cell] <= uniform)
+        for _ in range(self.STEPS):
+            if not wrong.size:
+                break
+            cell[wrong] += 1
+            wrong = wrong[self.cdf[cell[wrong]] <= uniform[wrong]]
+        if wrong.size:
+            metrics.count('static_sampler_searched', wrong.size)
+            found = np.searchsorted(self.table, uniform[wrong] + row[wrong] // self.cells, side='right')
+            cell[wrong] = np.minimum(found, row[wrong] + self.cells - 1)
+        home_scored, away_scored = np.divmod(cell - row, self.max_goals + 1)
+        outcome = (1 - np.sign(home_scored - away_scored)).astype(np.int8)
+        shape = (n_seasons, n_fixtures)
+        return outcome.reshape(shape), home_scored.reshape(shape), away_scored.reshape(shape)
+
+
+def expected_result(difference_in_elo: np.ndarray, constants: Dict) -> np.ndarray:
+    """
+    Function that calculates the expected score of the home club (home_positive_result in elo_change)
+    :param difference_in_elo: home elo + home field advantage - away elo
+    :param constants: league constants
+    :return: array of expected scores
+    """
+    return 1 / (1 + np.power(constants['c'], -difference_in_elo / constants['d']))
+
+
+def elo_changes(home_elo: np.ndarray, away_elo: np.ndarray, goal_difference: np.ndarray, constants: Dict,
+                home_positive_result: np.ndarray = None) -> tuple:
+    """
+    Array version of elo_change
+    :param home_elo: elo of the home clubs
+    :param away_elo: elo of the away clubs
+    :param goal_difference: home goals - away goals
+    :param constants: league constants
+    :param home_positive_result: expected score of the home clubs if it is already known (from the table)
+    :return: tuple of arrays (new home elo, new away elo)
+    """
+    if home_positive_result is None:
+        home_positive_result = expected_result(home_elo + constants['home_field_advantage'] - away_elo, constants)
+    elo_score = (np.sign(goal_difference) + 1) / 2
+    k = constants['k_base'] * np.power(1 + np.abs(goal_difference), constants['lambda'])
+    return home_elo + k * (elo_score - home_positive_result), away_elo + k * (home_positive_result - elo_score)
+
+
+def play_round(batch: SeasonBatch, games: slice, sampler: ScorelineSampler, constants: Dict, table=None) -> None:
+    """
+    Function that plays one round (every club at most once) in all seasons of the batch, it does the same thing as
+    play_game for every fixture of the round
+    :param batch: state of the seasons
+    :param games: slice of batch.fixtures that are played in this round
+    :param sampler: sampler of the goals for all fixtures of the batch
+    :param constants: league constants
+    :param table: tables.ProbabilityTable used instead of the exact formulas (if it is given)
+    """
+    home, away = batch.fixtures[games, 0], batch.fixtures[games, 1]
+    home_elo = batch.elo[:, home]
+    away_elo = batch.elo[:, away]
+    with metrics.stage('outcomes'):
+        difference_in_elo = home_elo + constants['home_field_advantage'] - away_elo
+        if table is None:
+            home_win, draw, _ = match_probabilities(difference_in_elo, constants)
+            home_positive_result = expected_result(difference_in_elo, constants)
+        else:
+            home_win, draw, home_positive_result = table.lookup(difference_in_elo)
+        outcome = draw_outcomes(home_win, draw, batch.uniform[:, games])
+    with metrics.stage('goals'):
+        home_scored, away_scored = sampler.sample(games, outcome, batch.goal_uniform[:, games])
+    with metrics.stage('elo'):
+        batch.elo[:, home], batch.elo[:, away] = elo_changes(home_elo, away_elo, home_scored - away_scored, constants,
+                                                             home_positive_result)
+    batch.outcome[:, games] = outcome
+    batch.home_scored[:, games] = home_scored
+    batch.away_scored[:, games] = away_scored
+
+
+def play_static(batch: SeasonBatch, games: slice, sampler: StaticSampler) -> None:
+    """
+    Function that plays all given games of all seasons of the batch at once, elo isn't changed (clubs can play more
+    than once, because results don't depend on the games before)
+    :param batch: state of the seasons
+    :param games: slice of batch.fixtures that are played
+    :param sampler: sampler made for the same fixtures (batch.fixtures[games]) with the elo at the start
+    """
+    with metrics.stage('results'):
+        batch.outcome[:, games], batch.home_scored[:, games], batch.away_scored[:, games] = \
+            sampler.sample(batch.uniform[:, games])
+
+
+def simulate_seasons(elo: np.ndarray, goals: np.ndarray, fixtures: np.ndarray, n_seasons: int, constants: Dict,
+                     key: int = None, rounds: List[slice] = None,
+                     sampler: ScorelineSampler = None, table=None, batch: SeasonBatch = None,
+                     played: np.ndarray = None, static: bool = False, first_season: int = 0,
+                     use_kernel: bool = False) -> SeasonBatch:
+    """
+    Function that plays all games of n_seasons seasons at the same time (or only the remaining games, if some of them
+    were already played)
+    :param elo: elo of the clubs at the start of the season
+    :param goals: goals array from club_arrays
+    :param fixtures: array with shape (n_fixtures, 2) with all games of the season in the order they are played
+    :param n_seasons: number of seasons to simulate
+    :param constants: league constants
+    :param key: Philox key of the run from season_key (random key if it isn't given)
+    :param rounds: rounds from group_rounds, calculated here if they aren't given
+    :param sampler: sampler of the goals for the fixtures (StaticSampler of the remaining fixtures if static is True),
+                    made here if it isn't given
+    :param table: tables.ProbabilityTable used instead of the exact formulas (if it is given)
+    :param batch: batch from the previous call that is reused (new one is made if it isn't given or is too small)
+    :param played: real results of the first len(played) fixtures (more info in SeasonBatch), it is used only if the
+                   batch is made here, given batch already has its own played games
+    :param static: elo doesn't change during the season, all remaining games are played at once with play_static
+                   (rounds and table aren't used)
+    :param first_season: number of the first season of the batch in the run (more info in season_generator)
+    :param use_kernel: play the games with the compiled kernel if numba is installed (not with the static ratings or
+                       table, rounds are then ignored and all remaining games are played)
+    :return: SeasonBatch with the final state of all seasons
+    """
+    if key is None:
+        key = season_key(np.random.SeedSequence().entropy)
+    if batch is None or batch.capacity < n_seasons:
+        batch = SeasonBatch(fixtures, len(elo), n_seasons, played if batch is None else batch.played)
+    if rounds is None and not static:
+        rounds = group_rounds(fixtures, len(batch.played))
+    if sampler is None and static:
+        sampler = StaticSampler(elo, goals, fixtures[len(batch.played):], constants)
+    elif sampler is None:
+        sampler = ScorelineSampler(*poisson_averages(fixtures, goals, constants))
+    batch.reset(elo, n_seasons)
+    with metrics.stage('random'):
+        season_generator(key, first_season, len(fixtures)).random(out=batch.uniform)
+    if static:
+        play_static(batch, slice(len(batch.played), len(fixtures)), sampler)
+    elif use_kernel and kernel.AVAILABLE and table is None:
+        with metrics.stage('kernel'):
+            kernel.play_games(batch, sampler, constants)
+    else:
+        for games in rounds:
+            play_round(batch, games, sampler, constants, table)
+    with metrics.stage('count_results'):
+        batch.count_results()
+    return batch
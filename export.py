@@ -0,0 +1,229 @@
+"""
+Export of the results in the formats other programs can read. Sums of the seasons (engine.SeasonTotals) or the exact
+results (analytic.Forecast) are first converted to the plain arrays (forecast_arrays, analytic_arrays), straight from
+the sums, without any formatting. Every output is made from these arrays:
+
+    npz      the arrays themselves (numpy.load), keys are 'league name/array name'
+    json     one object per club (rows)
+    csv      one line per club, placings are in the columns p1, p2...
+    parquet  the same columns as csv (needs pyarrow, pip install pyarrow)
+    text     table for people, it is only one of the renderers (the other one is Standings in Main.py)
+
+Arrays of one league are clubs (names), seasons (0 for the exact results), exact, the average of every attribute from
+engine.STAT_ATTRIBUTES and its standard error (attribute_error), placings (probabilities, placings[i, j] is the
+probability that the club i finishes j-th) and placing_counts (numbers of seasons, only for the calculated results).
+"""
+
+import csv
+import importlib.util
+import io
+import json
+import sys
+import numpy as np
+from typing import Dict, List, Sequence, Tuple
+
+import analytic
+import convergence
+import engine
+import league
+
+"""
+Formats that can be written, binary ones can be written only to the file
+"""
+FORMATS = ('text', 'json', 'csv', 'npz', 'parquet')
+BINARY_FORMATS = ('npz', 'parquet')
+
+
+def forecast_arrays(totals: engine.SeasonTotals, season: league.League,
+                    placings: np.ndarray = None) -> Dict[str, np.ndarray]:
+    """
+    Function that converts the sums of the seasons to the arrays of the forecast
+    :param totals: sums of the calculated seasons
+    :param season: league the totals belong to
+    :param placings: probabilities of the positions that are used instead of the ones from the totals (for example
+                     from analytic.controlled_placings)
+    :return: dictionary name: array
+    """
+    seasons = max(totals.n_seasons, 1)
+    errors = convergence.average_errors(totals)
+    arrays = {'clubs': np.array(season.clubs.names), 'seasons': np.array(totals.n_seasons), 'exact': np.array(False)}
+    for row, attribute in enumerate(engine.STAT_ATTRIBUTES):
+        arrays[attribute] = getattr(totals, attribute) / seasons
+        arrays[attribute + '_error'] = errors[row]
+    arrays['placings'] = totals.placings / seasons if placings is None else placings
+    arrays['placing_counts'] = totals.placings.copy()
+    return arrays
+
+
+def analytic_arrays(result: analytic.Forecast) -> Dict[str, np.ndarray]:
+    """
+    Function that converts the exact results to the arrays of the forecast (errors are 0, there is also
+    points_distribution, more info in analytic.Forecast)
+    :param result: forecast from analytic.forecast
+    :return: dictionary name: array
+    """
+    n_clubs = len(result.placings)
+    arrays = {'clubs': np.array(result.season.clubs.names), 'seasons': np.array(0), 'exact': np.array(True)}
+    for attribute in engine.STAT_ATTRIBUTES:
+        arrays[attribute] = np.asarray(getattr(result, attribute), dtype=np.float64)
+        arrays[attribute + '_error'] = np.zeros(n_clubs)
+    arrays['placings'] = result.placings
+    arrays['points_distribution'] = result.points_distribution
+    return arrays
+
+
+def rows(arrays: Dict[str, np.ndarray], season: league.League) -> List[Dict]:
+    """
+    Function that makes one row for every club, clubs are sorted the same way as in the standings
+    :param arrays: arrays from forecast_arrays or analytic_arrays
+    :param season: league the arrays belong to
+    :return: list of dictionaries with the averages, their standard errors, title and relegation odds and the
+             probabilities of every position (seasons is None for the exact results)
+    """
+    relegation = list(season.events[1])
+    seasons = None if arrays['exact'] else int(arrays['seasons'])
+    placings = arrays['placings']
+    result = []
+    for i, name in enumerate(arrays['clubs'].tolist()):
+        row = {'league': season.name, 'club': name, 'seasons': seasons}
+        for attribute in engine.STAT_ATTRIBUTES:
+            row[attribute] = float(arrays[attribute][i])
+        for attribute in engine.STAT_ATTRIBUTES:
+            row[attribute + '_error'] = float(arrays[attribute + '_error'][i])
+        row['title'] = float(placings[i, 0])
+        row['relegation'] = float(placings[i, relegation].sum())
+        row['placings'] = placings[i].tolist()
+        result.append(row)
+    return sorted(result, key=lambda row: (row['points'], row['goals_scored'] - row['goals_received'],
+                                           row['goals_scored']), reverse=True)
+
+
+def flat_rows(forecast: List[Dict]) -> Tuple[List[str], List[list]]:
+    """
+    Function that converts the rows to the table where placings are in the columns p1, p2... (leagues with less clubs
+    have None in the last columns)
+    :param forecast: rows from the rows function
+    :return: tuple (names of the columns, list of the values of every row)
+    """
+    positions = ['p{}'.format(i + 1) for i in range(max((len(row['placings']) for row in forecast), default=0))]
+    columns = [column for column in forecast[0] if column != 'placings'] if forecast else []
+    values = [[row[column] for column in columns] + row['placings'] + [None] * (len(positions) - len(row['placings']))
+              for row in forecast]
+    return columns + positions, values
+
+
+def render_text(forecast: List[Dict]) -> str:
+    """
+    Function that renders the rows as the text table (one table for every league)
+    :param forecast: rows from the rows function
+    :return: text of the tables
+    """
+    def footer(seasons: int) -> str:
+        return 'exact, frozen ratings' if seasons is None else '{} seasons'.format(seasons)
+
+    lines = []
+    place = 0
+    for number, row in enumerate(forecast):
+        if number == 0 or row['league'] != forecast[number - 1]['league']:
+            if lines:
+                lines.append(footer(forecast[number - 1]['seasons']) + '\n')
+            lines.append(row['league'])
+            lines.append('{:>2} {:<20} {:>7} {:>6} {:>6} {:>6} {:>11} {:>8} {:>9} {:>11}'.format(
+                '#', 'Club', 'Points', 'Wins', 'Draws', 'Losses', 'Goals', 'ELO', 'Title', 'Relegation'))
+            place = 0
+        place += 1
+        lines.append('{:>2} {:<20} {:>7.2f} {:>6.2f} {:>6.2f} {:>6.2f} {:>5.1f}:{:<5.1f} {:>8.1f} {:>9.4%} {:>11.4%}'
+                     .format(place, row['club'], row['points'], row['wins'], row['draws'], row['losses'],
+                             row['goals_scored'], row['goals_received'], row['elo'], row['title'],
+                             row['relegation']))
+    if forecast:
+        lines.append(footer(forecast[-1]['seasons']))
+    return '\n'.join(lines) + '\n'
+
+
+def format_rows(forecast: List[Dict], output_format: str) -> str:
+    """
+    Function that converts the rows to the text format
+    :param forecast: rows from the rows function
+    :param output_format: 'text', 'json' or 'csv'
+    :return: text of the forecast
+    """
+    if output_format == 'json':
+        return json.dumps(forecast, indent=2) + '\n'
+    if output_format == 'csv':
+        handle = io.StringIO()
+        writer = csv.writer(handle, lineterminator='\n')
+        columns, values = flat_rows(forecast)
+        writer.writerow(columns)
+        writer.writerows(values)
+        return handle.getvalue()
+    return render_text(forecast)
+
+
+def write_npz(file: str, leagues: Sequence[Tuple[league.League, Dict[str, np.ndarray]]]) -> None:
+    """
+    Function that writes the arrays of all leagues to one .npz file
+    :param file: file name
+    :param leagues: list of tuples (league, arrays)
+    """
+    np.savez_compressed(file, **{'{}/{}'.format(season.name, name): array
+                                 for season, arrays in leagues for name, array in arrays.items()})
+
+
+def parquet_available() -> bool:
+    """
+    Function that checks if the Parquet files can be written (pyarrow isn't imported until the file is written, it
+    takes longer than importing the rest of the program)
+    :return: True if pyarrow is installed
+    """
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def write_parquet(file: str, forecast: List[Dict]) -> None:
+    """
+    Function that writes the rows to the Parquet file (same columns as csv)
+    :param file: file name
+    :param forecast: rows from the rows function
+    """
+    if not parquet_available():
+        raise ImportError('Parquet export needs pyarrow (pip install pyarrow)')
+    import pyarrow
+    import pyarrow.parquet
+    columns, values = flat_rows(forecast)
+    # seasons is None in every row of the exact results, the type can't be guessed from it
+    types = {'seasons': pyarrow.int64()}
+    table = pyarrow.table({column: pyarrow.array([row[i] for row in values], type=types.get(column))
+                           for i, column in enumerate(columns)})
+    pyarrow.parquet.write_table(table, file)
+
+
+def write_text(file: str, text: str) -> None:
+    """
+    Function that writes the text to the file or to the standard output
+    :param file: file name (standard output if it is None)
+    :param text: text to write
+    """
+    if file is None:
+        sys.stdout.write(text)
+    else:
+        with open(file, 'w', newline='', encoding='utf-8') as handle:
+            handle.write(text)
+
+
+def write(file: str, leagues: Sequence[Tuple[league.League, Dict[str, np.ndarray]]], output_format: str) -> None:
+    """
+    Function that writes the forecast of the leagues in the given format
+    :param file: file name (standard output if it is None, only for the text formats)
+    :param leagues: list of tuples (league, arrays)
+    :param output_format: one of FORMATS
+    """
+    if output_format in BINARY_FORMATS and file is None:
+        raise ValueError('{} can be written only to the file'.format(output_format))
+    if output_format == 'npz':
+        write_npz(file, leagues)
+        return
+    forecast = [row for season, arrays in leagues for row in rows(arrays, season)]
+    if output_format == 'parquet':
+        write_parquet(file, forecast)
+        return
+    write_text(file, format_rows(forecast, output_format))
@@ -0,0 +1,241 @@
+"""
+Fitting of the starting elo and goals from the historical results, instead of typing them in clubs_in_league by hand.
+Every file is one season of the league (same format as the results file in schedule.py, or the files from
+football-data.co.uk with HomeTeam, AwayTeam, FTHG and FTAG columns), files are given in the order the seasons were
+played and games in the file in the order they were played. Seasons are read one at the time, so any number of years
+can be used.
+
+elo_change is replayed over all games: games are grouped into rounds (engine.group_rounds) and every round is one call
+of engine.elo_changes, or the whole season is one call of the compiled loop if numba is installed (kernel.py). Clubs
+of the first season start with INITIAL_ELO. Promoted clubs (not in the previous season) start with the average elo of
+the relegated ones (in the previous season, but not in this one), which is what the hand made numbers did.
+
+Goals are the home goals scored, home goals received, away goals scored and away goals received in the last season,
+scaled to the whole season (games in CONSTANTS), so the season that isn't finished yet can also be used. Clubs of the
+new season that didn't play in the last one get the averages of the relegated clubs. Result is engine.ClubTable, or
+the clubs in the league config format (club_configs).
+"""
+
+import numpy as np
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import engine
+import kernel
+import schedule
+
+"""
+Elo of the clubs in the first season (and of the promoted clubs if no club was relegated)
+"""
+INITIAL_ELO = 1500
+
+"""
+Names of the columns in the history files, first name that is in the file is used
+"""
+COLUMNS = {'home': ('home', 'HomeTeam', 'Home'), 'away': ('away', 'AwayTeam', 'Away'),
+           'home_goals': ('home_goals', 'FTHG', 'HG'), 'away_goals': ('away_goals', 'FTAG', 'AG')}
+
+
+def read_season(file: str) -> Tuple[List[str], List[str], np.ndarray]:
+    """
+    Function that reads one season of the history, games without goals are skipped
+    :param file: file name (.csv or .json)
+    :return: tuple (home club names, away club names, goals array with shape (n_games, 2))
+    """
+    rows = schedule.read_rows(file)
+    if not rows:
+        return [], [], np.zeros((0, 2), dtype=np.int64)
+    names = {}
+    for column, options in COLUMNS.items():
+        found = [option for option in options if option in rows[0]]
+        if not found:
+            raise KeyError('{} has no {} column (one of {})'.format(file, column, ', '.join(options)))
+        names[column] = found[0]
+    rows = [row for row in rows if str(row[names['home_goals']]).strip() not in ('', 'None')]
+    home = [row[names['home']].strip() for row in rows]
+    away = [row[names['away']].strip() for row in rows]
+    goals = np.array([(int(row[names['home_goals']]), int(row[names['away_goals']])) for row in rows],
+                     dtype=np.int64).reshape(-1, 2)
+    return home, away, goals
+
+
+class History:
+    """
+    Class that holds all games of the history as arrays. Index of the club is the position of its name in names (club
+    that played in more seasons has the same index in all of them), fixtures and goals have one row for every game,
+    seasons[s] is the slice of the games of the season s, new[s] and relegated[s] are the indexes of the clubs that
+    came to the league and left it before the season s (clubs of the first season are all new)
+    """
+    def __init__(self) -> None:
+        self.names = []
+        self.index = {}
+        self.fixtures = np.zeros((0, 2), dtype=np.intp)
+        self.goals = np.zeros((0, 2), dtype=np.int64)
+        self.seasons = []
+        self.new = []
+        self.relegated = []
+
+    def __len__(self) -> int:
+        return len(self.fixtures)
+
+    def clubs(self, season: int) -> List[int]:
+        """
+        Method that returns the clubs of the season
+        :param season: number of the season
+        :return: list of club indexes in the order of their first game
+        """
+        return list(dict.fromkeys(self.fixtures[self.seasons[season]].ravel().tolist()))
+
+
+def load_history(files: Iterable[str]) -> History:
+    """
+    Function that reads the history, one file at the time (files without played games are skipped)
+    :param files: history files, one for every season, in the order the seasons were played
+    :return: history with all games
+    """
+    history = History()
+    fixtures, goals = [], []
+    previous = set()
+    for file in files:
+        home, away, season_goals = read_season(file)
+        if not home:
+            continue
+        for name in dict.fromkeys(home + away):
+            if name not in history.index:
+                history.index[name] = len(history.names)
+                history.names.append(name)
+        fixtures.append(np.array([(history.index[h], history.index[a]) for h, a in zip(home, away)],
+                                 dtype=np.intp).reshape(-1, 2))
+        goals.append(season_goals)
+        clubs = set(fixtures[-1].ravel().tolist())
+        start = sum(len(games) for games in fixtures[:-1])
+        history.seasons.append(slice(start, start + len(home)))
+        history.new.append(np.array(sorted(clubs - previous), dtype=np.intp))
+        history.relegated.append(np.array(sorted(previous - clubs), dtype=np.intp))
+        previous = clubs
+    if not fixtures:
+        raise ValueError('History has no played games')
+    history.fixtures = np.concatenate(fixtures)
+    history.goals = np.concatenate(goals)
+    return history
+
+
+def replay_elo(elo: np.ndarray, fixtures: np.ndarray, goal_difference: np.ndarray, constants: Dict,
+               use_kernel: bool = True, ratings: np.ndarray = None) -> None:
+    """
+    Function that changes the elo after every game, in the order the games were played (same as calling elo_change for
+    every game)
+    :param elo: elo of the clubs, it is changed in place
+    :param fixtures: array with shape (n_games, 2) where every row is (home club index, away club index)
+    :param goal_difference: home goals - away goals of every game
+    :param constants: league constants
+    :param use_kernel: use the compiled loop if numba is installed
+    :param ratings: array with shape (n_games, 2) where the elo of both clubs before every game is written (not
+                    written if it is None)
+    """
+    if use_kernel and kernel.AVAILABLE:
+        kernel.replay_elo(elo, fixtures, goal_difference, constants, ratings)
+        return
+    for games in engine.group_rounds(fixtures):
+        home, away = fixtures[games, 0], fixtures[games, 1]
+        if ratings is not None:
+            ratings[games, 0], ratings[games, 1] = elo[home], elo[away]
+        elo[home], elo[away] = engine.elo_changes(elo[home], elo[away], goal_difference[games], constants)
+
+
+def replay_history(history: History, constants: Dict, initial_elo: float = INITIAL_ELO, use_kernel: bool = True,
+                   ratings: np.ndarray = None) -> np.ndarray:
+    """
+    Function that replays the elo over all seasons of the history, promoted clubs start with the average elo of the
+    relegated ones
+    :param history: history from load_history
+    :param constants: league constants
+    :param initial_elo: elo of the clubs in the first season
+    :param use_kernel: use the compiled loop if numba is installed
+    :param ratings: array with shape (n_games, 2) for the elo before every game (more info in replay_elo)
+    :return: elo of all clubs after the last game (clubs that aren't in the last season have their last elo)
+    """
+    elo = np.zeros(len(history.names))
+    goal_difference = history.goals[:, 0] - history.goals[:, 1]
+    for games, new, relegated in zip(history.seasons, history.new, history.relegated):
+        elo[new] = elo[relegated].mean() if len(relegated) else initial_elo
+        replay_elo(elo, history.fixtures[games], goal_difference[games], constants, use_kernel,
+                   None if ratings is None else ratings[games])
+    return elo
+
+
+def season_goals(fixtures: np.ndarray, goals: np.ndarray, n_clubs: int, games: int) -> np.ndarray:
+    """
+    Function that calculates the goals of the clubs in the season, scaled to the whole season
+    :param fixtures: array with shape (n_games, 2) where every row is (home club index, away club index)
+    :param goals: array with shape (n_games, 2), home and away goals of every game
+    :param n_clubs: number of clubs
+    :param games: number of games of every club in the whole season
+    :return: array with shape (n_clubs, 4), same columns as in engine.club_arrays (nan for the clubs that didn't play
+             at home or away)
+    """
+    home, away = fixtures[:, 0], fixtures[:, 1]
+    totals = np.stack((np.bincount(home, goals[:, 0], n_clubs), np.bincount(home, goals[:, 1], n_clubs),
+                       np.bincount(away, goals[:, 1], n_clubs), np.bincount(away, goals[:, 0], n_clubs)), axis=1)
+    played = np.repeat(np.stack((np.bincount(home, minlength=n_clubs), np.bincount(away, minlength=n_clubs)),
+                                axis=1), 2, axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return totals / played * (games / 2)
+
+
+def next_season(history: History, season: int, names: Sequence[str], elo: np.ndarray, games: int,
+                initial_elo: float = INITIAL_ELO) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Function that calculates the elo and the goals of the clubs of the season after the given one. Clubs that played in
+    the given season keep their elo and goals, promoted clubs get the averages of the relegated ones
+    :param history: history from load_history
+    :param season: number of the season
+    :param names: clubs of the next season
+    :param elo: elo of the clubs of the history after the season (from replay_history)
+    :param games: number of games of every club in the whole season
+    :param initial_elo: elo of the promoted clubs if no club was relegated
+    :return: tuple (elo array with shape (len(names),), goals array with shape (len(names), 4), same columns as in
+             engine.club_arrays)
+    """
+    previous = history.clubs(season)
+    stay = {history.index[name] for name in names if name in history.index} & set(previous)
+    relegated = [club for club in previous if club not in stay]
+    games_of_season = history.seasons[season]
+    goals = season_goals(history.fixtures[games_of_season], history.goals[games_of_season], len(history.names), games)
+    promoted_elo = elo[relegated].mean() if relegated else initial_elo
+    promoted_goals = np.nanmean(goals[relegated if relegated else previous], axis=0)
+    clubs = [history.index.get(name) for name in names]
+    new_elo = np.array([elo[club] if club in stay else promoted_elo for club in clubs], dtype=np.float64)
+    new_goals = np.array([np.where(np.isnan(goals[club]), promoted_goals, goals[club]) if club in stay else
+                          promoted_goals for club in clubs], dtype=np.float64).reshape(-1, 4)
+    return new_elo, new_goals
+
+
+def fit(files: Iterable[str], constants: Dict, names: Sequence[str] = None, initial_elo: float = INITIAL_ELO,
+        use_kernel: bool = True) -> engine.ClubTable:
+    """
+    Function that fits the elo and the goals of the clubs from the historical results
+    :param files: history files, one for every season, in the order the seasons were played
+    :param constants: league constants
+    :param names: clubs of the new season (clubs of the last season if it isn't given)
+    :param initial_elo: elo of the clubs in the first season
+    :param use_kernel: use the compiled loop if numba is installed
+    :return: table with the elo after the last game and the goals of the last season
+    """
+    history = load_history(files)
+    elo = replay_history(history, constants, initial_elo, use_kernel)
+    last = len(history.seasons) - 1
+    names = [history.names[club] for club in history.clubs(last)] if names is None else list(names)
+    return engine.ClubTable.from_arrays(names, *next_season(history, last, names, elo, constants['games'],
+                                                            initial_elo))
+
+
+def club_configs(clubs: engine.ClubTable, decimals: int = 1) -> List[Dict]:
+    """
+    Function that converts the table to the clubs of the league config file (more info in league.py)
+    :param clubs: table from fit
+    :param decimals: number of decimals of the elo and goals
+    :return: list of dictionaries with name, elo and goals
+    """
+    return [{'name': name, 'elo': round(float(elo), decimals),
+             'goals': [round(float(goal), decimals) for goal in goals]}
+            for name, elo, goals in zip(clubs.names, clubs.elo, clubs.goals)]
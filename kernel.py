@@ -0,0 +1,143 @@
+"""
+Optional compiled kernel of the dynamic elo path. Batch engine plays one round of all seasons with a handful of numpy
+calls, but every season still needs a python loop over its rounds (elo after the round changes the probabilities of
+the next one). With numba (pip install numba) the whole chain of play_game (calculate_probabilities, drawing the
+outcome, goals that agree with it, elo_change) is compiled to machine code and runs game after game over the arrays of
+SeasonBatch, so one game costs nanoseconds and there are no python loops at all.
+
+It uses the same random numbers (SeasonBatch.uniform), the same goal tables (engine.ScorelineSampler) and the same
+formulas as engine.play_round, so it gives the same seasons. If numba isn't installed AVAILABLE is False and the engine
+uses the numpy path (nothing else changes). numba itself is imported only on the first call of the kernel (importing
+it takes a quarter of a second, so importing the engine stays fast). Compiled code is cached on disc, so it is compiled
+only once, not in every process. replay_elo is the same loop without the random part, for the elo replay over the
+historical results (history.py).
+"""
+
+import importlib.metadata
+import importlib.util
+import math
+import numpy as np
+from typing import Callable, Dict, Optional
+
+"""
+True if numba is installed and the kernel can be used (numba isn't imported yet)
+"""
+AVAILABLE = importlib.util.find_spec('numba') is not None
+
+"""
+Compiled versions of the loops, made on their first use
+"""
+_compiled = {}
+
+
+def compiled(function: Callable) -> Callable:
+    """
+    Function that compiles the loop with numba the first time it is needed (numba is imported here)
+    :param function: python version of the loop
+    :return: compiled version of the loop
+    """
+    if function.__name__ not in _compiled:
+        import numba
+        _compiled[function.__name__] = numba.njit(cache=True)(function)
+    return _compiled[function.__name__]
+
+
+def version() -> Optional[str]:
+    """
+    Function that returns the version of numba without importing it
+    :return: version (None if numba isn't installed)
+    """
+    return importlib.metadata.version('numba') if AVAILABLE else None
+
+
+def _play_games(elo, home, away, start, uniform, goal_uniform, table, last, cells, max_goals, home_field_advantage, c,
+                d, draw_max, draw_variance, k_base, lambda_, outcome, home_scored, away_scored):
+    """
+    Function that plays the games from start on in every season, one after another. Arrays are the same as in
+    SeasonBatch and ScorelineSampler, elo, outcome, home_scored and away_scored are changed in place
+    """
+    for season in range(elo.shape[0]):
+        for game in range(start, home.shape[0]):
+            h = home[game]
+            a = away[game]
+            difference_in_elo = elo[season, h] + home_field_advantage - elo[season, a]
+            draw_chance = draw_max * math.exp(-difference_in_elo ** 2 / (2 * draw_variance ** 2))
+            home_positive_result = 1 / (1 + c ** (-difference_in_elo / d))
+            home_win = home_positive_result * (1 - draw_chance)
+            number = uniform[season, game]
+            result = 0 if number < home_win else (1 if number < home_win + draw_chance else 2)
+            # searchsorted(side='right') in the table of the fixture and outcome, same as ScorelineSampler.sample
+            row = game * 3 + result
+            target = goal_uniform[season, game] + row
+            low = row * cells
+            high = low + cells
+            while low < high:
+                middle = (low + high) // 2
+                if table[middle] <= target:
+                    low = middle + 1
+                else:
+                    high = middle
+            cell = min(low - row * cells, last[row])
+            home_goals = cell // (max_goals + 1)
+            away_goals = cell % (max_goals + 1)
+            goal_difference = home_goals - away_goals
+            elo_score = 1.0 if goal_difference > 0 else (0.5 if goal_difference == 0 else 0.0)
+            k = k_base * (1 + abs(goal_difference)) ** lambda_
+            elo[season, h] += k * (elo_score - home_positive_result)
+            elo[season, a] += k * (home_positive_result - elo_score)
+            outcome[season, game] = result
+            home_scored[season, game] = home_goals
+            away_scored[season, game] = away_goals
+
+
+def _replay_elo(elo, home, away, goal_difference, ratings, home_field_advantage, c, d, k_base, lambda_):
+    """
+    Function that changes the elo after every game, one game after another (same as engine.elo_changes), elo is
+    changed in place and the elo before every game is written to ratings
+    """
+    for game in range(home.shape[0]):
+        h = home[game]
+        a = away[game]
+        ratings[game, 0] = elo[h]
+        ratings[game, 1] = elo[a]
+        home_positive_result = 1 / (1 + c ** (-(elo[h] + home_field_advantage - elo[a]) / d))
+        difference = goal_difference[game]
+        elo_score = 1.0 if difference > 0 else (0.5 if difference == 0 else 0.0)
+        k = k_base * (1 + abs(difference)) ** lambda_
+        elo[h] += k * (elo_score - home_positive_result)
+        elo[a] += k * (home_positive_result - elo_score)
+
+
+def play_games(batch, sampler, constants: Dict) -> None:
+    """
+    Function that plays all remaining games of all seasons of the batch with the compiled kernel (the same thing
+    engine.play_round does for every round)
+    :param batch: engine.SeasonBatch after reset, with its random numbers
+    :param sampler: engine.ScorelineSampler of the fixtures of the batch
+    :param constants: league constants
+    """
+    fixtures = np.ascontiguousarray(batch.fixtures, dtype=np.int64)
+    compiled(_play_games)(batch.elo, fixtures[:, 0], fixtures[:, 1], len(batch.played), batch.uniform,
+                          batch.goal_uniform, sampler.table, sampler.last, sampler.cells, sampler.max_goals,
+                          float(constants['home_field_advantage']), float(constants['c']), float(constants['d']),
+                          float(constants['draw_max']), float(constants['draw_variance']), float(constants['k_base']),
+                          float(constants['lambda']), batch.outcome, batch.home_scored, batch.away_scored)
+
+
+def replay_elo(elo: np.ndarray, fixtures: np.ndarray, goal_difference: np.ndarray, constants: Dict,
+               ratings: np.ndarray = None) -> None:
+    """
+    Function that changes the elo after every played game with the compiled loop (used by history.replay_elo)
+    :param elo: elo of the clubs (float64), it is changed in place
+    :param fixtures: array with shape (n_games, 2) where every row is (home club index, away club index)
+    :param goal_difference: home goals - away goals of every game
+    :param constants: league constants
+    :param ratings: float64 array with shape (n_games, 2) for the elo of both clubs before every game (None if it isn't
+                    needed)
+    """
+    fixtures = np.ascontiguousarray(fixtures, dtype=np.int64)
+    if ratings is None:
+        ratings = np.empty((len(fixtures), 2))
+    compiled(_replay_elo)(elo, fixtures[:, 0], fixtures[:, 1], np.ascontiguousarray(goal_difference, dtype=np.int64),
+                          ratings, float(constants['home_field_advantage']), float(constants['c']),
+                          float(constants['d']), float(constants['k_base']), float(constants['lambda']))
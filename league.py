@@ -0,0 +1,146 @@
+"""
+Configuration of the league. Everything that is different between the leagues (constants, clubs with their elo and
+goals from the last season, fixtures, played results, tie breakers and the number of relegated clubs) is in one JSON
+file, for example:
+
+{"name": "Premier League", "constants": {"games": 38, "home_field_advantage": 66.7, ...},
+ "tie_breakers": ["points", "goal_difference", "goals_scored"], "relegation_places": 3,
+ "fixtures": "premier_league_2019.csv", "results": null, "checkpoint": "premier_league_2019.npz",
+ "clubs": [{"name": "Liverpool", "elo": 2043, "goals": [55, 10, 34, 12]}, ...]}
+
+goals are home goals scored, home goals received, away goals scored and away goals received last season (same as in
+the Club class). Files are relative to the config file, if there is no fixtures file the double round robin is made
+(schedule.round_robin) and if there is no checkpoint file it is the config file name with .npz. League holds only the
+arrays the engine needs, so any number of leagues can be calculated in one process (Main.simulate_leagues).
+"""
+
+import json
+import os
+import numpy as np
+from typing import Dict, List, Sequence, Tuple
+
+import checkpoint
+import engine
+import ranking
+import schedule
+
+"""
+Constants the config has to have (number_of_clubs is calculated from the clubs)
+"""
+REQUIRED_CONSTANTS = ('games', 'home_field_advantage', 'c', 'd', 'k_base', 'lambda', 'draw_max', 'draw_variance',
+                      'home_att', 'away_att')
+
+
+class League:
+    """
+    Class that holds all inputs of the calculations for one league. clubs have the elo after the played games,
+    fixtures are all games of the season with the played ones first and played has their results (more info in
+    engine.SeasonBatch)
+    """
+    def __init__(self, name: str, constants: Dict, clubs: engine.ClubTable, fixtures: np.ndarray,
+                 played: np.ndarray = None, tie_breakers: Sequence[str] = ranking.DEFAULT_TIE_BREAKERS,
+                 relegation_places: int = 3, checkpoint_file: str = None) -> None:
+        self.name = name
+        self.constants = constants
+        self.clubs = clubs
+        self.fixtures = fixtures
+        self.played = np.zeros((0, 3), dtype=np.int16) if played is None else played
+        self.tie_breakers = tuple(tie_breakers)
+        self.relegation_places = relegation_places
+        self.checkpoint_file = checkpoint_file
+
+    def __repr__(self) -> str:
+        return 'League({}, {} clubs, {} of {} games played)'.format(self.name, len(self.clubs), len(self.played),
+                                                                    len(self.fixtures))
+
+    @property
+    def events(self) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+        """
+        Positions of the title and of the relegation zone (used by convergence.StoppingRule)
+        """
+        return (0,), tuple(range(-self.relegation_places, 0))
+
+    def fingerprint(self, settings: Dict) -> str:
+        """
+        Method that calculates the fingerprint of the league (more info in checkpoint.py)
+        :param settings: settings of the run that also change the results (batch size, task size...)
+        :return: fingerprint
+        """
+        arrays = (self.clubs.elo, self.clubs.goals, self.fixtures) + ((self.played,) if len(self.played) else ())
+        return checkpoint.fingerprint(arrays, dict(settings, names=self.clubs.names, constants=self.constants,
+                                                   tie_breakers=list(self.tie_breakers)))
+
+
+def apply_results(elo: np.ndarray, fixtures: np.ndarray, played: np.ndarray, constants: Dict) -> np.ndarray:
+    """
+    Function that calculates the elo after the played games (same formula as Main.elo_change, game by game in the
+    order they were played)
+    :param elo: elo of the clubs at the start of the season
+    :param fixtures: fixtures with the played games first
+    :param played: results of the played games
+    :param constants: league constants
+    :return: new elo array
+    """
+    elo = np.array(elo, dtype=np.float64)
+    for (home, away), (_, home_goals, away_goals) in zip(fixtures[:len(played)].tolist(), played.tolist()):
+        elo[home], elo[away] = engine.elo_changes(elo[home], elo[away], home_goals - away_goals, constants)
+    return elo
+
+
+def played_array(results: List[Tuple[int, str, str, int, int]]) -> np.ndarray:
+    """
+    Function that converts the results to the played array of the engine
+    :param results: list from schedule.read_results
+    :return: array with shape (number of results, 3), rows are outcome code, home goals and away goals
+    """
+    return np.array([(1 - np.sign(home_goals - away_goals), home_goals, away_goals)
+                     for _, _, _, home_goals, away_goals in results], dtype=np.int16).reshape(-1, 3)
+
+
+def read_config(file: str) -> Dict:
+    """
+    Function that reads the config file and checks that it has all constants (Main.py takes its league from the config
+    file with it too)
+    :param file: config file name
+    :return: config as it is in the file, with number_of_clubs added to the constants
+    """
+    with open(file, encoding='utf-8') as handle:
+        config = json.load(handle)
+    missing = [name for name in REQUIRED_CONSTANTS if name not in config['constants']]
+    if missing:
+        raise KeyError('{} is missing constants: {}'.format(file, ', '.join(missing)))
+    config['constants'] = dict(config['constants'], number_of_clubs=len(config['clubs']))
+    return config
+
+
+def load_league(file: str) -> League:
+    """
+    Function that reads the league from the config file
+    :param file: config file name
+    :return: league with the played results already applied
+    """
+    config = read_config(file)
+    folder = os.path.dirname(os.path.abspath(file))
+    constants = config['constants']
+    names = [club['name'] for club in config['clubs']]
+    results = schedule.read_results(os.path.join(folder, config['results'])) if config.get('results') else []
+    played_games = [(matchday, home, away) for matchday, home, away, _, _ in results]
+    if config.get('fixtures'):
+        games = schedule.remaining_games(schedule.read_fixtures(os.path.join(folder, config['fixtures'])), results)
+        fixtures = schedule.index_fixtures(played_games + games, names)[0]
+    else:
+        fixtures = schedule.round_robin(len(names))[0]
+        if results:
+            index = {name: i for i, name in enumerate(names)}
+            played = {(index[home], index[away]) for _, home, away in played_games}
+            remaining = [game for game in fixtures.tolist() if tuple(game) not in played]
+            fixtures = np.array(schedule.index_fixtures(played_games, names)[0].tolist() + remaining,
+                                dtype=np.intp).reshape(-1, 2)
+    played = played_array(results)
+    elo = apply_results([club['elo'] for club in config['clubs']], fixtures, played, constants)
+    clubs = engine.ClubTable.from_arrays(names, elo, [club['goals'] for club in config['clubs']])
+    checkpoint_file = os.path.join(folder, config.get('checkpoint') or
+                                   os.path.splitext(os.path.basename(file))[0] + '.npz')
+    return League(config.get('name', os.path.basename(file)), constants, clubs, fixtures, played,
+                  config.get('tie_breakers', ranking.DEFAULT_TIE_BREAKERS), config.get('relegation_places', 3),
+                  checkpoint_file)
@@ -0,0 +1,136 @@
+"""
+Optional instrumentation of the simulation. When collector is None (default) nothing is measured, stage returns the
+context manager that does nothing and the hot paths only check one module attribute, so turned off it costs close to
+nothing. When collector is the Collector, every stage (outcomes, goals, elo, ranking, checkpoint...) adds its number of
+calls and its cumulative time, and count adds to the counters (for example the matches drawn by the samplers in engine
+and the ones StaticSampler had to finish with np.searchsorted).
+
+Workers of the parallel runner have their own collectors, their numbers come back with the totals of the task
+(SeasonTotals.profile) and they are merged in the parent. MetricsLog writes the records as JSON lines (one JSON object
+per line), so they can be read by any program.
+"""
+
+import contextlib
+import json
+import sys
+import time
+from typing import Dict, Optional
+
+
+class Stage:
+    """
+    Class that measures one call of the stage (used as the context manager)
+    """
+    __slots__ = ('entry', 'start')
+
+    def __init__(self, entry: list) -> None:
+        self.entry = entry
+        self.start = 0.0
+
+    def __enter__(self) -> 'Stage':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.entry[0] += 1
+        self.entry[1] += time.perf_counter() - self.start
+
+
+class Collector:
+    """
+    Class that holds the measured numbers. stages is the dictionary name: [calls, seconds] and counters is the
+    dictionary name: count
+    """
+    def __init__(self) -> None:
+        self.stages = {}
+        self.counters = {}
+
+    def stage(self, name: str) -> Stage:
+        """
+        Method that returns the context manager that measures one call of the stage
+        :param name: name of the stage
+        :return: context manager
+        """
+        if name not in self.stages:
+            self.stages[name] = [0, 0.0]
+        return Stage(self.stages[name])
+
+    def count(self, name: str, number: int = 1) -> None:
+        """
+        Method that adds to the counter
+        :param name: name of the counter
+        :param number: number that is added
+        """
+        self.counters[name] = self.counters.get(name, 0) + number
+
+    def merge(self, other: Dict) -> None:
+        """
+        Method that adds the numbers from the other collector (for example from the worker process)
+        :param other: dictionary from as_dict
+        """
+        for name, (calls, seconds) in other['stages'].items():
+            entry = self.stages.setdefault(name, [0, 0.0])
+            entry[0] += calls
+            entry[1] += seconds
+        for name, number in other['counters'].items():
+            self.count(name, number)
+
+    def as_dict(self) -> Dict:
+        """
+        Method that returns the numbers as plain dictionaries (they can be pickled and written to JSON)
+        :return: dictionary with stages and counters
+        """
+        return {'stages': {name: list(entry) for name, entry in self.stages.items()}, 'counters': dict(self.counters)}
+
+
+"""
+Collector that is used right now, None means that measuring is turned off
+"""
+collector: Optional[Collector] = None
+
+_off = contextlib.nullcontext()
+
+
+def stage(name: str):
+    """
+    Function that returns the context manager that measures the stage with the current collector
+    :param name: name of the stage
+    :return: context manager (one that does nothing if measuring is turned off)
+    """
+    if collector is None:
+        return _off
+    return collector.stage(name)
+
+
+def count(name: str, number: int = 1) -> None:
+    """
+    Function that adds to the counter of the current collector (it does nothing if measuring is turned off)
+    :param name: name of the counter
+    :param number: number that is added
+    """
+    if collector is not None:
+        collector.count(name, number)
+
+
+class MetricsLog:
+    """
+    Class that writes the records as JSON lines to the file ('-' is the standard output). Every record gets the time
+    when it was written and the file is flushed after every record, so it can be followed while the program runs
+    """
+    def __init__(self, file: str) -> None:
+        self.handle = sys.stdout if file == '-' else open(file, 'a')
+
+    def write(self, record: Dict) -> None:
+        """
+        Method that writes one record
+        :param record: dictionary that can be written as JSON
+        """
+        self.handle.write(json.dumps(dict(record, time=time.time())) + '\n')
+        self.handle.flush()
+
+    def close(self) -> None:
+        """
+        Method that closes the file (standard output stays open)
+        """
+        if self.handle is not sys.stdout:
+            self.handle.close()
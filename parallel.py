@@ -0,0 +1,138 @@
+"""
+Runner that splits the seasons into tasks and calculates them in more processes at the same time. Task number t has
+the seasons from t * task_size on and every season gets its own random numbers made from the seed of the run and the
+number of the season (more info in engine.season_generator), so the processes never share the random state, the run
+can be continued from any task with the same random numbers and the results are the same with any number of workers
+and any batch size. Every task returns SeasonTotals with the sums of its seasons and they are merged in the parent
+process, so the statistics are the same as if everything was calculated in one process.
+"""
+
+import contextlib
+import numpy as np
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, Iterator, Optional, Sequence
+
+import engine
+import metrics
+import ranking
+import tables
+
+"""
+Number of seasons in one task. Parent gets the results after every task, so this is also how often the results can be
+saved on disc (smaller number means more saving and merging, bigger number means worse balance between the workers)
+"""
+TASK_SIZE = 10000
+
+
+def simulate_totals(elo: np.ndarray, goals: np.ndarray, fixtures: np.ndarray, n_seasons: int, constants: Dict,
+                    key: int, batch_size: int = 1000,
+                    use_table: bool = False, tie_breakers: Sequence[str] = ranking.DEFAULT_TIE_BREAKERS,
+                    played: np.ndarray = None, profile: bool = False, static: bool = False,
+                    first_season: int = 0, use_kernel: bool = False, keep_rows: bool = False) -> engine.SeasonTotals:
+    """
+    Function that calculates n_seasons seasons (batch_size seasons at the time) and adds them up. It is the task that
+    workers run, but it can also be called directly
+    :param elo: elo of the clubs at the start of the season
+    :param goals: goals array from engine.club_arrays
+    :param fixtures: array with shape (n_fixtures, 2)
+    :param n_seasons: number of seasons to calculate
+    :param constants: league constants
+    :param key: Philox key of the run (engine.season_key)
+    :param batch_size: number of seasons calculated at the same time
+    :param use_table: use the precomputed probability table instead of the exact formulas
+    :param tie_breakers: tie breakers used to rank the clubs (more info in ranking.py)
+    :param played: real results of the first fixtures that were already played (more info in engine.SeasonBatch)
+    :param profile: measure the stages of the calculations, numbers are returned in totals.profile
+    :param static: elo doesn't change during the season (more info in engine.py)
+    :param first_season: number of the first season of the task in the run
+    :param use_kernel: use the compiled kernel if numba is installed (more info in kernel.py)
+    :param keep_rows: keep the row of every season in totals.rows (more info in store.py)
+    :return: totals of all calculated seasons
+    """
+    previous = metrics.collector
+    metrics.collector = metrics.Collector() if profile else None
+    try:
+        with metrics.stage('setup'):
+            batch = engine.SeasonBatch(fixtures, len(elo), min(batch_size, n_seasons), played)
+            rounds = None if static else engine.group_rounds(fixtures, len(batch.played))
+            if static:
+                sampler = engine.StaticSampler(elo, goals, fixtures[len(batch.played):], constants)
+            else:
+                sampler = engine.ScorelineSampler(*engine.poisson_averages(fixtures, goals, constants))
+            table = tables.get_table(constants) if use_table and not static else None
+        totals = engine.SeasonTotals(len(elo), keep_rows)
+        while totals.n_seasons < n_seasons:
+            engine.simulate_seasons(elo, goals, fixtures, min(batch_size, n_seasons - totals.n_seasons), constants,
+                                    key, rounds, sampler, table, batch, static=static,
+                                    first_season=first_season + totals.n_seasons, use_kernel=use_kernel)
+            totals.add_batch(batch, tie_breakers, first_season + totals.n_seasons)
+        if profile:
+            totals.profile = metrics.collector.as_dict()
+        return totals
+    finally:
+        metrics.collector = previous
+
+
+def run(elo: np.ndarray, goals: np.ndarray, fixtures: np.ndarray, n_seasons: int, constants: Dict, workers: int = 1,
+        entropy: int = None, first_task: int = 0, batch_size: int = 1000, task_size: int = TASK_SIZE,
+        use_table: bool = False, tie_breakers: Sequence[str] = ranking.DEFAULT_TIE_BREAKERS,
+        played: np.ndarray = None, profile: bool = False, pool: Executor = None,
+        static: bool = False, use_kernel: bool = False, keep_rows: bool = False) -> Iterator[engine.SeasonTotals]:
+    """
+    Function that splits n_seasons into tasks and calculates them on the pool of workers processes. Totals are
+    returned in the order of the tasks (workers still calculate the next tasks while the caller waits for the first
+    one), so the caller can merge them and save the progress together with the number of the next task. Caller can
+    stop at any task, tasks that weren't started yet are then cancelled. With one worker tasks are calculated in this
+    process, one after another. If the pool is given, it is used instead of the new one (and it stays open), so more
+    runs (for example of different leagues) can share the same processes
+    :param elo: elo of the clubs at the start of the season
+    :param goals: goals array from engine.club_arrays
+    :param fixtures: array with shape (n_fixtures, 2)
+    :param n_seasons: number of seasons to calculate
+    :param constants: league constants
+    :param workers: number of processes
+    :param entropy: seed of the whole run (random seed if it isn't given)
+    :param first_task: number of the first task (tasks before it were calculated before)
+    :param batch_size: number of seasons calculated at the same time in one task
+    :param task_size: number of seasons in one task
+    :param use_table: use the precomputed probability table instead of the exact formulas
+    :param tie_breakers: tie breakers used to rank the clubs (more info in ranking.py)
+    :param played: real results of the first fixtures that were already played (more info in engine.SeasonBatch)
+    :param profile: measure the stages of the calculations in every task (more info in metrics.py)
+    :param pool: pool of the processes from make_pool (workers is ignored if it is given)
+    :param static: elo doesn't change during the season (more info in engine.py)
+    :param use_kernel: use the compiled kernel if numba is installed (more info in kernel.py)
+    :param keep_rows: keep the row of every season in the totals (more info in store.py)
+    :return: iterator of the totals of the tasks
+    """
+    if entropy is None:
+        entropy = np.random.SeedSequence().entropy
+    key = engine.season_key(entropy)
+    sizes = [task_size] * (n_seasons // task_size) + ([n_seasons % task_size] if n_seasons % task_size else [])
+    starts = [task * task_size for task in range(first_task, first_task + len(sizes))]
+    if pool is None and workers <= 1:
+        for size, start in zip(sizes, starts):
+            yield simulate_totals(elo, goals, fixtures, size, constants, key, batch_size, use_table, tie_breakers,
+                                  played, profile, static, start, use_kernel, keep_rows)
+        return
+    with (ProcessPoolExecutor(max_workers=workers) if pool is None else contextlib.nullcontext(pool)) as executor:
+        tasks = [executor.submit(simulate_totals, elo, goals, fixtures, size, constants, key, batch_size, use_table,
+                                 tie_breakers, played, profile, static, start, use_kernel, keep_rows)
+                 for size, start in zip(sizes, starts)]
+        try:
+            for task in tasks:
+                yield task.result()
+        finally:
+            # caller stopped early (for example because the results converged), tasks that didn't start are dropped
+            for task in tasks:
+                task.cancel()
+
+
+def make_pool(workers: int) -> Optional[Executor]:
+    """
+    Function that makes the pool of the processes that can be shared by more runs. Processes stay alive between the
+    runs, so they are started only once and the probability tables (tables.get_table) they made are reused
+    :param workers: number of processes
+    :return: pool (it has to be closed with shutdown or used in the with statement), None if workers <= 1
+    """
+    return ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
@@ -0,0 +1,335 @@
+"""
+Queries over the store of the seasons (store.py), written as text. Question is one or more terms joined by 'and', with
+the optional condition (terms after 'given'):
+
+    Arsenal above Tottenham
+    Liverpool points >= 90
+    Arsenal top 4 and Chelsea top 4
+    Liverpool position == 1 and Manchester City position == 2
+    Norwich relegated given Norwich - Watford 2
+
+    python cli.py query "Arsenal above Tottenham" "Norwich relegated given Norwich - Watford 2" --league ...
+
+Terms are
+
+    CLUB above CLUB           club finishes above the other one
+    CLUB FIELD OP NUMBER      FIELD is points, goal_difference or position (1 is the first place), OP is one of
+                              <, <=, ==, !=, >=, >
+    CLUB champion             same as position == 1, also top N, bottom N and relegated (bottom relegation_places)
+    HOME - AWAY RESULT        result (1, X or 2) of one of the remaining games
+
+Rows of the store have all clubs of one season next to each other, so the question about one club would read the
+whole file. Index (StoreIndex, made once in the folder next to the store and again only when the store has more
+seasons) has the positions, points and goal differences in columns, one contiguous array for every club (.npy files
+read with memmap), and the counts of every value of every club. Term with one club is answered from the counts
+without reading any season, other terms read only the columns of their clubs (one byte or two for every season) and
+the results of the games are read from the store once. Boolean arrays of the terms are kept in memory (the last
+MASK_CACHE of them) and the answers are appended to the answers file of the index, so the question that was already
+asked is answered in microseconds and the one with known terms in milliseconds.
+"""
+
+import json
+import operator
+import os
+import re
+import shutil
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import store
+
+"""
+Columns of the index, in the same types as in the store
+"""
+FIELDS = ('position', 'points', 'goal_difference')
+
+"""
+Comparisons that can be used in the terms
+"""
+OPERATORS = {'<': operator.lt, '<=': operator.le, '==': operator.eq, '!=': operator.ne, '>=': operator.ge,
+             '>': operator.gt}
+
+"""
+Number of the boolean arrays of the terms kept in memory
+"""
+MASK_CACHE = 32
+
+"""
+Patterns of the terms (club names can have spaces, so the words around them decide)
+"""
+GAME_TERM = re.compile(r'^(?P<home>.+?) - (?P<away>.+) (?P<result>[1X2])$')
+ABOVE_TERM = re.compile(r'^(?P<club>.+?) above (?P<other>.+)$')
+COMPARE_TERM = re.compile(r'^(?P<club>.+?) (?P<field>points|goal_difference|position) (?P<op><=|>=|==|!=|<|>) '
+                          r'(?P<value>-?\d+)$')
+NAMED_TERM = re.compile(r'^(?P<club>.+?) (?P<name>champion|relegated|top (?P<top>\d+)|bottom (?P<bottom>\d+))$')
+
+
+def index_folder(store_file: str) -> str:
+    """
+    Function that makes the name of the index folder of the store
+    :param store_file: store file name
+    :return: folder name (store file name with .index)
+    """
+    return os.path.splitext(store_file)[0] + '.index'
+
+
+class Term:
+    """
+    Class that represents one term of the question. kind is 'compare' (clubs[0], field, op, value, position is counted
+    from 0 like in the store), 'above' (clubs[0] finishes above clubs[1]) or 'game' (game is the number of the game in
+    the store, value is the outcome code), key is the term written the same way every time
+    """
+    def __init__(self, kind: str, key: str, clubs: Tuple[int, ...] = (), field: str = None, op: str = None,
+                 value: int = None, game: int = None) -> None:
+        self.kind = kind
+        self.key = key
+        self.clubs = clubs
+        self.field = field
+        self.op = op
+        self.value = value
+        self.game = game
+
+
+def parse_term(text: str, seasons: store.SeasonStore, relegation_places: int) -> Term:
+    """
+    Function that parses one term
+    :param text: text of the term
+    :param seasons: store the term is about (names of the clubs and the remaining games)
+    :param relegation_places: number of the relegated clubs
+    :return: term
+    """
+    def club(name: str) -> int:
+        if name not in seasons.index:
+            raise ValueError('{} is not a club of the store'.format(name))
+        return seasons.index[name]
+
+    def compare(number: int, field: str, op: str, value: int) -> Term:
+        stored = value - 1 if field == 'position' else value
+        return Term('compare', '{} {} {} {}'.format(seasons.names[number], field, op, value), (number,), field, op,
+                    stored)
+
+    text = ' '.join(text.split())
+    match = GAME_TERM.match(text)
+    if match:
+        game = (club(match['home']), club(match['away']))
+        if game not in seasons.games:
+            raise ValueError('{} - {} is not one of the remaining games'.format(match['home'], match['away']))
+        return Term('game', '{} - {} {}'.format(match['home'], match['away'], match['result']), game,
+                    value='1X2'.index(match['result']), game=seasons.games.index(game))
+    match = ABOVE_TERM.match(text)
+    if match:
+        clubs = (club(match['club']), club(match['other']))
+        return Term('above', '{} above {}'.format(*(seasons.names[number] for number in clubs)), clubs)
+    match = COMPARE_TERM.match(text)
+    if match:
+        return compare(club(match['club']), match['field'], match['op'], int(match['value']))
+    match = NAMED_TERM.match(text)
+    if match:
+        number, n_clubs = club(match['club']), len(seasons.names)
+        if match['name'] == 'champion':
+            return compare(number, 'position', '==', 1)
+        if match['name'] == 'relegated':
+            return compare(number, 'position', '>', n_clubs - relegation_places)
+        if match['top']:
+            return compare(number, 'position', '<=', int(match['top']))
+        return compare(number, 'position', '>', n_clubs - int(match['bottom']))
+    raise ValueError('{!r} is not a term (more info in query.py)'.format(text))
+
+
+def parse(question: str, seasons: store.SeasonStore, relegation_places: int) -> Tuple[List[Term], List[Term]]:
+    """
+    Function that parses the question
+    :param question: terms joined by 'and', with the optional condition after 'given'
+    :param seasons: store the question is about
+    :param relegation_places: number of the relegated clubs
+    :return: tuple (terms, terms of the condition)
+    """
+    parts = re.split(r'\s+given\s+', question.strip())
+    if len(parts) > 2:
+        raise ValueError('Question can have only one given')
+    terms = [[parse_term(text, seasons, relegation_places) for text in re.split(r'\s+and\s+', part)]
+             for part in parts]
+    return terms[0], terms[1] if len(terms) > 1 else []
+
+
+class StoreIndex:
+    """
+    Class that represents the index of the store: columns[field] has shape (n_clubs, n_seasons) and counts[field][i, j]
+    is the number of seasons where the club i has the value j + offsets[field]. It is made from the first n_seasons of
+    the store if the folder has no index of the same run and number of seasons
+    """
+    def __init__(self, seasons: store.SeasonStore, folder: str = None, chunk_size: int = store.CHUNK_SIZE) -> None:
+        self.seasons = seasons
+        self.folder = index_folder(seasons.file) if folder is None else folder
+        self.n_seasons = len(seasons)
+        if not self.n_seasons:
+            raise ValueError('{} has no seasons'.format(seasons.file))
+        if self.info() != {'fingerprint': seasons.fingerprint, 'entropy': seasons.entropy, 'seasons': self.n_seasons}:
+            self.build(chunk_size)
+        self.columns = {field: np.load(self.file(field + '.npy'), mmap_mode='r') for field in FIELDS}
+        with np.load(self.file('counts.npz')) as counts:
+            self.counts = {field: counts[field] for field in FIELDS}
+            self.offsets = {field: int(counts[field + '_offset']) for field in FIELDS}
+
+    def file(self, name: str) -> str:
+        """
+        Method that makes the name of the file in the index folder
+        :param name: name of the file
+        :return: path of the file
+        """
+        return os.path.join(self.folder, name)
+
+    def info(self) -> Optional[Dict]:
+        """
+        Method that reads what the index in the folder was made from
+        :return: dictionary with fingerprint, entropy and seasons (None if there is no index)
+        """
+        try:
+            with open(self.file('info.json'), encoding='utf-8') as handle:
+                return json.load(handle)
+        except (OSError, ValueError):
+            return None
+
+    def build(self, chunk_size: int = store.CHUNK_SIZE) -> None:
+        """
+        Method that makes the index from the store (old index and answers are removed, info.json is written last, so
+        the index that wasn't finished is made again)
+        :param chunk_size: number of seasons read at the time
+        """
+        shutil.rmtree(self.folder, ignore_errors=True)
+        os.makedirs(self.folder)
+        n_clubs = len(self.seasons.names)
+        columns = {field: np.lib.format.open_memmap(self.file(field + '.npy'), mode='w+',
+                                                    dtype=self.seasons.dtype[field].base,
+                                                    shape=(n_clubs, self.n_seasons)) for field in FIELDS}
+        low = {field: np.iinfo(np.int64).max for field in FIELDS}
+        high = {field: np.iinfo(np.int64).min for field in FIELDS}
+        start = 0
+        for rows in self.seasons.chunks(chunk_size):
+            rows = rows[:self.n_seasons - start]
+            for field in FIELDS:
+                columns[field][:, start:start + len(rows)] = rows[field].T
+                low[field] = min(low[field], int(rows[field].min()))
+                high[field] = max(high[field], int(rows[field].max()))
+            start += len(rows)
+            if start == self.n_seasons:
+                break
+        counts = {}
+        for field in FIELDS:
+            counts[field] = np.zeros((n_clubs, high[field] - low[field] + 1), dtype=np.int64)
+            for first in range(0, self.n_seasons, chunk_size):
+                values = columns[field][:, first:first + chunk_size].astype(np.int64) - low[field]
+                for club in range(n_clubs):
+                    counts[field][club] += np.bincount(values[club], minlength=counts[field].shape[1])
+            counts[field + '_offset'] = np.array(low[field])
+            columns[field].flush()
+        np.savez(self.file('counts.npz'), **counts)
+        with open(self.file('info.json'), 'w', encoding='utf-8') as handle:
+            json.dump({'fingerprint': self.seasons.fingerprint, 'entropy': self.seasons.entropy,
+                       'seasons': self.n_seasons}, handle)
+
+    def count(self, term: Term) -> Optional[int]:
+        """
+        Method that counts the seasons of the term from the counts, without reading the seasons
+        :param term: term
+        :return: number of seasons (None if the term can't be counted this way)
+        """
+        if term.kind != 'compare':
+            return None
+        values = np.arange(self.counts[term.field].shape[1]) + self.offsets[term.field]
+        return int(self.counts[term.field][term.clubs[0]][OPERATORS[term.op](values, term.value)].sum())
+
+    def mask(self, term: Term, chunk_size: int = store.CHUNK_SIZE) -> np.ndarray:
+        """
+        Method that calculates in which seasons the term is true
+        :param term: term
+        :param chunk_size: number of seasons read at the time from the store (only for the games)
+        :return: boolean array with shape (n_seasons,)
+        """
+        if term.kind == 'compare':
+            return OPERATORS[term.op](self.columns[term.field][term.clubs[0]], term.value)
+        if term.kind == 'above':
+            return self.columns['position'][term.clubs[0]] < self.columns['position'][term.clubs[1]]
+        mask = np.empty(self.n_seasons, dtype=bool)
+        start = 0
+        for rows in self.seasons.chunks(chunk_size):
+            rows = rows[:self.n_seasons - start]
+            mask[start:start + len(rows)] = store.game_outcomes(rows, term.game) == term.value
+            start += len(rows)
+            if start == self.n_seasons:
+                break
+        return mask
+
+
+class QueryEngine:
+    """
+    Class that answers the questions about the store, masks are the boolean arrays of the last terms and answers are
+    all answers of the index (also the ones from the answers file)
+    """
+    def __init__(self, seasons: store.SeasonStore, relegation_places: int = 3, folder: str = None) -> None:
+        self.seasons = seasons
+        self.relegation_places = relegation_places
+        self.index = StoreIndex(seasons, folder)
+        self.masks = OrderedDict()
+        self.answers = {}
+        if os.path.isfile(self.index.file('answers.jsonl')):
+            with open(self.index.file('answers.jsonl'), encoding='utf-8') as handle:
+                for line in handle:
+                    if line.strip():
+                        record = json.loads(line)
+                        self.answers[record['key']] = record['answer']
+
+    def mask(self, term: Term) -> np.ndarray:
+        """
+        Method that returns the boolean array of the term from the memory or calculates it
+        :param term: term
+        :return: boolean array with shape (n_seasons,)
+        """
+        if term.key in self.masks:
+            self.masks.move_to_end(term.key)
+        else:
+            self.masks[term.key] = self.index.mask(term)
+            if len(self.masks) > MASK_CACHE:
+                self.masks.popitem(last=False)
+        return self.masks[term.key]
+
+    def count(self, terms: List[Term]) -> int:
+        """
+        Method that counts the seasons where all terms are true
+        :param terms: terms
+        :return: number of seasons
+        """
+        if not terms:
+            return self.index.n_seasons
+        if len(terms) == 1 and self.index.count(terms[0]) is not None:
+            return self.index.count(terms[0])
+        mask = self.mask(terms[0])
+        for term in terms[1:]:
+            mask = mask & self.mask(term)
+        return int(np.count_nonzero(mask))
+
+    def ask(self, question: str) -> Dict:
+        """
+        Method that answers the question
+        :param question: text of the question (more info at the top of query.py)
+        :return: dictionary with question, probability, its standard error, hits (seasons where the question is true),
+                 seasons (seasons where the condition is true) and cached (True if the answer was already known),
+                 probability and error are None if the condition is true in no season
+        """
+        terms, given = parse(question, self.seasons, self.relegation_places)
+        key = ' and '.join(sorted({term.key for term in terms}))
+        if given:
+            key += ' given ' + ' and '.join(sorted({term.key for term in given}))
+        if key in self.answers:
+            return dict(self.answers[key], question=question, cached=True)
+        unique = list({term.key: term for term in terms + given}.values())
+        seasons = self.count(list({term.key: term for term in given}.values()))
+        hits = self.count(unique)
+        probability = hits / seasons if seasons else None
+        error = (probability * (1 - probability) / seasons) ** 0.5 if seasons else None
+        answer = {'probability': probability, 'error': error, 'hits': hits, 'seasons': seasons}
+        self.answers[key] = answer
+        with open(self.index.file('answers.jsonl'), 'a', encoding='utf-8') as handle:
+            handle.write(json.dumps({'key': key, 'answer': answer}) + '\n')
+        return dict(answer, question=question, cached=False)
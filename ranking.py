@@ -0,0 +1,108 @@
+"""
+Ranking of the simulated seasons. Clubs are sorted by the list of tie breakers, first one decides the order and every
+next one is used only for the clubs that are equal in all the ones before it. Premier League uses points, goal
+difference and goals scored, but a lot of leagues (Spain, Italy...) look at the games between the tied clubs first, so
+head to head tie breakers are here too. All seasons of the batch are sorted with one np.lexsort and the placings are
+counted with one np.bincount, so there are no python loops over the seasons or the clubs.
+"""
+
+import numpy as np
+from typing import Dict, Sequence
+
+"""
+Tie breakers of the Premier League (and the order sort_standings uses)
+"""
+DEFAULT_TIE_BREAKERS = ('points', 'goal_difference', 'goals_scored')
+
+"""
+Points the home and away club get for outcome codes 0 ('1'), 1 ('X') and 2 ('2')
+"""
+HOME_POINTS = np.array([3, 1, 0], dtype=np.float32)
+AWAY_POINTS = np.array([0, 1, 3], dtype=np.float32)
+
+
+def head_to_head(batch, tied: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Function that calculates the mini table of the games between the clubs that are tied. Clubs are tied if they have
+    the same value in the tied array, so if three clubs have the same points all games between those three clubs count
+    :param batch: engine.SeasonBatch after count_results
+    :param tied: array with shape (n_seasons, n_clubs), clubs with the same value in the same season are tied
+    :return: dictionary with arrays of points, goal difference and goals scored in those games
+    """
+    home, away = batch.fixtures[:, 0], batch.fixtures[:, 1]
+    counts = (tied[:, home] == tied[:, away]).astype(np.float32)
+    home_scored = batch.home_scored * counts
+    away_scored = batch.away_scored * counts
+    home_points = HOME_POINTS[batch.outcome] * counts
+    away_points = AWAY_POINTS[batch.outcome] * counts
+    return {'head_to_head_points': home_points @ batch.home_games + away_points @ batch.away_games,
+            'head_to_head_goal_difference': (home_scored - away_scored) @ (batch.home_games - batch.away_games),
+            'head_to_head_goals_scored': home_scored @ batch.home_games + away_scored @ batch.away_games}
+
+
+def criteria(batch, tie_breakers: Sequence[str]) -> list:
+    """
+    Function that makes the array for every tie breaker, in every array bigger number is better
+    :param batch: engine.SeasonBatch after count_results
+    :param tie_breakers: names of the tie breakers
+    :return: list of arrays with shape (n_seasons, n_clubs) in the same order as tie_breakers
+    """
+    keys = []
+    mini_table = None
+    for name in tie_breakers:
+        if name.startswith('head_to_head'):
+            if mini_table is None:
+                # clubs are tied if they are equal in every tie breaker before the first head to head one
+                if len(keys) == 1:
+                    tied = keys[0]
+                elif keys:
+                    tied = np.unique(np.stack(keys, axis=-1).reshape(-1, len(keys)), axis=0,
+                                     return_inverse=True)[1].reshape(batch.points.shape)
+                else:
+                    tied = np.zeros(batch.points.shape)
+                mini_table = head_to_head(batch, tied)
+            keys.append(mini_table[name])
+        elif name == 'points':
+            keys.append(batch.points)
+        elif name == 'goal_difference':
+            keys.append(batch.goals_scored - batch.goals_received)
+        elif name == 'goals_scored':
+            keys.append(batch.goals_scored)
+        elif name == 'goals_received':
+            keys.append(-batch.goals_received)
+        elif name == 'wins':
+            keys.append(batch.wins)
+        elif name == 'away_goals_scored':
+            keys.append(batch.away_scored @ batch.away_games)
+        else:
+            raise ValueError('Unknown tie breaker: {}'.format(name))
+    return keys
+
+
+def rank_seasons(batch, tie_breakers: Sequence[str] = DEFAULT_TIE_BREAKERS) -> np.ndarray:
+    """
+    Function that sorts every season of the batch (clubs that are equal in every tie breaker keep their original order,
+    same as in sort_standings)
+    :param batch: engine.SeasonBatch after count_results
+    :param tie_breakers: names of the tie breakers, first one is the most important
+    :return: array with shape (n_seasons, n_clubs) where order[i, j] is the index of the club that finished j-th in
+             season i
+    """
+    # lexsort sorts by the last key first and from the smallest to the biggest, so keys are reversed and negative
+    return np.lexsort([-key for key in reversed(criteria(batch, tie_breakers))], axis=-1)
+
+
+def count_placings(order: np.ndarray, weights: np.ndarray = None) -> np.ndarray:
+    """
+    Function that counts how many times each club finished on each position
+    :param order: array from rank_seasons
+    :param weights: integer array with the same shape as order, if it is given weights[i, j] is added instead of 1 for
+                    the club that finished j-th in the season i
+    :return: array with shape (n_clubs, n_positions) where placings[i, j] is the number of seasons club with index i
+             finished on position j (or the sum of its weights)
+    """
+    n_clubs = order.shape[1]
+    positions = np.broadcast_to(np.arange(n_clubs), order.shape)
+    counts = np.bincount((order * n_clubs + positions).ravel(), None if weights is None else weights.ravel(),
+                         minlength=n_clubs * n_clubs)
+    return counts.astype(np.int64).reshape(n_clubs, n_clubs)
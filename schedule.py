@@ -0,0 +1,131 @@
+"""
+Fixtures of the league. Instead of writing every game in the code (like play_all_games used to do), the games are read
+from CSV or JSON file where every game has matchday, home club name and away club name, for example:
+
+CSV:  matchday,home,away          JSON: [{"matchday": 1, "home": "Liverpool", "away": "Norwich"}, ...]
+      1,Liverpool,Norwich
+
+During the season the results of the games that were already played are read from the same kind of file with two
+more columns, home_goals and away_goals (games that weren't played yet have them empty, so it can be the fixtures file
+itself). For the leagues that don't have published calendar yet, round_robin makes the double round robin schedule.
+Games are returned as the array of club indexes (index of the club is the position of its name in the list of names),
+which is what the batch engine needs.
+"""
+
+import csv
+import json
+import os
+import numpy as np
+from typing import Dict, List, Tuple
+
+
+def read_rows(file: str) -> List[Dict]:
+    """
+    Function that reads all rows of the file, format is decided by the file extension (.json or .csv)
+    :param file: file name
+    :return: list of dictionaries (column name: value)
+    """
+    with open(file, newline='', encoding='utf-8') as handle:
+        if os.path.splitext(file)[1].lower() == '.json':
+            return json.load(handle)
+        return list(csv.DictReader(handle))
+
+
+def read_fixtures(file: str) -> List[Tuple[int, str, str]]:
+    """
+    Function that reads the fixtures from the file, format is decided by the file extension (.json or .csv)
+    :param file: file name
+    :return: list of tuples (matchday, home club name, away club name) sorted by the matchday (games of the same
+             matchday keep the order from the file)
+    """
+    rows = read_rows(file)
+    games = [(int(row['matchday']), row['home'].strip(), row['away'].strip()) for row in rows]
+    return sorted(games, key=lambda game: game[0])
+
+
+def read_results(file: str) -> List[Tuple[int, str, str, int, int]]:
+    """
+    Function that reads the results of the games that were already played, games without goals are skipped
+    :param file: file name (same format as for read_fixtures, with home_goals and away_goals)
+    :return: list of tuples (matchday, home club name, away club name, home goals, away goals) sorted by the matchday
+    """
+    rows = read_rows(file)
+    results = [(int(row['matchday']), row['home'].strip(), row['away'].strip(), int(row['home_goals']),
+                int(row['away_goals'])) for row in rows if str(row.get('home_goals', '')).strip() not in ('', 'None')]
+    return sorted(results, key=lambda result: result[0])
+
+
+def remaining_games(games: List[Tuple[int, str, str]],
+                    results: List[Tuple[int, str, str, int, int]]) -> List[Tuple[int, str, str]]:
+    """
+    Function that removes the games that were already played from the fixtures (game is found by its home and away
+    club, in the league every pair plays only once on the same field)
+    :param games: list of tuples (matchday, home club name, away club name)
+    :param results: list from read_results
+    :return: games that weren't played yet, in the same order
+    """
+    played = {(home, away) for _, home, away, _, _ in results}
+    unknown = played - {(home, away) for _, home, away in games}
+    if unknown:
+        raise ValueError('Results of the games that are not in the fixtures: {}'.format(
+            ', '.join('{} - {}'.format(home, away) for home, away in sorted(unknown))))
+    return [game for game in games if (game[1], game[2]) not in played]
+
+
+def index_fixtures(games: List[Tuple[int, str, str]], names: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Function that converts the club names to the club indexes
+    :param games: list of tuples (matchday, home club name, away club name)
+    :param names: names of the clubs, index of the name in this list is the index of the club
+    :return: tuple (fixtures array with shape (n_fixtures, 2) where every row is (home club index, away club index),
+             matchdays array with shape (n_fixtures,))
+    """
+    index = {name: i for i, name in enumerate(names)}
+    unknown = {name for _, home, away in games for name in (home, away) if name not in index}
+    if unknown:
+        raise KeyError('Clubs not in the league: {}'.format(', '.join(sorted(unknown))))
+    fixtures = np.array([(index[home], index[away]) for _, home, away in games], dtype=np.intp).reshape(-1, 2)
+    matchdays = np.array([matchday for matchday, _, _ in games], dtype=np.int16)
+    return fixtures, matchdays
+
+
+def load_fixtures(file: str, names: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Function that reads the fixtures from the file and converts them to club indexes
+    :param file: file name
+    :param names: names of the clubs
+    :return: tuple (fixtures, matchdays), see index_fixtures
+    """
+    return index_fixtures(read_fixtures(file), names)
+
+
+def round_robin(n_clubs: int, legs: int = 2) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Function that makes the round robin schedule with the circle method (first club stays in place and the others
+    rotate around it). Every club plays every other club once in each leg, in the second leg home and away clubs are
+    switched. If number of clubs is odd, one club has the break every matchday
+    :param n_clubs: number of clubs in the league
+    :param legs: how many times clubs play each other
+    :return: tuple (fixtures, matchdays), same as load_fixtures
+    """
+    clubs = list(range(n_clubs)) + ([-1] if n_clubs % 2 else [])
+    n = len(clubs)
+    first_leg = []
+    for matchday in range(n - 1):
+        for i in range(n // 2):
+            home, away = clubs[i], clubs[n - 1 - i]
+            if home == -1 or away == -1:
+                continue
+            # first club would always play at home, so switch it every matchday, others are switched by the position
+            if (i == 0 and matchday % 2) or (i > 0 and i % 2):
+                home, away = away, home
+            first_leg.append((matchday + 1, home, away))
+        clubs = [clubs[0], clubs[-1]] + clubs[1:-1]
+    games = []
+    for leg in range(legs):
+        for matchday, home, away in first_leg:
+            games.append((matchday + leg * (n - 1), home, away) if leg % 2 == 0 else
+                         (matchday + leg * (n - 1), away, home))
+    fixtures = np.array([(home, away) for _, home, away in games], dtype=np.intp).reshape(-1, 2)
+    matchdays = np.array([matchday for matchday, _, _ in games], dtype=np.int16)
+    return fixtures, matchdays
@@ -0,0 +1,292 @@
+"""
+Local forecast service, so other programs can ask for the forecast over HTTP instead of starting the whole run every
+time. It keeps the clubs (Club objects with the elo and the results of the played games), the played results and the
+sums of the calculated seasons in memory:
+
+    python cli.py serve --port 8000 --workers 4
+
+    GET  /forecast    latest finished forecast (rows of export.rows, with the number of results it was made with)
+    GET  /status      number of the results, seasons of the forecast that is being calculated and its error
+    GET  /clubs       elo and the table of the played games
+    POST /results     new result, for example {"home": "Liverpool", "away": "Norwich", "home_goals": 4, "away_goals": 1}
+
+New result is added to the clubs with record_result (elo_change and Club.add_result, same as the played results in
+Main.current_season) and the forecast of the remaining games is calculated again in the background, on the pool of
+processes (task after task, same seasons as Main.simulate with the same seed). Until it converges the clients get
+the last finished forecast at once, its results field says how many results it knows. Result that comes during the
+calculations stops them and they start again with it. Every finished forecast is saved to the checkpoint file, so
+after the restart the service has the forecast without any calculations (same as cli.py report). Results in the
+checkpoint file are never continued with the other seed (same as Main.simulate), the service with the other seed
+doesn't start and the new result that would continue them gets 400.
+
+It is the league from Main.py (clubs_in_league and CONSTANTS), the HTTP part is the small asyncio server with JSON
+answers, so nothing has to be installed.
+"""
+
+import asyncio
+import copy
+import json
+import numpy as np
+from http import HTTPStatus
+from typing import Dict, List, Tuple
+
+import Main
+import checkpoint
+import convergence
+import engine
+import export
+import league
+import parallel
+import schedule
+
+"""
+Address the service listens on
+"""
+HOST = '127.0.0.1'
+PORT = 8000
+
+
+class ForecastService:
+    """
+    Class that holds the state of the service. teams and results are the played games, remaining are the games that
+    weren't played yet, generation is the number of the inputs (it changes with every new result), forecast is the
+    last finished forecast and progress is the state of the calculations
+    """
+    def __init__(self, workers: int = 1, max_seasons: int = Main.MAX, seed: int = None,
+                 tolerance: float = Main.TOLERANCE, static: bool = Main.STATIC_RATINGS,
+                 fixtures_file: str = Main.FIXTURES_FILE, results_file: str = Main.RESULTS_FILE,
+                 checkpoint_file: str = Main.CHECKPOINT_FILE) -> None:
+        self.workers = workers
+        self.max_seasons = max_seasons
+        self.seed = seed
+        self.tolerance = tolerance
+        self.static = static
+        self.teams = copy.deepcopy(Main.clubs_in_league)
+        self.results = schedule.read_results(results_file) if results_file else []
+        Main.apply_results(self.teams, self.results)
+        self.remaining = schedule.remaining_games(schedule.read_fixtures(fixtures_file), self.results)
+        self.checkpoint_file = checkpoint_file
+        self.season = self.current_season()
+        self.check_seed(checkpoint.load_checkpoint(checkpoint_file), self.season)
+        self.generation = 0
+        self.forecast = None
+        self.progress = {}
+        self.pool = None
+        self.task = None
+
+    def current_season(self, teams: Dict[str, Main.Club] = None, results: List[tuple] = None,
+                       remaining: List[tuple] = None) -> league.League:
+        """
+        Method that makes the league of the clubs and results (current ones of the service if they aren't given)
+        :param teams: dictionary of the clubs
+        :param results: played results
+        :param remaining: games that weren't played yet
+        :return: league for the batch engine
+        """
+        season = Main.season_from_clubs(self.teams if teams is None else teams,
+                                        self.results if results is None else results,
+                                        self.remaining if remaining is None else remaining)
+        season.checkpoint_file = self.checkpoint_file
+        return season
+
+    def check_seed(self, state: checkpoint.Checkpoint, season: league.League) -> None:
+        """
+        Method that checks that the results of the league in the checkpoint can be continued with the seed of the
+        service, ValueError is raised if they were calculated with the other seed
+        :param state: checkpoint (None if there is no checkpoint file)
+        :param season: league that is going to be calculated
+        """
+        if (self.seed is not None and state is not None and state.entropy != self.seed and
+                state.fingerprint == Main.run_fingerprint(season, self.static)):
+            raise ValueError('{} was calculated with the seed {}, not {}'.format(season.checkpoint_file, state.entropy,
+                                                                                 self.seed))
+
+    def start(self) -> None:
+        """
+        Method that starts the pool of the processes and the first calculations (it has to be called in the event loop)
+        """
+        self.pool = parallel.make_pool(self.workers)
+        self.task = asyncio.ensure_future(self.refresh(self.season, self.generation))
+
+    def close(self) -> None:
+        """
+        Method that stops the calculations and the pool of the processes
+        """
+        if self.task is not None:
+            self.task.cancel()
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def add_result(self, home: str, away: str, home_goals: int, away_goals: int) -> int:
+        """
+        Method that adds the result of the remaining game and starts the new calculations (nothing changes if the
+        result is not valid or the calculations can't be started, more info in check_seed)
+        :param home: name of the home club
+        :param away: name of the away club
+        :param home_goals: goals of the home club
+        :param away_goals: goals of the away club
+        :return: new generation
+        """
+        if home_goals < 0 or away_goals < 0:
+            raise ValueError('Goals can not be negative')
+        games = [game for game in self.remaining if game[1:] == (home, away)]
+        if not games:
+            raise ValueError('{} - {} is not one of the remaining games'.format(home, away))
+        teams = copy.deepcopy(self.teams)
+        Main.record_result(teams[home], teams[away], (home_goals, away_goals), Main.probability_table())
+        remaining = [game for game in self.remaining if game is not games[0]]
+        results = self.results + [(games[0][0], home, away, home_goals, away_goals)]
+        season = self.current_season(teams, results, remaining)
+        self.check_seed(checkpoint.load_checkpoint(self.checkpoint_file), season)
+        self.teams, self.remaining, self.results, self.season = teams, remaining, results, season
+        self.generation += 1
+        if self.task is not None:
+            self.task.cancel()
+        self.task = asyncio.ensure_future(self.refresh(self.season, self.generation))
+        return self.generation
+
+    def make_forecast(self, totals: engine.SeasonTotals, season: league.League, generation: int,
+                      converged: bool) -> Dict:
+        """
+        Method that makes the forecast the clients get
+        :param totals: sums of the calculated seasons
+        :param season: league the totals belong to
+        :param generation: generation of the inputs
+        :param converged: True if the results are within the tolerance
+        :return: dictionary with generation, results, seasons, converged and clubs (rows of export.rows)
+        """
+        return {'generation': generation, 'results': len(season.played), 'seasons': totals.n_seasons,
+                'converged': converged, 'clubs': export.rows(export.forecast_arrays(totals, season), season)}
+
+    async def refresh(self, season: league.League, generation: int) -> None:
+        """
+        Coroutine that calculates the forecast of the league, tasks are calculated on the pool (or in the thread if
+        there is only one worker), so the server keeps answering. Results in the checkpoint file are continued if they
+        were calculated with the same inputs
+        :param season: league to calculate
+        :param generation: generation of the inputs
+        """
+        loop = asyncio.get_running_loop()
+        state = Main.load_results(season, seed=self.seed, static=self.static)
+        self.check_seed(state, season)
+        if state.fingerprint != Main.run_fingerprint(season, self.static):
+            state = checkpoint.Checkpoint(engine.SeasonTotals(len(season.clubs)),
+                                          np.random.SeedSequence(self.seed).entropy, 0,
+                                          Main.run_fingerprint(season, self.static))
+        totals, key = state.totals, engine.season_key(state.entropy)
+        rule = convergence.StoppingRule(self.tolerance, season.events, Main.AVERAGE_TOLERANCE)
+        while not rule.converged(totals) and totals.n_seasons < self.max_seasons:
+            left = self.max_seasons - totals.n_seasons
+            sizes = [min(parallel.TASK_SIZE, left - i * parallel.TASK_SIZE)
+                     for i in range(min(max(self.workers, 1), -(-left // parallel.TASK_SIZE)))]
+            futures = [loop.run_in_executor(self.pool, parallel.simulate_totals, season.clubs.elo, season.clubs.goals,
+                                            season.fixtures, size, season.constants, key, Main.BATCH_SIZE,
+                                            Main.USE_TABLES, season.tie_breakers, season.played, False, self.static,
+                                            (state.next_task + i) * parallel.TASK_SIZE, Main.USE_KERNEL)
+                       for i, size in enumerate(sizes)]
+            try:
+                for future in futures:
+                    totals.merge(await future)
+                    state.next_task += 1
+            finally:
+                # new result came (the task was cancelled), tasks that didn't start are dropped
+                for future in futures:
+                    future.cancel()
+            self.progress = {'generation': generation, 'seasons': totals.n_seasons,
+                             'error_ratio': rule.worst_ratio(totals)}
+        self.forecast = self.make_forecast(totals, season, generation, rule.converged(totals))
+        self.progress = {'generation': generation, 'seasons': totals.n_seasons, 'error_ratio': rule.worst_ratio(totals)}
+        await loop.run_in_executor(None, Main.save_results, state, season.checkpoint_file)
+
+    def status(self) -> Dict:
+        """
+        Method that makes the status of the service
+        :return: dictionary with the generation, results, calculating (True until the forecast of this generation is
+                 finished), forecast_generation, the progress of the calculations and the error if they failed
+        """
+        failed = self.task is not None and self.task.done() and not self.task.cancelled() and self.task.exception()
+        return {'generation': self.generation, 'results': len(self.results),
+                'calculating': self.task is not None and not self.task.done(),
+                'forecast_generation': None if self.forecast is None else self.forecast['generation'],
+                'progress': self.progress, 'error': repr(failed) if failed else None}
+
+    def clubs(self) -> List[Dict]:
+        """
+        Method that makes the table of the played games
+        :return: list of dictionaries with the name, elo and the stats of every club
+        """
+        return [{'club': club.name, 'elo': float(club.elo), 'games': club.games, 'points': club.points,
+                 'wins': club.wins, 'draws': club.draws, 'losses': club.losses, 'goals_scored': club.goals_scored,
+                 'goals_received': club.goals_received} for club in self.teams.values()]
+
+    def route(self, method: str, path: str, body: bytes) -> Tuple[HTTPStatus, object]:
+        """
+        Method that answers the request
+        :param method: HTTP method
+        :param path: path of the request (query string is ignored)
+        :param body: body of the request
+        :return: tuple (status, JSON answer)
+        """
+        path = path.split('?')[0].rstrip('/')
+        if method == 'GET' and path == '/forecast':
+            if self.forecast is None:
+                return HTTPStatus.SERVICE_UNAVAILABLE, dict(self.status(), error='First forecast is not finished yet')
+            return HTTPStatus.OK, self.forecast
+        if method == 'GET' and path == '/status':
+            return HTTPStatus.OK, self.status()
+        if method == 'GET' and path == '/clubs':
+            return HTTPStatus.OK, self.clubs()
+        if method == 'POST' and path == '/results':
+            try:
+                result = json.loads(body.decode('utf-8'))
+                generation = self.add_result(result['home'], result['away'], int(result['home_goals']),
+                                             int(result['away_goals']))
+            except (ValueError, KeyError, TypeError, AttributeError) as error:
+                return HTTPStatus.BAD_REQUEST, {'error': str(error)}
+            return HTTPStatus.ACCEPTED, {'generation': generation, 'results': len(self.results)}
+        if path in ('/forecast', '/status', '/clubs', '/results'):
+            return HTTPStatus.METHOD_NOT_ALLOWED, {'error': '{} is not allowed for {}'.format(method, path)}
+        return HTTPStatus.NOT_FOUND, {'error': '{} not found'.format(path)}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Coroutine that reads one HTTP request and writes the answer (connection is closed after it)
+        :param reader: stream of the request
+        :param writer: stream of the answer
+        """
+        try:
+            method, path, _ = (await reader.readline()).decode('latin-1').split(' ', 2)
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode('latin-1')
+                if line in ('\r\n', '\n', ''):
+                    break
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get('content-length', 0)))
+            status, answer = self.route(method, path, body)
+        except (ValueError, asyncio.IncompleteReadError):
+            status, answer = HTTPStatus.BAD_REQUEST, {'error': 'Request is not valid HTTP'}
+        data = json.dumps(answer).encode('utf-8')
+        writer.write('HTTP/1.1 {} {}\r\nContent-Type: application/json\r\nContent-Length: {}\r\nConnection: close'
+                     '\r\n\r\n'.format(status.value, status.phrase, len(data)).encode('latin-1') + data)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+async def serve(service: ForecastService, host: str = HOST, port: int = PORT) -> None:
+    """
+    Coroutine that runs the service until it is stopped
+    :param service: state of the service
+    :param host: address the server listens on
+    :param port: port the server listens on
+    """
+    service.start()
+    try:
+        server = await asyncio.start_server(service.handle, host, port)
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
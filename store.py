@@ -0,0 +1,225 @@
+"""
+Optional store of every calculated season. SeasonTotals keeps only the sums, so questions like "P(Arsenal finishes
+above Tottenham)", "P(at least 90 points)" or "P(both clubs in the top 4)" would need new calculations. With the store
+on (STORE_SEASONS in Main.py, --store in cli.py) every season is also written as one compact row: number of the season,
+then points (int16), goal difference (int16) and position (int8, 0 is the first place) of every club and the outcome
+codes of the remaining games (2 bits each, 4 games in one byte), so one whole season of the league with 20 clubs takes
+199 bytes and 10 million seasons take about 2 GB.
+
+File is the JSON header (names of the clubs, remaining games and the fingerprint and seed of the run, padded to the
+multiple of HEADER_BLOCK bytes) and then the rows. Rows are appended in chunks (one task of the run at the time) and
+they are read with numpy.memmap, so queries go over the file in chunks and never load all seasons into memory:
+
+    seasons = store.SeasonStore('premier_league_2019.seasons')
+    arsenal, tottenham = seasons.index['Arsenal'], seasons.index['Tottenham']
+    seasons.probability(lambda rows: rows['position'][:, arsenal] < rows['position'][:, tottenham])
+    seasons.probability(lambda rows: rows['points'][:, arsenal] >= 90)
+
+Queries written as text, with the indexes and the cache of the answers, are in query.py.
+
+Seasons have the same numbers as in the run (more info in engine.season_generator), so any of them can be calculated
+again with cli.py replay. Store has only the seasons that were calculated while it was on. When the run continues
+after the crash, rows of the seasons that are calculated again are removed first (they are the same seasons).
+"""
+
+import json
+import os
+import numpy as np
+from typing import Callable, Iterator, List, Tuple
+
+"""
+First bytes of the store file (then the size of the header as 16 digits) and the size the header is padded to
+"""
+MAGIC = b'SEASONS2'
+HEADER_BLOCK = 4096
+
+"""
+Number of seasons read at the time by the queries
+"""
+CHUNK_SIZE = 1000000
+
+
+def row_dtype(n_clubs: int, n_games: int) -> np.dtype:
+    """
+    Function that makes the type of one row of the store
+    :param n_clubs: number of clubs in the league
+    :param n_games: number of the remaining games
+    :return: structured numpy type with the fields season, points, goal_difference, position and outcomes
+    """
+    return np.dtype([('season', '<u4'), ('points', '<i2', (n_clubs,)), ('goal_difference', '<i2', (n_clubs,)),
+                     ('position', 'i1', (n_clubs,)), ('outcomes', 'u1', ((n_games + 3) // 4,))])
+
+
+def pack_outcomes(outcome: np.ndarray) -> np.ndarray:
+    """
+    Function that packs the outcome codes, 4 games in one byte (game g is in the bits 2 * (g % 4) of the byte g // 4)
+    :param outcome: outcome codes, shape (n_seasons, n_games)
+    :return: array with shape (n_seasons, (n_games + 3) // 4)
+    """
+    n_seasons, n_games = outcome.shape
+    padded = np.zeros((n_seasons, (n_games + 3) // 4 * 4), dtype=np.uint8)
+    padded[:, :n_games] = outcome
+    return (padded.reshape(n_seasons, -1, 4) << np.array([0, 2, 4, 6], dtype=np.uint8)).sum(axis=2, dtype=np.uint8)
+
+
+def game_outcomes(rows: np.ndarray, game: int) -> np.ndarray:
+    """
+    Function that unpacks the outcome codes of one game
+    :param rows: rows of the store
+    :param game: number of the game in the remaining games of the store
+    :return: outcome codes of the game in every row
+    """
+    return (rows['outcomes'][:, game // 4] >> (2 * (game % 4))) & 3
+
+
+def season_rows(first_season: int, points: np.ndarray, goal_difference: np.ndarray, order: np.ndarray,
+                outcome: np.ndarray) -> np.ndarray:
+    """
+    Function that makes the rows of the seasons of one batch
+    :param first_season: number of the first season of the batch in the run
+    :param points: points of the clubs, shape (n_seasons, n_clubs)
+    :param goal_difference: goal difference of the clubs, same shape
+    :param order: array from ranking.rank_seasons
+    :param outcome: outcome codes of the remaining games, shape (n_seasons, n_games)
+    :return: array of rows
+    """
+    n_seasons, n_clubs = points.shape
+    rows = np.empty(n_seasons, dtype=row_dtype(n_clubs, outcome.shape[1]))
+    rows['season'] = np.arange(first_season, first_season + n_seasons)
+    rows['points'] = points
+    rows['goal_difference'] = goal_difference
+    position = np.empty((n_seasons, n_clubs), dtype=np.int8)
+    np.put_along_axis(position, order, np.arange(n_clubs, dtype=np.int8)[None, :], axis=1)
+    rows['position'] = position
+    rows['outcomes'] = pack_outcomes(outcome)
+    return rows
+
+
+def store_file(checkpoint_file: str) -> str:
+    """
+    Function that makes the name of the store file of the league
+    :param checkpoint_file: checkpoint file of the league
+    :return: file name (checkpoint file name with .seasons)
+    """
+    return os.path.splitext(checkpoint_file)[0] + '.seasons'
+
+
+class SeasonStore:
+    """
+    Class that represents the store file. names, games (remaining games as (home index, away index), in the order of
+    the outcomes), fingerprint and entropy are from the header, len is the number of stored seasons (half written row
+    at the end is ignored)
+    """
+    def __init__(self, file: str) -> None:
+        self.file = file
+        with open(file, 'rb') as handle:
+            start = handle.read(len(MAGIC) + 16)
+            if not start.startswith(MAGIC):
+                raise ValueError('{} is not the store of the seasons'.format(file))
+            self.header_size = int(start[len(MAGIC):])
+            info = json.loads(handle.read(self.header_size - len(start)).decode('utf-8'))
+        self.names = info['names']
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.games = [tuple(game) for game in info['games']]
+        self.fingerprint = info['fingerprint']
+        self.entropy = info['entropy']
+        self.dtype = row_dtype(len(self.names), len(self.games))
+
+    def __len__(self) -> int:
+        return max(os.path.getsize(self.file) - self.header_size, 0) // self.dtype.itemsize
+
+    @classmethod
+    def create(cls, file: str, names: List[str], games: List[Tuple[int, int]], fingerprint: str,
+               entropy: int) -> 'SeasonStore':
+        """
+        Method that makes the new empty store (old file is overwritten)
+        :param file: file name
+        :param names: names of the clubs in the order of the engine arrays
+        :param games: remaining games of the season, (home index, away index)
+        :param fingerprint: fingerprint of the run (same as in the checkpoint)
+        :param entropy: seed of the run
+        :return: new store
+        """
+        info = json.dumps({'names': list(names), 'games': [list(game) for game in games], 'fingerprint': fingerprint,
+                           'entropy': entropy}).encode()
+        size = -(-(len(MAGIC) + 16 + len(info)) // HEADER_BLOCK) * HEADER_BLOCK
+        with open(file, 'wb') as handle:
+            handle.write((MAGIC + b'%016d' % size + info).ljust(size, b' '))
+        return cls(file)
+
+    @classmethod
+    def open_run(cls, file: str, names: List[str], games: List[Tuple[int, int]], fingerprint: str, entropy: int,
+                 first_season: int) -> 'SeasonStore':
+        """
+        Method that opens the store for the run that continues from the first_season (new store is made if there is
+        no file yet, rows from the first_season on are removed)
+        :param file: file name
+        :param names: names of the clubs
+        :param games: remaining games of the season, (home index, away index)
+        :param fingerprint: fingerprint of the run
+        :param entropy: seed of the run
+        :param first_season: number of the first season the run calculates now
+        :return: store
+        """
+        if not os.path.isfile(file):
+            return cls.create(file, names, games, fingerprint, entropy)
+        seasons = cls(file)
+        if (seasons.fingerprint != fingerprint or seasons.entropy != entropy or seasons.names != list(names) or
+                seasons.games != [tuple(game) for game in games]):
+            raise ValueError('{} has the seasons of other inputs or seed, move it somewhere else to start the new '
+                             'store'.format(file))
+        rows = seasons.rows()
+        keep = int(np.searchsorted(rows['season'], first_season))
+        # file has to be unmapped before it is truncated (Windows doesn't allow it otherwise)
+        del rows
+        with open(file, 'r+b') as handle:
+            handle.truncate(seasons.header_size + keep * seasons.dtype.itemsize)
+        return seasons
+
+    def append(self, rows: np.ndarray) -> None:
+        """
+        Method that appends the rows at the end of the file
+        :param rows: array from season_rows
+        """
+        if rows.dtype != self.dtype:
+            raise ValueError('Rows have other clubs or games than the store')
+        with open(self.file, 'r+b') as handle:
+            handle.seek(self.header_size + len(self) * self.dtype.itemsize)
+            handle.write(rows.tobytes())
+
+    def rows(self) -> np.ndarray:
+        """
+        Method that maps the stored rows to memory (nothing is read until the rows are used)
+        :return: read only array of rows
+        """
+        n_seasons = len(self)
+        if not n_seasons:
+            return np.zeros(0, dtype=self.dtype)
+        return np.memmap(self.file, dtype=self.dtype, mode='r', offset=self.header_size, shape=(n_seasons,))
+
+    def chunks(self, chunk_size: int = CHUNK_SIZE) -> Iterator[np.ndarray]:
+        """
+        Method that goes over the stored rows in chunks
+        :param chunk_size: number of seasons in one chunk
+        :return: iterator of arrays of rows
+        """
+        rows = self.rows()
+        for start in range(0, len(rows), chunk_size):
+            yield rows[start:start + chunk_size]
+
+    def probability(self, condition: Callable[[np.ndarray], np.ndarray],
+                    chunk_size: int = CHUNK_SIZE) -> Tuple[float, float]:
+        """
+        Method that calculates the share of the seasons where the condition is true
+        :param condition: function that gets the chunk of rows and returns the boolean array (one value for every row)
+        :param chunk_size: number of seasons in one chunk
+        :return: tuple (probability, its standard error)
+        """
+        hits = total = 0
+        for rows in self.chunks(chunk_size):
+            hits += int(np.count_nonzero(condition(rows)))
+            total += len(rows)
+        if not total:
+            return float('nan'), float('inf')
+        probability = hits / total
+        return probability, (probability * (1 - probability) / total) ** 0.5
@@ -0,0 +1,134 @@
+"""
+Lookup tables for the functions of the elo difference. calculate_probabilities and elo_change only depend on the
+difference between home elo (with home field advantage) and away elo, so instead of calculating powers of e and c for
+every match, the values are calculated once for the grid of differences (0.1 elo points apart by default) and the
+values between the grid points are linearly interpolated. Tables are made for the constants they are calculated with
+and get_table makes the new one when the constants change (callers get the table once per run and pass it on, so the
+constants aren't checked for every match).
+"""
+
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+import engine
+
+"""
+Constants the table depends on (home field advantage isn't here because it is already in the elo difference)
+"""
+TABLE_CONSTANTS = ('c', 'd', 'draw_max', 'draw_variance')
+
+"""
+Number of tables get_table keeps (the ones not used the longest are removed, calibration makes a new table for every
+set of constants it tries)
+"""
+TABLE_CACHE = 8
+
+
+class ProbabilityTable:
+    """
+    Class that holds the table of (home_win, draw, away_win, home_positive_result) for elo differences from -limit to
+    limit. Differences outside of that interval use the values at the end of the table (at 1500 elo difference the
+    weaker club has less than 0.02% chance to win). rows are the python lists for lookup_one, columns are home_win,
+    draw and home_positive_result as separate arrays for lookup (with slopes, the differences to the next grid point,
+    so the interpolation needs only one np.take of each). max_error is the biggest difference between the interpolated
+    and the exact value found when the table was made (checked in the middle between every two grid points, where
+    linear interpolation is the worst).
+    """
+    def __init__(self, constants: Dict, step: float = 0.1, limit: float = 1500) -> None:
+        self.key = table_key(constants)
+        self.step = step
+        self.limit = limit
+        grid = np.linspace(-limit, limit, int(round(2 * limit / step)) + 1)
+        values = exact_values(grid, constants)
+        self.rows = values.tolist()
+        self.columns = tuple(np.ascontiguousarray(values[:, column]) for column in (0, 1, 3))
+        self.slopes = tuple(np.append(np.diff(column), 0) for column in self.columns)
+        self.scale = 1 / step
+        self.offset = limit / step
+        self.last = len(grid) - 1
+        middle = (grid[:-1] + grid[1:]) / 2
+        exact = exact_values(middle, constants)[:, [0, 1, 3]].T
+        self.max_error = float(np.abs(np.array(self.lookup(middle)) - exact).max())
+
+    def __repr__(self) -> str:
+        return 'ProbabilityTable({} values, step {}, max interpolation error {:.2e})'.format(len(self.rows), self.step,
+                                                                                           self.max_error)
+
+    def lookup(self, difference_in_elo: np.ndarray) -> tuple:
+        """
+        Method that finds the values for the array of elo differences (away_win isn't calculated, the batch engine
+        doesn't need it)
+        :param difference_in_elo: home elo + home field advantage - away elo
+        :return: tuple of arrays with the same shape as difference_in_elo (home_win, draw, home_positive_result), where
+                 home_positive_result is the expected score of the home club used in elo_change
+        """
+        position = difference_in_elo * self.scale
+        position += self.offset
+        np.clip(position, 0, self.last, out=position)
+        index = position.astype(np.intp)
+        # position becomes the fraction of the way to the next grid point
+        position -= index
+        below = np.empty_like(position)
+        values = []
+        for column, slope in zip(self.columns, self.slopes):
+            value = np.take(slope, index)
+            value *= position
+            value += np.take(column, index, out=below)
+            values.append(value)
+        return tuple(values)
+
+    def lookup_one(self, difference_in_elo: float) -> Tuple[float, float, float, float]:
+        """
+        Same as lookup, but for one match (it uses python floats, which is much faster than numpy for one number)
+        :param difference_in_elo: home elo + home field advantage - away elo
+        :return: tuple (home_win, draw, away_win, home_positive_result)
+        """
+        position = (min(max(difference_in_elo, -self.limit), self.limit) + self.limit) / self.step
+        index = min(int(position), len(self.rows) - 2)
+        fraction = position - index
+        home_win, draw, away_win, home_positive_result = self.rows[index]
+        next_home_win, next_draw, next_away_win, next_home_positive_result = self.rows[index + 1]
+        return (home_win + (next_home_win - home_win) * fraction, draw + (next_draw - draw) * fraction,
+                away_win + (next_away_win - away_win) * fraction,
+                home_positive_result + (next_home_positive_result - home_positive_result) * fraction)
+
+
+def exact_values(difference_in_elo: np.ndarray, constants: Dict) -> np.ndarray:
+    """
+    Function that calculates the values the table holds with the exact formulas
+    :param difference_in_elo: array of elo differences
+    :param constants: league constants
+    :return: array with shape (len(difference_in_elo), 4)
+    """
+    home_positive_result = engine.expected_result(difference_in_elo, constants)
+    return np.stack(engine.match_probabilities(difference_in_elo, constants) + (home_positive_result,), axis=-1)
+
+
+def table_key(constants: Dict) -> tuple:
+    """
+    Function that returns the values of the constants the table depends on
+    :param constants: league constants
+    :return: tuple of the values
+    """
+    return tuple(constants[name] for name in TABLE_CONSTANTS)
+
+
+_tables = OrderedDict()
+
+
+def get_table(constants: Dict) -> ProbabilityTable:
+    """
+    Function that returns the table for the constants, the table is made the first time it is needed and then reused
+    until the constants change (last TABLE_CACHE tables are kept, so switching between leagues is free)
+    :param constants: league constants
+    :return: table for the constants
+    """
+    key = table_key(constants)
+    if key in _tables:
+        _tables.move_to_end(key)
+    else:
+        _tables[key] = ProbabilityTable(constants)
+        if len(_tables) > TABLE_CACHE:
+            _tables.popitem(last=False)
+    return _tables[key]
@@ -0,0 +1,3 @@
+"""
+Regression tests of the calculations (run with python -m pytest from the folder of Main.py)
+"""
@@ -0,0 +1,153 @@
+"""
+Tests of the exact results with the frozen ratings: they have to be the same as counting every possible season of the
+small league, the same as the static Monte Carlo run within its error, and the control variate has to make the
+placings of the Monte Carlo run more precise (more info in analytic.py)
+"""
+
+import itertools
+import numpy as np
+import pytest
+
+import Main
+import analytic
+import engine
+import league
+import schedule
+
+"""
+Seed of the runs, number of seasons of the Monte Carlo run, number of runs and seasons in every run used to measure the
+precision of the placings, and the number of standard errors the averages can differ
+"""
+SEED = 2019
+N_SEASONS = 50000
+N_RUNS = 20
+RUN_SEASONS = 2000
+Z = 5
+
+
+def small_league() -> league.League:
+    """
+    Function that makes the league of the first 4 clubs of the Premier League that play each other twice
+    :return: league
+    """
+    season = Main.current_season()
+    clubs = engine.ClubTable.from_arrays(season.clubs.names[:4], season.clubs.elo[:4], season.clubs.goals[:4])
+    return league.League('Small league', season.constants, clubs, schedule.round_robin(4)[0])
+
+
+def static_totals(season: league.League, n_seasons: int, seed: int) -> engine.SeasonTotals:
+    """
+    Function that calculates the seasons with the static ratings
+    :param season: league
+    :param n_seasons: number of seasons
+    :param seed: seed of the seasons
+    :return: totals of the seasons
+    """
+    batch = engine.simulate_seasons(season.clubs.elo, season.clubs.goals, season.fixtures, n_seasons,
+                                    season.constants, engine.season_key(seed), played=season.played, static=True)
+    totals = engine.SeasonTotals(len(season.clubs))
+    totals.add_batch(batch, season.tie_breakers)
+    return totals
+
+
+def test_every_season_of_small_league():
+    """
+    Expected results and distributions of the points are the same as the sums over all 3 ** 12 seasons of the small
+    league
+    """
+    season = small_league()
+    result = analytic.forecast(season)
+    probabilities = analytic.outcome_probabilities(season)
+    goals = analytic.expected_goals(season)
+    outcomes = np.array(list(itertools.product(range(3), repeat=len(season.fixtures))))
+    games = np.arange(len(season.fixtures))
+    chance = probabilities[games, outcomes].prod(axis=1)
+    assert chance.sum() == pytest.approx(1)
+    home, away = season.fixtures[:, 0], season.fixtures[:, 1]
+    home_points = np.take(analytic.HOME_POINTS, outcomes)
+    away_points = np.take(analytic.AWAY_POINTS, outcomes)
+    for club in range(4):
+        points = home_points[:, home == club].sum(axis=1) + away_points[:, away == club].sum(axis=1)
+        distribution = np.bincount(points, weights=chance, minlength=result.points_distribution.shape[1])
+        np.testing.assert_allclose(result.points_distribution[club], distribution, atol=1e-12)
+        assert result.points[club] == pytest.approx(chance @ points)
+        scored = goals[games, outcomes, 0][:, home == club].sum(axis=1) + \
+            goals[games, outcomes, 1][:, away == club].sum(axis=1)
+        assert result.goals_scored[club] == pytest.approx(chance @ scored)
+    assert result.wins.sum() == pytest.approx(result.losses.sum())
+    assert (result.wins + result.draws + result.losses) == pytest.approx(np.full(4, 6))
+
+
+def test_forecast_matches_static_monte_carlo():
+    """
+    Exact expected values and distributions of the points are within Z standard errors of the static Monte Carlo run,
+    approximated placings are probabilities
+    """
+    season = Main.current_season()
+    result = analytic.forecast(season)
+    batch = engine.simulate_seasons(season.clubs.elo, season.clubs.goals, season.fixtures, N_SEASONS,
+                                    season.constants, engine.season_key(SEED), static=True)
+    for attribute in engine.STAT_ATTRIBUTES[1:]:
+        values = getattr(batch, attribute)
+        error = values.std(axis=0) / np.sqrt(N_SEASONS)
+        assert (np.abs(values.mean(axis=0) - getattr(result, attribute)) <= Z * error + 1e-9).all(), attribute
+    np.testing.assert_allclose(result.points_distribution.sum(axis=1), 1)
+    np.testing.assert_allclose(result.points_distribution @ np.arange(result.points_distribution.shape[1]),
+                               result.points)
+    for club in range(len(season.clubs)):
+        share = np.bincount(batch.points[:, club], minlength=result.points_distribution.shape[1]) / N_SEASONS
+        expected = result.points_distribution[club]
+        assert (np.abs(share - expected) <= Z * np.sqrt(expected * (1 - expected) / N_SEASONS) + 1e-3).all()
+    np.testing.assert_allclose(result.placings.sum(axis=1), 1)
+    np.testing.assert_allclose(result.placings.sum(axis=0), 1, atol=0.05)
+    assert ((result.placings >= 0) & (result.placings <= 1)).all()
+
+
+def test_played_games_are_fixed(tmp_path):
+    """
+    Played games have probability 1 for their real outcome and their real goals, so the whole played season is certain
+    """
+    lines = ['matchday,home,away,home_goals,away_goals']
+    for matchday, home, away in schedule.read_fixtures(Main.FIXTURES_FILE):
+        lines.append('{},{},{},{},{}'.format(matchday, home, away, len(home) % 3, len(away) % 4))
+    (tmp_path / 'results.csv').write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    season = Main.current_season(results_file=str(tmp_path / 'results.csv'))
+    result = analytic.forecast(season)
+    batch = engine.simulate_seasons(season.clubs.elo, season.clubs.goals, season.fixtures, 10, season.constants,
+                                    engine.season_key(SEED), played=season.played)
+    for attribute in engine.STAT_ATTRIBUTES[1:]:
+        np.testing.assert_allclose(getattr(result, attribute), getattr(batch, attribute).mean(axis=0),
+                                   err_msg=attribute)
+    assert set(result.points_distribution.ravel().tolist()) == {0.0, 1.0}
+
+
+def test_controlled_placings_are_more_precise():
+    """
+    Placings corrected with the control variate are probabilities and vary less between the runs with different seeds
+    than the placings of the runs
+    """
+    season = Main.current_season()
+    expected_points = analytic.forecast(season).points
+    raw, controlled = [], []
+    for seed in range(N_RUNS):
+        totals = static_totals(season, RUN_SEASONS, seed)
+        corrected = analytic.controlled_placings(totals, expected_points)
+        np.testing.assert_allclose(corrected.sum(axis=1), 1)
+        assert ((corrected >= 0) & (corrected <= 1)).all()
+        raw.append(totals.placings / totals.n_seasons)
+        controlled.append(corrected)
+    assert np.var(controlled, axis=0).sum() < np.var(raw, axis=0).sum()
+    # correction doesn't move the placings further than the errors of the runs
+    error = np.sqrt(np.var(raw, axis=0) / N_RUNS)
+    assert (np.abs(np.mean(controlled, axis=0) - np.mean(raw, axis=0)) <= Z * error + 2e-3).all()
+
+
+def test_controlled_placings_need_squares():
+    """
+    Totals without squares or placing points can't be corrected
+    """
+    season = Main.current_season()
+    totals = static_totals(season, 100, SEED)
+    totals.n_squared = 0
+    with pytest.raises(ValueError):
+        analytic.controlled_placings(totals, analytic.forecast(season).points)
@@ -0,0 +1,152 @@
+"""
+Tests of the cache of the results: every set of inputs and seed has its own entry, the run with the same ones gets its
+results without calculating anything, and the entries not used the longest are removed first (more info in cache.py)
+"""
+
+import json
+import os
+import numpy as np
+
+import Main
+import cache
+import cli
+import engine
+
+"""
+Seed and number of seasons of the runs
+"""
+SEED = 2019
+N_SEASONS = 10000
+
+
+def write_entry(result_cache: cache.ResultCache, key: str, size: int, used: float) -> None:
+    """
+    Function that writes the entry with the checkpoint file of the given size and the folder of the index next to it
+    :param result_cache: cache
+    :param key: key of the entry
+    :param size: size of the checkpoint file in bytes
+    :param used: time of the last use
+    :return: None
+    """
+    file = result_cache.file(key)
+    with open(file, 'wb') as handle:
+        handle.write(b'\0' * size)
+    index = os.path.join(result_cache.folder, key + '.index')
+    os.makedirs(index, exist_ok=True)
+    with open(os.path.join(index, 'points.npy'), 'wb') as handle:
+        handle.write(b'\0' * 100)
+    os.utime(file, (used, used))
+
+
+def run(result_cache: cache.ResultCache, seed: int = SEED, max_seasons: int = N_SEASONS) -> tuple:
+    """
+    Function that calculates the league with the cache and counts the calculated seasons
+    :param result_cache: cache
+    :param seed: seed of the run
+    :param max_seasons: number of seasons
+    :return: tuple (totals, number of calculated seasons)
+    """
+    records = []
+    totals = Main.simulate(max_seasons=max_seasons, seed=seed, tolerance=1e-9, metrics_file=None,
+                           progress=records.append, result_cache=result_cache)[0]
+    return totals, records[-1]['calculated'] if records else 0
+
+
+def assert_same_totals(first: engine.SeasonTotals, second: engine.SeasonTotals) -> None:
+    """
+    Function that checks that two runs have the same results
+    :param first: totals of the first run
+    :param second: totals of the second run
+    :return: None
+    """
+    assert first.n_seasons == second.n_seasons
+    for attribute in engine.STAT_ATTRIBUTES + ('placings',):
+        np.testing.assert_array_equal(getattr(first, attribute), getattr(second, attribute), err_msg=attribute)
+
+
+def test_cache_key():
+    """
+    Key is the same only for the same fingerprint and seed, the run without the seed has its own
+    """
+    keys = {cache.cache_key(fingerprint, seed) for fingerprint in ('first', 'second') for seed in (None, 0, SEED)}
+    assert len(keys) == 6
+    assert cache.cache_key('first', SEED) == cache.cache_key('first', SEED)
+
+
+def test_evict(tmp_path):
+    """
+    Entries not used the longest are removed with all their files until the cache is within the budget, the one of the
+    current run is never removed, and using the entry makes it the newest
+    """
+    result_cache = cache.ResultCache(str(tmp_path / 'cache'), budget=2500)
+    for number, key in enumerate('abcd'):
+        write_entry(result_cache, key, 1000, 1000000 + number)
+    assert [(key, size) for key, size, _ in result_cache.entries()] == [(key, 1100) for key in 'abcd']
+    result_cache.file('a')
+    assert [key for key, _, _ in result_cache.entries()] == list('bcda')
+    assert result_cache.evict('b') == ['c', 'd']
+    assert sorted(os.listdir(result_cache.folder)) == ['a.index', 'a.npz', 'b.index', 'b.npz']
+    assert result_cache.evict('b') == []
+    result_cache.budget = 0
+    assert result_cache.evict('b') == ['a']
+    assert sorted(os.listdir(result_cache.folder)) == ['b.index', 'b.npz']
+
+
+def test_same_run_is_not_calculated_again(tmp_path, monkeypatch):
+    """
+    Run with the same inputs and seed gets the results from the cache without calculating them, the run with the other
+    seed gets the new entry, and continuing the cached run gives the same results as the run that was never stopped
+    """
+    # old pickle files are looked for in the working folder
+    monkeypatch.chdir(tmp_path)
+    result_cache = cache.ResultCache(str(tmp_path / 'cache'))
+    first, calculated = run(result_cache)
+    assert (first.n_seasons, calculated) == (N_SEASONS, N_SEASONS)
+    again, calculated = run(result_cache)
+    assert calculated == 0
+    assert_same_totals(first, again)
+    other, calculated = run(result_cache, SEED + 1)
+    assert calculated == N_SEASONS and not np.array_equal(other.placings, first.placings)
+    assert len(result_cache.entries()) == 2
+    continued, calculated = run(result_cache, max_seasons=2 * N_SEASONS)
+    assert calculated == N_SEASONS
+    whole = Main.simulate(max_seasons=2 * N_SEASONS, seed=SEED, checkpoint_file=str(tmp_path / 'whole.npz'),
+                          tolerance=1e-9, metrics_file=None)[0]
+    assert_same_totals(continued, whole)
+
+
+def test_budget_keeps_current_run(tmp_path, monkeypatch):
+    """
+    Cache smaller than one entry keeps only the entry of the last run
+    """
+    monkeypatch.chdir(tmp_path)
+    result_cache = cache.ResultCache(str(tmp_path / 'cache'), budget=0)
+    run(result_cache)
+    run(result_cache, SEED + 1)
+    key = cache.cache_key(Main.run_fingerprint(Main.current_season(), Main.STATIC_RATINGS), SEED + 1)
+    assert [entry[0] for entry in result_cache.entries()] == [key]
+
+
+def test_cli_uses_cache(tmp_path, monkeypatch, capsys):
+    """
+    cli.py has the same cache as Main.py by default, simulate with --cache writes the entry of the seed and report
+    reads it, report with the seed that wasn't calculated finds no results
+    """
+    monkeypatch.chdir(tmp_path)
+    arguments = cli.make_parser().parse_args(['simulate'])
+    assert arguments.cache == Main.RESULT_CACHE and arguments.cache_budget * 2 ** 20 == Main.CACHE_BUDGET
+    folder = str(tmp_path / 'cache')
+    arguments = cli.make_parser().parse_args(['simulate', '--cache', folder, '--cache-budget', '1', '--seed', str(SEED),
+                                              '--seasons', str(N_SEASONS), '--tolerance', '1e-9', '--quiet'])
+    assert cli.open_cache(arguments).budget == 2 ** 20
+    assert arguments.function(arguments) == 0
+    capsys.readouterr()
+    forecasts = []
+    for seed in (SEED, SEED + 1):
+        arguments = cli.make_parser().parse_args(['report', '--cache', folder, '--seed', str(seed), '--format', 'json',
+                                                  '--output', str(tmp_path / 'report.json')])
+        assert arguments.function(arguments) == 0
+        forecasts.append(json.loads((tmp_path / 'report.json').read_text(encoding='utf-8')))
+    assert forecasts[0][0]['seasons'] == N_SEASONS
+    assert forecasts[1][0]['seasons'] == 0
+
@@ -0,0 +1,144 @@
+"""
+Tests of the calibration: scores have to be the same as scoring every game with the formulas of Main.py, and the search
+has to find the home field advantage the history was simulated with (more info in calibration.py)
+"""
+
+import json
+import types
+import numpy as np
+import pytest
+
+import Main
+import calibration
+import engine
+import history
+import schedule
+
+"""
+Seed of the simulated history, its number of seasons, clubs and the home field advantage it was simulated with
+"""
+SEED = 2019
+N_SEASONS = 8
+N_CLUBS = 20
+HOME_FIELD_ADVANTAGE = 120
+
+
+@pytest.fixture(scope='module')
+def backtest(tmp_path_factory) -> calibration.Backtest:
+    """
+    Function that simulates the history of the league of equal clubs, elo changes from season to season as in the
+    model, so the model with HOME_FIELD_ADVANTAGE is the right one
+    :param tmp_path_factory: pytest factory of the temporary folders
+    :return: backtest of the history
+    """
+    folder = tmp_path_factory.mktemp('history')
+    constants = dict(Main.CONSTANTS, home_field_advantage=HOME_FIELD_ADVANTAGE)
+    names = ['Club {}'.format(club) for club in range(N_CLUBS)]
+    elo = np.full(N_CLUBS, float(history.INITIAL_ELO))
+    goals = np.tile([28.5, 20.9, 22.9, 26.0], (N_CLUBS, 1))
+    fixtures = schedule.round_robin(N_CLUBS)[0]
+    files = []
+    for season in range(N_SEASONS):
+        batch = engine.simulate_seasons(elo, goals, fixtures, 1, constants, engine.season_key(SEED + season))
+        games = zip(fixtures.tolist(), batch.home_scored[0], batch.away_scored[0])
+        lines = ['home,away,home_goals,away_goals'] + ['{},{},{},{}'.format(names[home], names[away], home_goals,
+                                                                           away_goals)
+                                                      for (home, away), home_goals, away_goals in games]
+        files.append(folder / '{}.csv'.format(season))
+        files[-1].write_text('\n'.join(lines) + '\n', encoding='utf-8')
+        elo = batch.elo[0].copy()
+    return calibration.Backtest(history.load_history(map(str, files)), Main.CONSTANTS['games'])
+
+
+def test_scores_match_formulas(backtest):
+    """
+    log_loss and rps are the averages of the scores of every game after the burn in, with the probabilities of
+    calculate_probabilities and the elo of elo_change
+    """
+    scores = calibration.evaluate(backtest, Main.CONSTANTS)
+    results = backtest.history
+    clubs = [types.SimpleNamespace(elo=float(history.INITIAL_ELO)) for _ in results.names]
+    log_loss, rps = [], []
+    for number, ((home, away), (home_goals, away_goals)) in enumerate(zip(results.fixtures.tolist(),
+                                                                          results.goals.tolist())):
+        if number >= results.seasons[calibration.BURN_IN].start:
+            probabilities = Main.calculate_probabilities(clubs[home], clubs[away])
+            outcome = 0 if home_goals > away_goals else 1 if home_goals == away_goals else 2
+            log_loss.append(-np.log(probabilities[outcome]))
+            observed = np.eye(3)[outcome]
+            rps.append(((np.cumsum(probabilities)[:2] - np.cumsum(observed)[:2]) ** 2).sum() / 2)
+        clubs[home].elo, clubs[away].elo = Main.elo_change(clubs[home], clubs[away], home_goals - away_goals)
+    assert scores['games'] == len(log_loss) == (N_SEASONS - calibration.BURN_IN) * N_CLUBS * (N_CLUBS - 1)
+    assert scores['log_loss'] == pytest.approx(np.mean(log_loss), rel=1e-9)
+    assert scores['rps'] == pytest.approx(np.mean(rps), rel=1e-9)
+    assert scores['total_log_loss'] == pytest.approx(scores['log_loss'] + scores['goals_log_loss'])
+
+
+def test_scoreline_probabilities_match_sampler():
+    """
+    Probability of the scoreline for the known outcome is the same as in the tables the engine draws the goals from
+    """
+    random = np.random.RandomState(SEED)
+    home_average, away_average = random.uniform(0.5, 2.5, 50), random.uniform(0.5, 2.5, 50)
+    home_goals, away_goals = random.randint(0, 5, 50), random.randint(0, 5, 50)
+    outcome = 1 - np.sign(home_goals - away_goals)
+    probabilities = calibration.scoreline_probabilities(home_average, away_average, home_goals, away_goals, outcome)
+    pmf = np.diff(engine.scoreline_cdf(home_average, away_average), axis=2, prepend=0)
+    cell = home_goals * (engine.MAX_GOALS + 1) + away_goals
+    np.testing.assert_allclose(probabilities, pmf[np.arange(50), outcome, cell], rtol=1e-9)
+
+
+def test_grid_search_finds_home_field_advantage(backtest):
+    """
+    Home field advantage the history was simulated with scores the best, with one process or two
+    """
+    grid = {'home_field_advantage': [0, 60, 120, 180, 240]}
+    results = calibration.grid_search(backtest, Main.CONSTANTS, grid, 'log_loss')
+    assert results[0][0]['home_field_advantage'] == HOME_FIELD_ADVANTAGE
+    assert [scores['log_loss'] for _, scores in results] == sorted(scores['log_loss'] for _, scores in results)
+    assert calibration.grid_search(backtest, Main.CONSTANTS, grid, 'log_loss', workers=2) == results
+
+
+def test_optimize(backtest):
+    """
+    Compass search from a wrong home field advantage gets close to the right one and never gets worse
+    """
+    start = dict(Main.CONSTANTS, home_field_advantage=20)
+    steps = []
+    best, scores = calibration.optimize(backtest, start, ['home_field_advantage'], 'log_loss',
+                                        progress=lambda constants, scores, scale: steps.append(scores['log_loss']))
+    assert abs(best['home_field_advantage'] - HOME_FIELD_ADVANTAGE) <= 30
+    assert steps == sorted(steps, reverse=True)
+    assert scores['log_loss'] < calibration.evaluate(backtest, start)['log_loss']
+
+
+def test_cache(backtest, tmp_path, monkeypatch):
+    """
+    Scores are calculated only once, also in the next run that reads them from the file
+    """
+    file = str(tmp_path / 'calibration.jsonl')
+    candidates = [dict(Main.CONSTANTS, draw_max=value) for value in (0.2, 0.25, 0.3)]
+    first = calibration.score(backtest, candidates, calibration.Cache(file))
+    assert len(open(file).readlines()) == 3
+    assert json.loads(open(file).readline())['constants'] == candidates[0]
+
+    calculated = []
+    evaluate_all = calibration.evaluate_all
+
+    def counted(backtest, constants):
+        calculated.extend(constants)
+        return evaluate_all(backtest, constants)
+    monkeypatch.setattr(calibration, 'evaluate_all', counted)
+    assert calibration.score(backtest, candidates[::-1], calibration.Cache(file)) == first[::-1]
+    assert calculated == []
+    calibration.score(backtest, candidates + [dict(Main.CONSTANTS, draw_max=0.35)], calibration.Cache(file))
+    assert calculated == [dict(Main.CONSTANTS, draw_max=0.35)]
+
+
+def test_valid():
+    """
+    Negative constants and draw_max of 1 or more are not tried
+    """
+    assert calibration.valid(Main.CONSTANTS)
+    assert not calibration.valid(dict(Main.CONSTANTS, k_base=-1))
+    assert not calibration.valid(dict(Main.CONSTANTS, draw_max=1))
@@ -0,0 +1,109 @@
+"""
+Tests of saving and continuing the calculations: the run that stops and is continued from the checkpoint file has to
+give exactly the same results as the run that was never stopped (more info in checkpoint.py and parallel.py)
+"""
+
+import numpy as np
+import os
+import pytest
+
+import Main
+import checkpoint
+import engine
+
+"""
+Seed of the runs
+"""
+SEED = 2019
+
+"""
+Names of all arrays of SeasonTotals saved in the checkpoint
+"""
+ARRAYS = engine.STAT_ATTRIBUTES + ('placings', 'squares', 'placing_points')
+
+
+def random_checkpoint() -> checkpoint.Checkpoint:
+    """
+    Function that makes the checkpoint of 4 clubs with random totals
+    :return: checkpoint
+    """
+    random = np.random.RandomState(SEED)
+    totals = engine.SeasonTotals(4)
+    for attribute in ARRAYS:
+        values = getattr(totals, attribute)
+        values[:] = random.randint(0, 10 ** 6, values.shape)
+    totals.n_seasons, totals.n_squared = 12345, 12000
+    # entropy of np.random.SeedSequence has 128 bits, more than np.int64 can hold
+    return checkpoint.Checkpoint(totals, 2 ** 127 + 1, 7, checkpoint.fingerprint([totals.elo], {'seed': SEED}))
+
+
+def test_save_and_load(tmp_path):
+    """
+    Loaded checkpoint is the same as the saved one, no temporary files are left and missing file is None
+    """
+    file = str(tmp_path / 'state.npz')
+    assert checkpoint.load_checkpoint(file) is None
+    saved = random_checkpoint()
+    checkpoint.save_checkpoint(file, saved)
+    loaded = checkpoint.load_checkpoint(file)
+    for attribute in ARRAYS:
+        np.testing.assert_array_equal(getattr(loaded.totals, attribute), getattr(saved.totals, attribute), attribute)
+    assert (loaded.totals.n_seasons, loaded.totals.n_squared) == (12345, 12000)
+    assert (loaded.entropy, loaded.next_task, loaded.fingerprint) == (saved.entropy, 7, saved.fingerprint)
+    assert os.listdir(str(tmp_path)) == ['state.npz']
+
+
+def test_newer_version_is_not_read(tmp_path, monkeypatch):
+    """
+    File written by the newer version of the program is an error
+    """
+    file = str(tmp_path / 'state.npz')
+    monkeypatch.setattr(checkpoint, 'VERSION', checkpoint.VERSION + 1)
+    checkpoint.save_checkpoint(file, random_checkpoint())
+    monkeypatch.undo()
+    with pytest.raises(ValueError):
+        checkpoint.load_checkpoint(file)
+
+
+@pytest.mark.skipif(os.name != 'posix', reason='file modes are only checked on posix systems')
+@pytest.mark.parametrize('umask', [0o022, 0o077])
+def test_file_mode_follows_umask(tmp_path, umask):
+    """
+    Checkpoint gets the same permissions as any other new file, not the private ones of the temporary file
+    """
+    file = str(tmp_path / 'state.npz')
+    old_umask = os.umask(umask)
+    try:
+        checkpoint.save_checkpoint(file, random_checkpoint())
+    finally:
+        os.umask(old_umask)
+    assert os.stat(file).st_mode & 0o777 == 0o666 & ~umask
+
+
+def test_fingerprint_changes_with_inputs():
+    """
+    Different arrays (even with the same bytes) or settings give different fingerprints
+    """
+    elo = np.arange(4, dtype=np.float64)
+    fingerprint = checkpoint.fingerprint([elo], {'seed': SEED})
+    assert checkpoint.fingerprint([elo.copy()], {'seed': SEED}) == fingerprint
+    assert checkpoint.fingerprint([elo], {'seed': SEED + 1}) != fingerprint
+    assert checkpoint.fingerprint([elo.reshape(2, 2)], {'seed': SEED}) != fingerprint
+    assert checkpoint.fingerprint([elo.view(np.int64)], {'seed': SEED}) != fingerprint
+
+
+def test_resumed_run_equals_uninterrupted_run(tmp_path, monkeypatch):
+    """
+    Run of 10000 seasons continued to 30000 has to have the same totals as the run of 30000 seasons
+    """
+    # old pickle files are looked for in the working folder
+    monkeypatch.chdir(tmp_path)
+    resumed, uninterrupted = str(tmp_path / 'resumed.npz'), str(tmp_path / 'uninterrupted.npz')
+    Main.simulate(max_seasons=10000, seed=SEED, checkpoint_file=resumed, tolerance=1e-9)
+    assert checkpoint.load_checkpoint(resumed).totals.n_seasons == 10000
+    totals = Main.simulate(max_seasons=30000, seed=SEED, checkpoint_file=resumed, tolerance=1e-9)[0]
+    expected = Main.simulate(max_seasons=30000, seed=SEED, checkpoint_file=uninterrupted, tolerance=1e-9)[0]
+    assert totals.n_seasons == expected.n_seasons == 30000
+    for attribute in engine.STAT_ATTRIBUTES + ('placings', 'squares', 'placing_points'):
+        np.testing.assert_array_equal(getattr(totals, attribute), getattr(expected, attribute), attribute)
+    assert checkpoint.load_checkpoint(resumed).next_task == checkpoint.load_checkpoint(uninterrupted).next_task
@@ -0,0 +1,114 @@
+"""
+Tests of the Monte Carlo errors and the stopping rule (more info in convergence.py)
+"""
+
+import numpy as np
+
+import Main
+import convergence
+import engine
+import ranking
+
+"""
+Seed of the simulated seasons and their number
+"""
+SEED = 2019
+N_SEASONS = 2000
+
+
+def event_totals(n_seasons: int, probability: float, n_clubs: int = 20) -> engine.SeasonTotals:
+    """
+    Function that makes the totals where every club won the title and was last in the share probability of the seasons
+    :param n_seasons: number of seasons
+    :param probability: share of the seasons
+    :param n_clubs: number of clubs
+    :return: SeasonTotals with only the placings filled
+    """
+    totals = engine.SeasonTotals(n_clubs)
+    totals.n_seasons = n_seasons
+    totals.placings[:, 0] = totals.placings[:, -1] = int(round(n_seasons * probability))
+    return totals
+
+
+def test_errors_of_simulated_seasons():
+    """
+    Errors are the standard deviations of the simulated seasons divided by the square root of their number
+    """
+    season = Main.current_season()
+    batch = engine.simulate_seasons(season.clubs.elo, season.clubs.goals, season.fixtures, N_SEASONS,
+                                    season.constants, engine.season_key(SEED))
+    totals = engine.SeasonTotals(len(season.clubs))
+    totals.add_batch(batch)
+    errors = convergence.average_errors(totals)
+    for row, attribute in enumerate(engine.STAT_ATTRIBUTES):
+        expected = getattr(batch, attribute).std(axis=0, ddof=1) / np.sqrt(N_SEASONS)
+        np.testing.assert_allclose(errors[row], expected, rtol=1e-6, atol=1e-9, err_msg=attribute)
+    positions = np.argsort(ranking.rank_seasons(batch), axis=1)
+    relegated = (positions >= len(season.clubs) - 3).mean(axis=0)
+    np.testing.assert_allclose(convergence.event_errors(totals, convergence.RELEGATION),
+                               np.sqrt(relegated * (1 - relegated) / N_SEASONS))
+    placed = totals.placings / N_SEASONS
+    np.testing.assert_allclose(convergence.placing_errors(totals), np.sqrt(placed * (1 - placed) / N_SEASONS))
+
+
+def test_no_seasons():
+    """
+    Without seasons the errors are infinite and the rule doesn't stop
+    """
+    totals = engine.SeasonTotals(20)
+    assert np.isinf(convergence.placing_errors(totals)).all()
+    assert np.isinf(convergence.event_errors(totals, convergence.TITLE)).all()
+    assert np.isinf(convergence.average_errors(totals)).all()
+    assert not convergence.StoppingRule(min_seasons=0).converged(totals)
+    assert convergence.StoppingRule().seasons_needed(totals) == np.inf
+
+
+def test_converged():
+    """
+    Rule stops when the confidence intervals are within tolerance, but never before min_seasons
+    """
+    rule = convergence.StoppingRule(tolerance=0.01, min_seasons=10000)
+    # z * sqrt(0.5 * 0.5 / n) = 0.01 for n = 9604
+    assert not rule.converged(event_totals(9700, 0.5))
+    assert rule.converged(event_totals(10000, 0.5))
+    assert convergence.StoppingRule(tolerance=0.01, min_seasons=0).converged(event_totals(9700, 0.5))
+    assert not convergence.StoppingRule(tolerance=0.01, min_seasons=0).converged(event_totals(9500, 0.5))
+    # events that didn't happen yet have zero error, only min_seasons stops the rule
+    assert not rule.converged(event_totals(100, 0))
+
+
+def test_average_tolerance():
+    """
+    With average_tolerance the averages have to be precise enough too
+    """
+    totals = event_totals(10 ** 6, 0.5)
+    totals.n_squared = totals.n_seasons
+    totals.points[:] = 50 * totals.n_seasons
+    # standard deviation of the points is 10
+    totals.squares[engine.STAT_ATTRIBUTES.index('points')] = (50 ** 2 + 10 ** 2) * totals.n_seasons
+    assert convergence.StoppingRule().converged(totals)
+    assert convergence.StoppingRule(average_tolerance=0.02).converged(totals)
+    assert not convergence.StoppingRule(average_tolerance=0.01).converged(totals)
+
+
+def test_seasons_needed():
+    """
+    Number of seasons grows with the square of the ratio, and the seasons it estimates are really enough
+    """
+    rule = convergence.StoppingRule(tolerance=0.002, min_seasons=0)
+    totals = event_totals(10000, 0.3)
+    needed = rule.seasons_needed(totals)
+    np.testing.assert_allclose(needed, 10000 * rule.worst_ratio(totals) ** 2)
+    np.testing.assert_allclose(convergence.StoppingRule(tolerance=0.001, min_seasons=0).seasons_needed(totals),
+                               4 * needed)
+    assert rule.converged(event_totals(int(np.ceil(needed)) + 1, 0.3))
+    assert convergence.StoppingRule(min_seasons=10 ** 6).seasons_needed(totals) == 10 ** 6
+
+
+def test_default_rule_stops_before_max():
+    """
+    Even if the odds of some club are 50%, where the error is the biggest, default tolerance is reached before MAX
+    """
+    rule = convergence.StoppingRule(Main.TOLERANCE)
+    assert rule.seasons_needed(event_totals(10000, 0.5)) < Main.MAX
+    assert rule.converged(event_totals(Main.MAX, 0.5))
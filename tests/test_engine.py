@@ -0,0 +1,92 @@
+"""
+Tests of the batch engine: it has to give the same averages as the scalar play_all_games (within the Monte Carlo
+error) and the same seasons for the same seed, no matter how they are split into batches, tasks and processes or if
+the compiled kernel is used (more info in parallel.py)
+"""
+
+import copy
+import numpy as np
+import pytest
+
+import Main
+import engine
+import kernel
+import parallel
+import schedule
+
+"""
+Seed of all runs, number of seasons played with play_all_games and with the batch engine, and the number of standard
+errors the averages can differ
+"""
+SEED = 2019
+SCALAR_SEASONS = 1000
+BATCH_SEASONS = 20000
+Z = 5
+
+
+def scalar_seasons(n_seasons: int, names: list) -> dict:
+    """
+    Function that plays the seasons one by one with play_all_games
+    :param n_seasons: number of seasons
+    :param names: names of the clubs, columns of the arrays are in this order
+    :return: dictionary attribute: array with shape (n_seasons, n_clubs)
+    """
+    np.random.seed(SEED)
+    fixtures = schedule.read_fixtures(Main.FIXTURES_FILE)
+    seasons = {attribute: np.zeros((n_seasons, len(names))) for attribute in engine.STAT_ATTRIBUTES}
+    for i in range(n_seasons):
+        teams = copy.deepcopy(Main.clubs_in_league)
+        Main.play_all_games(teams, fixtures)
+        for attribute, values in seasons.items():
+            values[i] = [getattr(teams[name], attribute) for name in names]
+    return seasons
+
+
+def test_batch_engine_matches_play_all_games():
+    """
+    Averages of all stats of every club have to be the same as with play_all_games, within Z standard errors
+    """
+    season = Main.current_season()
+    scalar = scalar_seasons(SCALAR_SEASONS, season.clubs.names)
+    batch = engine.simulate_seasons(season.clubs.elo, season.clubs.goals, season.fixtures, BATCH_SEASONS,
+                                    season.constants, engine.season_key(SEED))
+    for attribute in engine.STAT_ATTRIBUTES:
+        values = getattr(batch, attribute)
+        error = np.sqrt(scalar[attribute].var(axis=0) / SCALAR_SEASONS + values.var(axis=0) / BATCH_SEASONS)
+        difference = np.abs(scalar[attribute].mean(axis=0) - values.mean(axis=0))
+        assert (difference <= Z * error + 1e-9).all(), attribute
+
+
+def run_totals(batch_size: int, workers: int, use_kernel: bool) -> engine.SeasonTotals:
+    """
+    Function that calculates 3 tasks of 1000 seasons with the seed SEED
+    :param batch_size: number of seasons calculated at the same time
+    :param workers: number of processes
+    :param use_kernel: use the compiled kernel
+    :return: totals of all tasks
+    """
+    season = Main.current_season()
+    totals = engine.SeasonTotals(len(season.clubs))
+    for task_totals in parallel.run(season.clubs.elo, season.clubs.goals, season.fixtures, 3000, season.constants,
+                                    workers, SEED, batch_size=batch_size, task_size=1000,
+                                    tie_breakers=season.tie_breakers, played=season.played, use_kernel=use_kernel):
+        totals.merge(task_totals)
+    return totals
+
+
+@pytest.mark.parametrize('batch_size, workers, use_kernel', [
+    (256, 1, False),
+    (1000, 2, False),
+    pytest.param(1000, 1, True, marks=pytest.mark.skipif(not kernel.AVAILABLE, reason='numba is not installed')),
+])
+def test_same_seed_same_seasons(batch_size, workers, use_kernel):
+    """
+    Placings and stats of the seasons have to be the same as with 1000 seasons per batch in one process without the
+    kernel (elo isn't compared, its sums can differ in the last bits)
+    """
+    expected = run_totals(1000, 1, False)
+    totals = run_totals(batch_size, workers, use_kernel)
+    assert totals.n_seasons == expected.n_seasons
+    np.testing.assert_array_equal(totals.placings, expected.placings)
+    for attribute in ('points', 'wins', 'draws', 'losses', 'goals_scored', 'goals_received'):
+        np.testing.assert_array_equal(getattr(totals, attribute), getattr(expected, attribute))
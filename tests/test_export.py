@@ -0,0 +1,154 @@
+"""
+Tests of the export: every format has to hold the same numbers as the arrays it was made from, and the arrays have to
+be the averages of the calculated seasons (more info in export.py)
+"""
+
+import csv
+import json
+import os
+import subprocess
+import sys
+import numpy as np
+import pytest
+
+import Main
+import analytic
+import convergence
+import engine
+import export
+import league
+import schedule
+
+"""
+Seed and number of the calculated seasons
+"""
+SEED = 2019
+N_SEASONS = 2000
+
+
+def premier_league() -> tuple:
+    """
+    Function that calculates the seasons of the Premier League
+    :return: tuple (league, arrays from forecast_arrays, totals)
+    """
+    season = Main.current_season()
+    batch = engine.simulate_seasons(season.clubs.elo, season.clubs.goals, season.fixtures, N_SEASONS,
+                                    season.constants, engine.season_key(SEED))
+    totals = engine.SeasonTotals(len(season.clubs))
+    totals.add_batch(batch, season.tie_breakers)
+    return season, export.forecast_arrays(totals, season), totals
+
+
+def small_league() -> tuple:
+    """
+    Function that calculates the exact results of the league of 4 clubs
+    :return: tuple (league, arrays from analytic_arrays)
+    """
+    season = Main.current_season()
+    clubs = engine.ClubTable.from_arrays(season.clubs.names[:4], season.clubs.elo[:4], season.clubs.goals[:4])
+    small = league.League('Small league', season.constants, clubs, schedule.round_robin(4)[0], relegation_places=1)
+    return small, export.analytic_arrays(analytic.forecast(small))
+
+
+def test_forecast_arrays():
+    """
+    Arrays are the averages of the seasons and their errors, placings are the shares of the seasons
+    """
+    season, arrays, totals = premier_league()
+    errors = convergence.average_errors(totals)
+    for row, attribute in enumerate(engine.STAT_ATTRIBUTES):
+        np.testing.assert_allclose(arrays[attribute], getattr(totals, attribute) / N_SEASONS)
+        np.testing.assert_allclose(arrays[attribute + '_error'], errors[row])
+    np.testing.assert_allclose(arrays['placings'].sum(axis=1), 1)
+    np.testing.assert_array_equal(arrays['placing_counts'], totals.placings)
+    assert arrays['clubs'].tolist() == season.clubs.names and int(arrays['seasons']) == N_SEASONS
+    assert not arrays['exact']
+
+
+def test_rows():
+    """
+    Rows are sorted like the standings, title and relegation are the sums of the placings
+    """
+    season, arrays, _ = premier_league()
+    forecast = export.rows(arrays, season)
+    assert [row['points'] for row in forecast] == sorted(arrays['points'].tolist(), reverse=True)
+    for row in forecast:
+        i = season.clubs.names.index(row['club'])
+        assert row['title'] == arrays['placings'][i, 0]
+        assert row['relegation'] == pytest.approx(arrays['placings'][i, -3:].sum())
+        assert row['seasons'] == N_SEASONS and row['league'] == season.name
+    small, small_arrays = small_league()
+    small_rows = export.rows(small_arrays, small)
+    assert all(row['seasons'] is None for row in small_rows)
+    assert [row['relegation'] for row in small_rows] == [row['placings'][-1] for row in small_rows]
+
+
+def test_text_formats(tmp_path):
+    """
+    JSON has the same rows, CSV has the same numbers with the placings in the columns p1, p2... (empty for the smaller
+    league) and the text table has every club
+    """
+    leagues = [premier_league()[:2], small_league()]
+    forecast = [row for season, arrays in leagues for row in export.rows(arrays, season)]
+    export.write(str(tmp_path / 'forecast.json'), leagues, 'json')
+    assert json.loads((tmp_path / 'forecast.json').read_text(encoding='utf-8')) == forecast
+    export.write(str(tmp_path / 'forecast.csv'), leagues, 'csv')
+    with open(str(tmp_path / 'forecast.csv'), newline='', encoding='utf-8') as handle:
+        lines = list(csv.DictReader(handle))
+    assert len(lines) == len(forecast) == 24
+    for line, row in zip(lines, forecast):
+        assert line['club'] == row['club']
+        assert float(line['points']) == row['points']
+        assert [float(line['p{}'.format(i + 1)]) for i in range(len(row['placings']))] == row['placings']
+        assert all(line['p{}'.format(i + 1)] == '' for i in range(len(row['placings']), 20))
+    export.write(str(tmp_path / 'forecast.txt'), leagues, 'text')
+    text = (tmp_path / 'forecast.txt').read_text(encoding='utf-8')
+    assert all(row['club'] in text for row in forecast)
+    assert '{} seasons'.format(N_SEASONS) in text and 'exact, frozen ratings' in text
+
+
+def test_npz(tmp_path):
+    """
+    npz file holds the arrays of every league
+    """
+    leagues = [premier_league()[:2], small_league()]
+    file = str(tmp_path / 'forecast.npz')
+    export.write(file, leagues, 'npz')
+    with np.load(file) as data:
+        for season, arrays in leagues:
+            for name, array in arrays.items():
+                np.testing.assert_array_equal(data['{}/{}'.format(season.name, name)], array, name)
+
+
+@pytest.mark.skipif(not export.parquet_available(), reason='pyarrow is not installed')
+def test_parquet(tmp_path):
+    """
+    Parquet file has the same columns and values as the CSV
+    """
+    import pyarrow.parquet
+    leagues = [premier_league()[:2], small_league()]
+    file = str(tmp_path / 'forecast.parquet')
+    export.write(file, leagues, 'parquet')
+    columns, values = export.flat_rows([row for season, arrays in leagues for row in export.rows(arrays, season)])
+    table = pyarrow.parquet.read_table(file)
+    assert table.column_names == columns
+    assert [[row[column] for column in columns] for row in table.to_pylist()] == values
+
+
+def test_pyarrow_is_imported_only_for_parquet():
+    """
+    Importing the program (and the export) doesn't import pyarrow
+    """
+    folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, '-c', 'import sys, Main, cli, export; print("pyarrow" in sys.modules)'],
+                            cwd=folder, stdout=subprocess.PIPE, check=True, universal_newlines=True).stdout
+    assert output.strip() == 'False'
+
+
+def test_binary_formats_need_the_file():
+    """
+    npz and parquet can't be written to the standard output
+    """
+    for output_format in export.BINARY_FORMATS:
+        with pytest.raises(ValueError):
+            export.write(None, [small_league()], output_format)
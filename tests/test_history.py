@@ -0,0 +1,147 @@
+"""
+Tests of the fitting from the historical results: replayed elo has to be the same as calling elo_change game by game,
+promoted clubs have to start with the elo and the goals of the relegated ones (more info in history.py)
+"""
+
+import json
+import types
+import numpy as np
+import pytest
+
+import Main
+import history
+import kernel
+import schedule
+
+"""
+Seed of the random results, clubs of the first and the second season (D is relegated, E is promoted) and number of
+games of every club in the season
+"""
+SEED = 2019
+FIRST_SEASON = ('A', 'B', 'C', 'D')
+SECOND_SEASON = ('A', 'B', 'E', 'C')
+GAMES = 6
+
+
+def random_games(clubs: tuple, random: np.random.RandomState, played: int = None) -> list:
+    """
+    Function that makes the random results of the double round robin
+    :param clubs: names of the clubs
+    :param random: random numbers
+    :param played: number of games with the goals, others don't have them (all games if it is None)
+    :return: list of tuples (home, away, home goals, away goals), goals are None for the games that weren't played
+    """
+    fixtures = schedule.round_robin(len(clubs))[0].tolist()
+    games = []
+    for number, (home, away) in enumerate(fixtures):
+        goals = tuple(random.poisson(1.5, 2).tolist()) if played is None or number < played else (None, None)
+        games.append((clubs[home], clubs[away]) + goals)
+    return games
+
+
+def write_history(tmp_path) -> tuple:
+    """
+    Function that writes the first season in the football-data.co.uk format and the second (with 4 games not played)
+    in the format of the results file
+    :param tmp_path: folder of the files
+    :return: tuple (list of file names, list of the games of both seasons)
+    """
+    random = np.random.RandomState(SEED)
+    first, second = random_games(FIRST_SEASON, random), random_games(SECOND_SEASON, random, 8)
+    lines = ['Div,HomeTeam,AwayTeam,FTHG,FTAG'] + ['E0,{},{},{},{}'.format(*game) for game in first]
+    (tmp_path / '2018.csv').write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    rows = [{'matchday': 1, 'home': home, 'away': away, 'home_goals': home_goals, 'away_goals': away_goals}
+            for home, away, home_goals, away_goals in second]
+    (tmp_path / '2019.json').write_text(json.dumps(rows), encoding='utf-8')
+    return [str(tmp_path / '2018.csv'), str(tmp_path / '2019.json')], [first, second[:8]]
+
+
+def test_read_season(tmp_path):
+    """
+    Both formats are read, games without goals are skipped and the file without the needed columns is an error
+    """
+    files, games = write_history(tmp_path)
+    for file, expected in zip(files, games):
+        home, away, goals = history.read_season(file)
+        assert list(zip(home, away, *goals.T.tolist())) == expected
+    (tmp_path / 'wrong.csv').write_text('HomeTeam,AwayTeam,Goals\nA,B,1\n', encoding='utf-8')
+    with pytest.raises(KeyError):
+        history.read_season(str(tmp_path / 'wrong.csv'))
+
+
+@pytest.mark.parametrize('use_kernel', [
+    False,
+    pytest.param(True, marks=pytest.mark.skipif(not kernel.AVAILABLE, reason='numba is not installed')),
+])
+def test_replayed_elo_matches_elo_change(tmp_path, use_kernel):
+    """
+    Elo before every game and after all games is the same as with elo_change called for every game, promoted club
+    starts with the elo of the relegated one
+    """
+    files, games = write_history(tmp_path)
+    clubs = {name: types.SimpleNamespace(elo=float(history.INITIAL_ELO)) for name in FIRST_SEASON}
+    expected_ratings = []
+    for season, season_games in enumerate(games):
+        if season == 1:
+            clubs['E'] = types.SimpleNamespace(elo=clubs['D'].elo)
+        for home, away, home_goals, away_goals in season_games:
+            expected_ratings.append((clubs[home].elo, clubs[away].elo))
+            clubs[home].elo, clubs[away].elo = Main.elo_change(clubs[home], clubs[away], home_goals - away_goals)
+    loaded = history.load_history(files)
+    ratings = np.zeros((len(loaded), 2))
+    elo = history.replay_history(loaded, Main.CONSTANTS, use_kernel=use_kernel, ratings=ratings)
+    for name, club in clubs.items():
+        assert elo[loaded.index[name]] == pytest.approx(club.elo, abs=1e-9)
+    np.testing.assert_allclose(ratings, expected_ratings, rtol=0, atol=1e-9)
+    assert loaded.new[1].tolist() == [loaded.index['E']] and loaded.relegated[1].tolist() == [loaded.index['D']]
+
+
+def test_fit(tmp_path):
+    """
+    Fitted clubs have the elo after the last game and their goals scaled to the whole season, the promoted club gets
+    the elo and the goals of the relegated one
+    """
+    files, games = write_history(tmp_path)
+    loaded = history.load_history(files)
+    elo = history.replay_history(loaded, Main.CONSTANTS)
+    clubs = history.fit(files, Main.CONSTANTS, names=['A', 'B', 'E', 'C', 'F'])
+    assert clubs.names == ['A', 'B', 'E', 'C', 'F']
+    np.testing.assert_allclose(clubs.elo[:4], [elo[loaded.index[name]] for name in 'ABEC'])
+    # nobody was relegated after the second season, so F gets the averages of the whole season
+    assert clubs.elo[4] == pytest.approx(history.INITIAL_ELO)
+    for name, goals in zip(clubs.names, clubs.goals):
+        if name == 'F':
+            continue
+        home = [game for game in games[1] if game[0] == name]
+        away = [game for game in games[1] if game[1] == name]
+        expected = [np.mean([game[2] for game in home]), np.mean([game[3] for game in home]),
+                    np.mean([game[3] for game in away]), np.mean([game[2] for game in away])]
+        np.testing.assert_allclose(goals, np.array(expected) * Main.CONSTANTS['games'] / 2, err_msg=name)
+    np.testing.assert_allclose(clubs.goals[4], np.nanmean(clubs.goals[:4], axis=0))
+    configs = history.club_configs(clubs)
+    assert configs[0] == {'name': 'A', 'elo': round(float(clubs.elo[0]), 1),
+                          'goals': [round(float(goal), 1) for goal in clubs.goals[0]]}
+
+
+def test_promoted_clubs_get_relegated_goals(tmp_path):
+    """
+    Club promoted after the first season gets the elo and the goals the relegated club had at the end of it
+    """
+    files, games = write_history(tmp_path)
+    loaded = history.load_history(files[:1])
+    elo = history.replay_history(loaded, Main.CONSTANTS)
+    new_elo, new_goals = history.next_season(loaded, 0, SECOND_SEASON, elo, GAMES)
+    relegated = loaded.index['D']
+    assert new_elo[SECOND_SEASON.index('E')] == elo[relegated]
+    goals = history.season_goals(loaded.fixtures, loaded.goals, len(loaded.names), GAMES)
+    np.testing.assert_array_equal(new_goals[SECOND_SEASON.index('E')], goals[relegated])
+    np.testing.assert_array_equal(new_goals[SECOND_SEASON.index('A')], goals[loaded.index['A']])
+
+
+def test_empty_history(tmp_path):
+    """
+    History without any played game is an error
+    """
+    (tmp_path / 'empty.csv').write_text('home,away,home_goals,away_goals\nA,B,,\n', encoding='utf-8')
+    with pytest.raises(ValueError):
+        history.load_history([str(tmp_path / 'empty.csv')])
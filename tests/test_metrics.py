@@ -0,0 +1,92 @@
+"""
+Tests of the instrumentation: turned off it measures nothing, turned on it counts every call of the stages and every
+match of the samplers, also the ones calculated in other processes (more info in metrics.py)
+"""
+
+import json
+import pickle
+import time
+
+import Main
+import metrics
+
+"""
+Seed of the runs and their number of seasons
+"""
+SEED = 2019
+N_SEASONS = 20000
+
+
+def test_collector():
+    """
+    Stages count their calls and time, counters add up and merged collectors add up too
+    """
+    collector = metrics.Collector()
+    for _ in range(3):
+        with collector.stage('sleep'):
+            time.sleep(0.01)
+    collector.count('matches', 10)
+    collector.count('matches')
+    numbers = collector.as_dict()
+    assert numbers['stages']['sleep'][0] == 3
+    assert 0.03 <= numbers['stages']['sleep'][1] < 1
+    assert numbers['counters'] == {'matches': 11}
+    assert pickle.loads(pickle.dumps(numbers)) == json.loads(json.dumps(numbers)) == numbers
+    other = metrics.Collector()
+    other.count('searched', 2)
+    with other.stage('sleep'):
+        pass
+    other.merge(numbers)
+    assert other.as_dict()['counters'] == {'searched': 2, 'matches': 11}
+    assert other.as_dict()['stages']['sleep'][0] == 4
+    # as_dict is a copy, merging doesn't change the collector it came from
+    assert collector.as_dict() == numbers
+
+
+def test_turned_off(monkeypatch):
+    """
+    Without the collector stage does nothing and count is ignored
+    """
+    monkeypatch.setattr(metrics, 'collector', None)
+    with metrics.stage('anything'):
+        metrics.count('anything')
+    assert metrics.stage('anything') is metrics.stage('other')
+    collector = metrics.Collector()
+    monkeypatch.setattr(metrics, 'collector', collector)
+    with metrics.stage('anything'):
+        metrics.count('anything', 5)
+    assert collector.as_dict() == {'stages': {'anything': [1, collector.stages['anything'][1]]},
+                                   'counters': {'anything': 5}}
+
+
+def test_metrics_log(tmp_path):
+    """
+    Every record is one JSON line with the time it was written, the file is appended to
+    """
+    file = str(tmp_path / 'metrics.jsonl')
+    for seasons in (1, 2):
+        log = metrics.MetricsLog(file)
+        log.write({'seasons': seasons})
+        log.close()
+    records = [json.loads(line) for line in open(file)]
+    assert [record['seasons'] for record in records] == [1, 2]
+    assert all(abs(record['time'] - time.time()) < 60 for record in records)
+
+
+def test_profile_of_the_run(tmp_path, monkeypatch):
+    """
+    Profile of the run on 2 processes has the stages of every batch and every match drawn by the sampler, and the last
+    record says the run is done
+    """
+    # old pickle files are looked for in the working folder
+    monkeypatch.chdir(tmp_path)
+    file = str(tmp_path / 'metrics.jsonl')
+    totals = Main.simulate(2, N_SEASONS, SEED, checkpoint_file=str(tmp_path / 'run.npz'), tolerance=1e-9,
+                           metrics_file=file, profile=True, static=True)[0]
+    assert totals.n_seasons == N_SEASONS
+    record = [json.loads(line) for line in open(file)][-1]
+    assert record['done'] and record['seasons'] == N_SEASONS
+    assert record['counters']['static_sampler_matches'] == N_SEASONS * 380
+    assert record['stages']['random'][0] == record['stages']['ranking'][0] >= 2
+    assert record['stages']['checkpoint'][0] >= 1
+    assert metrics.collector is None
@@ -0,0 +1,137 @@
+"""
+Tests of the calculations in the middle of the season: real results of the played games have to be in every simulated
+season, so the points from them never change, and the remaining games have to be played from the current elo (more
+info in engine.SeasonBatch and Main.current_season)
+"""
+
+import copy
+import numpy as np
+import pytest
+
+import Main
+import engine
+import kernel
+import schedule
+
+"""
+Seed of the runs, number of played matchdays, number of seasons played with play_all_games and with the batch engine,
+and the number of standard errors the averages can differ
+"""
+SEED = 2019
+PLAYED_MATCHDAYS = 10
+SCALAR_SEASONS = 500
+BATCH_SEASONS = 10000
+Z = 5
+
+
+def write_results(tmp_path, matchdays: int) -> str:
+    """
+    Function that writes the results file with random results of the first matchdays
+    :param tmp_path: folder of the file
+    :param matchdays: number of played matchdays
+    :return: file name
+    """
+    random = np.random.RandomState(SEED)
+    file = tmp_path / 'results.csv'
+    lines = ['matchday,home,away,home_goals,away_goals']
+    for matchday, home, away in schedule.read_fixtures(Main.FIXTURES_FILE):
+        goals = random.poisson(1.4, 2) if matchday <= matchdays else ('', '')
+        lines.append('{},{},{},{},{}'.format(matchday, home, away, *goals))
+    file.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return str(file)
+
+
+def played_points(season) -> np.ndarray:
+    """
+    Function that adds up the points of the played games club by club
+    :param season: league from Main.current_season
+    :return: array with shape (n_clubs,)
+    """
+    points = np.zeros(len(season.clubs), dtype=np.int64)
+    for (home, away), (_, home_goals, away_goals) in zip(season.fixtures.tolist(), season.played.tolist()):
+        points[home] += 3 if home_goals > away_goals else 1 if home_goals == away_goals else 0
+        points[away] += 3 if away_goals > home_goals else 1 if home_goals == away_goals else 0
+    return points
+
+
+@pytest.mark.parametrize('static, use_kernel', [
+    (False, False),
+    (True, False),
+    pytest.param(False, True, marks=pytest.mark.skipif(not kernel.AVAILABLE, reason='numba is not installed')),
+])
+def test_played_results_stay_fixed(tmp_path, static, use_kernel):
+    """
+    Every season has the real results of the played games and at least their points, and the remaining games can't
+    give more points than 3 per game
+    """
+    season = Main.current_season(results_file=write_results(tmp_path, PLAYED_MATCHDAYS))
+    n_played = len(season.played)
+    assert n_played == PLAYED_MATCHDAYS * 10
+    batch = engine.simulate_seasons(season.clubs.elo, season.clubs.goals, season.fixtures, 2000, season.constants,
+                                    engine.season_key(SEED), played=season.played, static=static,
+                                    use_kernel=use_kernel)
+    assert (batch.outcome[:, :n_played] == season.played[:, 0]).all()
+    assert (batch.home_scored[:, :n_played] == season.played[:, 1]).all()
+    assert (batch.away_scored[:, :n_played] == season.played[:, 2]).all()
+    fixed = played_points(season)
+    remaining_games = np.bincount(season.fixtures[n_played:].ravel(), minlength=len(season.clubs))
+    assert (batch.points >= fixed).all()
+    assert (batch.points <= fixed + 3 * remaining_games).all()
+    assert (batch.games == 38).all()
+    # remaining games are really played (not every season ends with the same points)
+    assert (batch.points.std(axis=0) > 0).all()
+
+
+def test_current_elo():
+    """
+    Clubs start the remaining games with the elo after the played games, the same elo the scalar code has
+    """
+    results = [(1, 'Liverpool', 'Norwich', 4, 1), (1, 'West Ham', 'Manchester City', 0, 5)]
+    teams = copy.deepcopy(Main.clubs_in_league)
+    Main.apply_results(teams, results)
+    season = Main.season_from_clubs(teams, results, schedule.remaining_games(
+        schedule.read_fixtures(Main.FIXTURES_FILE), results))
+    for name, elo in zip(season.clubs.names, season.clubs.elo):
+        assert elo == teams[name].elo
+    assert season.clubs.elo[season.clubs.names.index('Liverpool')] > Main.clubs_in_league['Liverpool'].elo
+    assert season.fixtures[:2].tolist() == [[season.clubs.names.index(name) for name in pair]
+                                           for pair in (('Liverpool', 'Norwich'), ('West Ham', 'Manchester City'))]
+    assert len(season.fixtures) == 380
+
+
+def test_batch_engine_matches_play_all_games(tmp_path):
+    """
+    Averages of the seasons continued from the played games have to be the same as with play_all_games of the
+    remaining games, within Z standard errors
+    """
+    results_file = write_results(tmp_path, PLAYED_MATCHDAYS)
+    results = schedule.read_results(results_file)
+    remaining = schedule.remaining_games(schedule.read_fixtures(Main.FIXTURES_FILE), results)
+    season = Main.current_season(results_file=results_file)
+    names = season.clubs.names
+    np.random.seed(SEED)
+    scalar = np.zeros((SCALAR_SEASONS, len(names)))
+    for i in range(SCALAR_SEASONS):
+        teams = copy.deepcopy(Main.clubs_in_league)
+        Main.apply_results(teams, results)
+        Main.play_all_games(teams, remaining)
+        scalar[i] = [teams[name].points for name in names]
+    batch = engine.simulate_seasons(season.clubs.elo, season.clubs.goals, season.fixtures, BATCH_SEASONS,
+                                    season.constants, engine.season_key(SEED), played=season.played)
+    error = np.sqrt(scalar.var(axis=0) / SCALAR_SEASONS + batch.points.var(axis=0) / BATCH_SEASONS)
+    assert (np.abs(scalar.mean(axis=0) - batch.points.mean(axis=0)) <= Z * error + 1e-9).all()
+
+
+def test_whole_season_played(tmp_path, monkeypatch):
+    """
+    When all games are played every season is the same and every club finishes on its real position
+    """
+    # old pickle files are looked for in the working folder
+    monkeypatch.chdir(tmp_path)
+    season = Main.current_season(results_file=write_results(tmp_path, 38))
+    totals = Main.simulate(max_seasons=20000, seed=SEED, checkpoint_file=str(tmp_path / 'played.npz'),
+                           tolerance=1e-9, metrics_file=None, season=season)[0]
+    assert totals.n_seasons >= 1
+    np.testing.assert_array_equal(totals.points, played_points(season) * totals.n_seasons)
+    assert ((totals.placings == 0) | (totals.placings == totals.n_seasons)).all()
+    assert (totals.placings.sum(axis=0) == totals.n_seasons).all()
@@ -0,0 +1,143 @@
+"""
+Tests of the queries: every answer has to be the same as the one found by going over all stored seasons, also the
+answers from the counts, from the cached masks and from the answers file (more info in query.py)
+"""
+
+import numpy as np
+import pytest
+
+import Main
+import query
+import store
+
+"""
+Seed and number of the stored seasons
+"""
+SEED = 2019
+N_SEASONS = 20000
+
+
+@pytest.fixture(scope='module')
+def seasons(tmp_path_factory) -> store.SeasonStore:
+    """
+    Function that calculates N_SEASONS seasons with the store
+    :param tmp_path_factory: pytest factory of the temporary folders
+    :return: store of the run
+    """
+    folder = tmp_path_factory.mktemp('query')
+    # old pickle files are looked for in the working folder
+    with pytest.MonkeyPatch.context() as patch:
+        patch.chdir(folder)
+        Main.simulate(max_seasons=N_SEASONS, seed=SEED, checkpoint_file=str(folder / 'run.npz'), tolerance=1e-9,
+                      metrics_file=None, store_seasons=True)
+    return store.SeasonStore(str(folder / 'run.seasons'))
+
+
+def brute_force(seasons: store.SeasonStore, conditions: list, given: list = ()) -> tuple:
+    """
+    Function that counts the seasons row by row of the whole store
+    :param seasons: store
+    :param conditions: functions that get the rows and return the boolean array
+    :param given: conditions of the given part
+    :return: tuple (hits, seasons)
+    """
+    rows = np.array(seasons.rows())
+    condition = np.ones(len(rows), dtype=bool)
+    for function in given:
+        condition &= function(rows)
+    hits = condition.copy()
+    for function in conditions:
+        hits &= function(rows)
+    return int(hits.sum()), int(condition.sum())
+
+
+def test_answers_match_brute_force(seasons, tmp_path):
+    """
+    Probability of every kind of term, their combinations and the conditions is the share of the seasons in the store
+    """
+    engine = query.QueryEngine(seasons, folder=str(tmp_path / 'index'))
+    index = seasons.index
+    first_game = ' - '.join(seasons.names[club] for club in seasons.games[0])
+
+    def position(club):
+        return lambda rows: rows['position'][:, index[club]]
+    questions = {
+        'Arsenal above Tottenham': [lambda rows: position('Arsenal')(rows) < position('Tottenham')(rows)],
+        'Liverpool points >= 90': [lambda rows: rows['points'][:, index['Liverpool']] >= 90],
+        'Chelsea goal_difference < 0': [lambda rows: rows['goal_difference'][:, index['Chelsea']] < 0],
+        'Manchester City champion': [lambda rows: position('Manchester City')(rows) == 0],
+        'Norwich relegated': [lambda rows: position('Norwich')(rows) >= 17],
+        'Everton bottom 5': [lambda rows: position('Everton')(rows) >= 15],
+        'Arsenal top 4 and Chelsea top 4': [lambda rows: position('Arsenal')(rows) < 4,
+                                            lambda rows: position('Chelsea')(rows) < 4],
+        'Liverpool position == 1 and Manchester City position == 2': [
+            lambda rows: position('Liverpool')(rows) == 0, lambda rows: position('Manchester City')(rows) == 1],
+        first_game + ' 2': [lambda rows: store.game_outcomes(rows, 0) == 2],
+    }
+    for question, conditions in questions.items():
+        answer = engine.ask(question)
+        hits, total = brute_force(seasons, conditions)
+        assert (answer['hits'], answer['seasons']) == (hits, total) == (hits, N_SEASONS), question
+        assert answer['probability'] == pytest.approx(hits / N_SEASONS)
+        assert answer['error'] == pytest.approx((hits / N_SEASONS * (1 - hits / N_SEASONS) / N_SEASONS) ** 0.5)
+    answer = engine.ask('Norwich relegated given {} 1 and Arsenal top 4'.format(first_game))
+    hits, total = brute_force(seasons, [lambda rows: position('Norwich')(rows) >= 17],
+                              [lambda rows: store.game_outcomes(rows, 0) == 0,
+                               lambda rows: position('Arsenal')(rows) < 4])
+    assert (answer['hits'], answer['seasons']) == (hits, total)
+    assert 0 < total < N_SEASONS
+
+
+def test_no_seasons_given(seasons, tmp_path):
+    """
+    Condition that is true in no season gives no probability
+    """
+    answer = query.QueryEngine(seasons, folder=str(tmp_path / 'index')).ask('Arsenal top 4 given Arsenal points > 200')
+    assert answer['seasons'] == answer['hits'] == 0
+    assert answer['probability'] is None and answer['error'] is None
+
+
+def test_cached_answers(seasons, tmp_path):
+    """
+    Question asked again (with the terms in other order or other spaces) is answered from the memory, and in the next
+    run from the answers file
+    """
+    folder = str(tmp_path / 'index')
+    first = query.QueryEngine(seasons, folder=folder).ask('Arsenal top 4 and Chelsea top 4')
+    assert not first['cached']
+    engine = query.QueryEngine(seasons, folder=folder)
+    again = engine.ask('Chelsea  top 4 and Arsenal top 4')
+    assert again['cached']
+    assert {key: again[key] for key in ('probability', 'error', 'hits', 'seasons')} == \
+        {key: first[key] for key in ('probability', 'error', 'hits', 'seasons')}
+
+
+def test_index_follows_the_store(seasons, tmp_path):
+    """
+    Index built in small chunks is the same, and it is built again when the store has more seasons
+    """
+    folder = str(tmp_path / 'index')
+    index = query.StoreIndex(seasons, folder, chunk_size=777)
+    rows = seasons.rows()
+    for field in query.FIELDS:
+        np.testing.assert_array_equal(index.columns[field], rows[field].T)
+    copy = store.SeasonStore.create(str(tmp_path / 'copy.seasons'), seasons.names, seasons.games, seasons.fingerprint,
+                                    seasons.entropy)
+    copy.append(np.array(rows[:1000]))
+    engine = query.QueryEngine(copy, folder=str(tmp_path / 'copy.index'))
+    assert engine.ask('Liverpool champion')['seasons'] == 1000
+    copy.append(np.array(rows[1000:3000]))
+    engine = query.QueryEngine(copy, folder=str(tmp_path / 'copy.index'))
+    answer = engine.ask('Liverpool champion')
+    assert answer['seasons'] == 3000 and not answer['cached']
+    assert answer['hits'] == int((rows['position'][:3000, seasons.index['Liverpool']] == 0).sum())
+
+
+@pytest.mark.parametrize('question', ['Real Madrid champion', 'Arsenal - Arsenal 1', 'Arsenal wins the league',
+                                      'Arsenal top 4 given Chelsea top 4 given Everton top 4'])
+def test_wrong_questions(seasons, tmp_path, question):
+    """
+    Unknown clubs, games that aren't remaining, unknown terms and two conditions are errors
+    """
+    with pytest.raises(ValueError):
+        query.QueryEngine(seasons, folder=str(tmp_path / 'index')).ask(question)
@@ -0,0 +1,130 @@
+"""
+Tests of the ranking: sorting all seasons at once with the head to head tie breakers has to give the same order as
+sorting every season on its own by the rules of the league (more info in ranking.py)
+"""
+
+import numpy as np
+import pytest
+
+import engine
+import ranking
+import schedule
+
+"""
+Number of clubs and seasons, goals are from 0 to MAX_GOALS so there are a lot of ties
+"""
+N_CLUBS = 5
+N_SEASONS = 2000
+MAX_GOALS = 2
+
+"""
+Tie breakers of the leagues that look at the games between the tied clubs first, and the ones that look at them last
+"""
+HEAD_TO_HEAD_FIRST = ('points', 'head_to_head_points', 'head_to_head_goal_difference', 'head_to_head_goals_scored',
+                      'goal_difference', 'goals_scored')
+HEAD_TO_HEAD_LAST = ('points', 'goal_difference', 'goals_scored', 'head_to_head_points', 'away_goals_scored', 'wins')
+
+
+def random_batch() -> engine.SeasonBatch:
+    """
+    Function that makes the batch with random results of every game
+    :return: SeasonBatch after count_results
+    """
+    fixtures = schedule.round_robin(N_CLUBS)[0]
+    batch = engine.SeasonBatch(fixtures, N_CLUBS, N_SEASONS)
+    random = np.random.RandomState(2019)
+    batch.home_scored[:] = random.randint(0, MAX_GOALS + 1, batch.home_scored.shape)
+    batch.away_scored[:] = random.randint(0, MAX_GOALS + 1, batch.away_scored.shape)
+    batch.outcome[:] = np.sign(batch.away_scored - batch.home_scored) + 1
+    batch.count_results()
+    return batch
+
+
+def club_stats(games: list, clubs: set) -> dict:
+    """
+    Function that makes the table of the games played between the clubs
+    :param games: list of (home, away, home goals, away goals)
+    :param clubs: only the games where both clubs are in this set count
+    :return: dictionary club: [points, goal difference, goals scored, away goals scored, wins]
+    """
+    stats = {club: [0, 0, 0, 0, 0] for club in clubs}
+    for home, away, home_goals, away_goals in games:
+        if home in clubs and away in clubs:
+            for club, scored, received, at_home in ((home, home_goals, away_goals, True),
+                                                    (away, away_goals, home_goals, False)):
+                stats[club][0] += 3 if scored > received else 1 if scored == received else 0
+                stats[club][1] += scored - received
+                stats[club][2] += scored
+                stats[club][3] += 0 if at_home else scored
+                stats[club][4] += scored > received
+    return stats
+
+
+def brute_force_order(games: list, tie_breakers: tuple) -> list:
+    """
+    Function that sorts one season club by club
+    :param games: list of (home, away, home goals, away goals)
+    :param tie_breakers: names of the tie breakers
+    :return: indexes of the clubs from the first to the last place
+    """
+    table = club_stats(games, set(range(N_CLUBS)))
+    columns = {'points': 0, 'goal_difference': 1, 'goals_scored': 2, 'away_goals_scored': 3, 'wins': 4}
+    first = min(i for i, name in enumerate(tie_breakers) if name.startswith('head_to_head'))
+    before = [columns[name] for name in tie_breakers[:first]]
+    # every club gets its row of the table of the games between the clubs tied with it
+    mini_tables = {}
+    for club in range(N_CLUBS):
+        group = {other for other in range(N_CLUBS)
+                 if all(table[other][column] == table[club][column] for column in before)}
+        mini_tables[club] = club_stats(games, group)[club]
+
+    def key(club):
+        return tuple(-mini_tables[club][columns[name[len('head_to_head_'):]]] if name.startswith('head_to_head')
+                     else -table[club][columns[name]] for name in tie_breakers)
+    return sorted(range(N_CLUBS), key=key)
+
+
+@pytest.mark.parametrize('tie_breakers', [HEAD_TO_HEAD_FIRST, HEAD_TO_HEAD_LAST])
+def test_rank_seasons_matches_brute_force(tie_breakers):
+    """
+    Order of every season has to be the same as the order of the brute force sort
+    """
+    batch = random_batch()
+    order = ranking.rank_seasons(batch, tie_breakers)
+    fixtures = batch.fixtures.tolist()
+    for season in range(N_SEASONS):
+        games = [(home, away, int(home_goals), int(away_goals)) for (home, away), home_goals, away_goals in
+                 zip(fixtures, batch.home_scored[season], batch.away_scored[season])]
+        assert order[season].tolist() == brute_force_order(games, tie_breakers), season
+
+
+def test_head_to_head_changes_the_order():
+    """
+    Head to head tie breakers have to change the order of some seasons (otherwise the test above checks nothing)
+    """
+    batch = random_batch()
+    changed = ranking.rank_seasons(batch, HEAD_TO_HEAD_FIRST) != ranking.rank_seasons(batch)
+    assert changed.any(axis=1).mean() > 0.05
+
+
+def test_count_placings():
+    """
+    Placings are the number of seasons every club finished on every position (or the sum of the weights)
+    """
+    order = ranking.rank_seasons(random_batch())
+    weights = np.random.RandomState(2019).randint(0, 5, order.shape)
+    placings = ranking.count_placings(order, weights)
+    expected = np.zeros((N_CLUBS, N_CLUBS), dtype=np.int64)
+    for season in range(N_SEASONS):
+        for position, club in enumerate(order[season]):
+            expected[club, position] += weights[season, position]
+    np.testing.assert_array_equal(placings, expected)
+    assert (ranking.count_placings(order).sum(axis=0) == N_SEASONS).all()
+
+
+def test_unknown_tie_breaker():
+    """
+    Tie breaker that doesn't exist is an error
+    """
+    with pytest.raises(ValueError):
+        ranking.rank_seasons(random_batch(), ('points', 'fair_play'))
@@ -0,0 +1,79 @@
+"""
+Tests of the fixtures: round robin schedule, reading the fixtures and results files and removing the played games
+(more info in schedule.py)
+"""
+
+import collections
+import json
+import pytest
+
+import Main
+import schedule
+
+
+@pytest.mark.parametrize('n_clubs', [4, 5, 20])
+def test_round_robin_every_pair_twice(n_clubs):
+    """
+    Every club plays every other club once at home and once away, and at most once on the same matchday
+    """
+    fixtures, matchdays = schedule.round_robin(n_clubs)
+    pairs = collections.Counter(map(tuple, fixtures.tolist()))
+    assert set(pairs) == {(home, away) for home in range(n_clubs) for away in range(n_clubs) if home != away}
+    assert set(pairs.values()) == {1}
+    assert matchdays.max() == 2 * (n_clubs - 1 + n_clubs % 2)
+    for matchday in set(matchdays.tolist()):
+        clubs = fixtures[matchdays == matchday].ravel()
+        assert len(clubs) == len(set(clubs.tolist()))
+
+
+def test_premier_league_fixtures():
+    """
+    Fixtures file of the league has every pair of clubs exactly twice (once on each field) on 38 matchdays
+    """
+    games = schedule.read_fixtures(Main.FIXTURES_FILE)
+    assert len(games) == 380
+    assert len({(home, away) for _, home, away in games}) == 380
+    assert {name for _, home, away in games for name in (home, away)} == set(Main.clubs_in_league)
+    assert [matchday for matchday, _, _ in games] == sorted(matchday for matchday, _, _ in games)
+    assert games[-1][0] == 38
+
+
+def test_csv_and_json_files_are_the_same(tmp_path):
+    """
+    Fixtures and results read from the CSV and JSON files are the same, sorted by the matchday, and games without goals
+    are not results
+    """
+    rows = [{'matchday': 2, 'home': 'B', 'away': 'A', 'home_goals': '', 'away_goals': ''},
+            {'matchday': 1, 'home': 'A', 'away': 'B', 'home_goals': 2, 'away_goals': 1},
+            {'matchday': 1, 'home': 'C', 'away': 'D', 'home_goals': 0, 'away_goals': 0}]
+    csv_file, json_file = tmp_path / 'games.csv', tmp_path / 'games.json'
+    csv_file.write_text('matchday,home,away,home_goals,away_goals\n' + ''.join(
+        '{matchday},{home},{away},{home_goals},{away_goals}\n'.format(**row) for row in rows), encoding='utf-8')
+    json_file.write_text(json.dumps([dict(row, home_goals=row['home_goals'] if row['home_goals'] != '' else None,
+                                          away_goals=row['away_goals'] if row['away_goals'] != '' else None)
+                                     for row in rows]), encoding='utf-8')
+    for file in (str(csv_file), str(json_file)):
+        assert schedule.read_fixtures(file) == [(1, 'A', 'B'), (1, 'C', 'D'), (2, 'B', 'A')]
+        assert schedule.read_results(file) == [(1, 'A', 'B', 2, 1), (1, 'C', 'D', 0, 0)]
+
+
+def test_remaining_games():
+    """
+    Played games are removed from the fixtures, the result of the game that isn't in the fixtures is an error
+    """
+    games = [(1, 'A', 'B'), (1, 'C', 'D'), (2, 'B', 'A'), (2, 'D', 'C')]
+    assert schedule.remaining_games(games, [(1, 'A', 'B', 1, 0), (2, 'D', 'C', 3, 3)]) == [(1, 'C', 'D'),
+                                                                                         (2, 'B', 'A')]
+    with pytest.raises(ValueError):
+        schedule.remaining_games(games, [(1, 'A', 'C', 1, 0)])
+
+
+def test_index_fixtures():
+    """
+    Club names become their indexes, unknown club is an error
+    """
+    fixtures, matchdays = schedule.index_fixtures([(1, 'B', 'A'), (3, 'A', 'C')], ['A', 'B', 'C'])
+    assert fixtures.tolist() == [[1, 0], [0, 2]]
+    assert matchdays.tolist() == [1, 3]
+    with pytest.raises(KeyError):
+        schedule.index_fixtures([(1, 'A', 'X')], ['A', 'B'])
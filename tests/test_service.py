@@ -0,0 +1,169 @@
+"""
+Tests of the forecast service: every request has the right answer, the forecast after the new result is the same as
+the one cli.py simulate calculates with that result and the same seed, and the results of the other seed are never
+continued (more info in service.py)
+"""
+
+import asyncio
+import copy
+import json
+import pytest
+from http import HTTPStatus
+
+import Main
+import cli
+import schedule
+import service
+
+"""
+Seed and number of seasons of every forecast
+"""
+SEED = 2019
+N_SEASONS = 20000
+
+
+def post(forecast_service: service.ForecastService, result: dict) -> tuple:
+    """
+    Function that posts the result to the service
+    :param forecast_service: service
+    :param result: dictionary with home, away, home_goals and away_goals
+    :return: tuple (status, answer)
+    """
+    return forecast_service.route('POST', '/results', json.dumps(result).encode('utf-8'))
+
+
+def cli_forecast(tmp_path, results: list) -> list:
+    """
+    Function that calculates the forecast with cli.py simulate from the results file
+    :param tmp_path: folder of the files
+    :param results: played results, tuples (matchday, home, away, home goals, away goals)
+    :return: rows of the forecast
+    """
+    lines = ['matchday,home,away,home_goals,away_goals'] + ['{},{},{},{},{}'.format(*result) for result in results]
+    (tmp_path / 'played.csv').write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    arguments = cli.make_parser().parse_args([
+        'simulate', '--played', str(tmp_path / 'played.csv'), '--checkpoint', str(tmp_path / 'cli.npz'), '--seed',
+        str(SEED), '--seasons', str(N_SEASONS), '--tolerance', '1e-9', '--format', 'json', '--output',
+        str(tmp_path / 'forecast.json'), '--quiet'])
+    assert arguments.function(arguments) == 0
+    return json.loads((tmp_path / 'forecast.json').read_text(encoding='utf-8'))
+
+
+def test_forecast_after_new_results(tmp_path, monkeypatch):
+    """
+    Forecast is unavailable until the first one is finished, every new result starts the new one, and it is the same
+    as the forecast of cli.py simulate with the same results and seed
+    """
+    # old pickle files are looked for in the working folder
+    monkeypatch.chdir(tmp_path)
+
+    async def scenario():
+        forecast_service = service.ForecastService(max_seasons=N_SEASONS, seed=SEED, tolerance=1e-9,
+                                                   checkpoint_file=str(tmp_path / 'service.npz'))
+        forecast_service.start()
+        try:
+            assert forecast_service.route('GET', '/forecast', b'')[0] == HTTPStatus.SERVICE_UNAVAILABLE
+            await forecast_service.task
+            status, first = forecast_service.route('GET', '/forecast', b'')
+            assert status == HTTPStatus.OK
+            assert (first['generation'], first['results'], first['seasons']) == (0, 0, N_SEASONS)
+            assert post(forecast_service, {'home': 'Liverpool', 'away': 'Norwich', 'home_goals': 4,
+                                           'away_goals': 1}) == (HTTPStatus.ACCEPTED, {'generation': 1, 'results': 1})
+            # result that comes during the calculations stops them
+            assert post(forecast_service, {'home': 'West Ham', 'away': 'Manchester City', 'home_goals': 0,
+                                           'away_goals': 5})[0] == HTTPStatus.ACCEPTED
+            assert forecast_service.route('GET', '/forecast', b'')[1]['generation'] == 0
+            await forecast_service.task
+            return forecast_service.route('GET', '/forecast', b'')[1], forecast_service.route('GET', '/status', b'')[1]
+        finally:
+            forecast_service.close()
+    forecast, status = asyncio.run(scenario())
+    assert (forecast['generation'], forecast['results'], forecast['seasons']) == (2, 2, N_SEASONS)
+    assert status['generation'] == status['forecast_generation'] == 2 and not status['calculating']
+    results = [(1, 'Liverpool', 'Norwich', 4, 1), (1, 'West Ham', 'Manchester City', 0, 5)]
+    assert json.loads(json.dumps(forecast['clubs'])) == cli_forecast(tmp_path, results)
+
+
+def test_routes(tmp_path, monkeypatch):
+    """
+    Wrong results are 400 and change nothing, clubs have the played games, unknown paths are 404 and 405
+    """
+    monkeypatch.chdir(tmp_path)
+    forecast_service = service.ForecastService(seed=SEED, checkpoint_file=str(tmp_path / 'service.npz'))
+
+    async def scenario():
+        try:
+            assert post(forecast_service, {'home': 'Liverpool', 'away': 'Norwich', 'home_goals': 4,
+                                           'away_goals': 1})[0] == HTTPStatus.ACCEPTED
+            forecast_service.task.cancel()
+            for result in ({'home': 'Liverpool', 'away': 'Norwich', 'home_goals': 1, 'away_goals': 1},
+                           {'home': 'Liverpool', 'away': 'Liverpool', 'home_goals': 1, 'away_goals': 1},
+                           {'home': 'Arsenal', 'away': 'Chelsea', 'home_goals': -1, 'away_goals': 1},
+                           {'home': 'Arsenal', 'away': 'Chelsea', 'home_goals': 'many', 'away_goals': 1},
+                           {'home': 'Arsenal', 'away': 'Chelsea'}, ['Arsenal', 'Chelsea', 1, 1]):
+                status, answer = post(forecast_service, result)
+                assert status == HTTPStatus.BAD_REQUEST and 'error' in answer, result
+            assert forecast_service.route('POST', '/results', b'{not json')[0] == HTTPStatus.BAD_REQUEST
+        finally:
+            forecast_service.close()
+    asyncio.run(scenario())
+    assert forecast_service.generation == 1 and len(forecast_service.results) == 1
+    assert len(forecast_service.remaining) == len(schedule.read_fixtures(Main.FIXTURES_FILE)) - 1
+    status, clubs = forecast_service.route('GET', '/clubs/', b'')
+    liverpool = next(club for club in clubs if club['club'] == 'Liverpool')
+    assert status == HTTPStatus.OK and (liverpool['points'], liverpool['goals_scored'], liverpool['games']) == (3, 4, 1)
+    assert liverpool['elo'] > Main.clubs_in_league['Liverpool'].elo
+    assert forecast_service.route('GET', '/nothing', b'')[0] == HTTPStatus.NOT_FOUND
+    assert forecast_service.route('DELETE', '/results', b'')[0] == HTTPStatus.METHOD_NOT_ALLOWED
+
+
+def test_other_seed_is_rejected(tmp_path, monkeypatch):
+    """
+    Service with the other seed doesn't start on the checkpoint of the same inputs, and the result that would continue
+    the results of the other seed is 400
+    """
+    monkeypatch.chdir(tmp_path)
+    file = str(tmp_path / 'service.npz')
+    Main.simulate(max_seasons=10000, seed=SEED, checkpoint_file=file, tolerance=1e-9, metrics_file=None)
+    with pytest.raises(ValueError):
+        service.ForecastService(seed=SEED + 1, checkpoint_file=file)
+    # results of the seed SEED after the first game
+    results = [(1, 'Liverpool', 'Norwich', 4, 1)]
+    teams = copy.deepcopy(Main.clubs_in_league)
+    Main.apply_results(teams, results)
+    season = Main.season_from_clubs(teams, results, schedule.remaining_games(
+        schedule.read_fixtures(Main.FIXTURES_FILE), results))
+    file = str(tmp_path / 'first_game.npz')
+    Main.simulate(max_seasons=10000, seed=SEED, checkpoint_file=file, tolerance=1e-9, metrics_file=None,
+                  season=season)
+    forecast_service = service.ForecastService(seed=SEED + 1, checkpoint_file=file)
+    status, answer = post(forecast_service, {'home': 'Liverpool', 'away': 'Norwich', 'home_goals': 4,
+                                             'away_goals': 1})
+    assert status == HTTPStatus.BAD_REQUEST and str(SEED) in answer['error']
+    assert forecast_service.generation == 0 and forecast_service.task is None
+
+
+def test_http(tmp_path, monkeypatch):
+    """
+    Service answers the real HTTP requests with JSON
+    """
+    monkeypatch.chdir(tmp_path)
+
+    async def scenario():
+        forecast_service = service.ForecastService(seed=SEED, checkpoint_file=str(tmp_path / 'service.npz'))
+        server = await asyncio.start_server(forecast_service.handle, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        answers = []
+        async with server:
+            for request in (b'GET /status HTTP/1.1\r\n\r\n', b'GET /clubs HTTP/1.1\r\n\r\n', b'nonsense\r\n\r\n'):
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+                writer.write(request)
+                await writer.drain()
+                answers.append(await reader.read())
+                writer.close()
+        return answers
+    status, clubs, wrong = asyncio.run(scenario())
+    assert status.startswith(b'HTTP/1.1 200 OK\r\n')
+    assert json.loads(status.split(b'\r\n\r\n', 1)[1])['generation'] == 0
+    assert len(json.loads(clubs.split(b'\r\n\r\n', 1)[1])) == 20
+    assert wrong.startswith(b'HTTP/1.1 400 Bad Request\r\n')
@@ -0,0 +1,88 @@
+"""
+Tests of the static mode: elo doesn't change during the season, so the static run has to give the same averages as
+the normal run with k_base 0 (within the Monte Carlo error), the same seasons for the same seed, and it has to work
+even when all games were already played (more info in engine.StaticSampler and Main.STATIC_RATINGS)
+"""
+
+import numpy as np
+import pytest
+
+import Main
+import engine
+import league
+import schedule
+
+"""
+Seed of the runs, number of seasons and the number of standard errors the averages can differ
+"""
+SEED = 2019
+N_SEASONS = 20000
+Z = 5
+
+
+def test_static_matches_frozen_elo():
+    """
+    Averages of the static run are the same as the averages of the normal run where elo can't change, within Z standard
+    errors, and elo stays the same
+    """
+    season = Main.current_season()
+    frozen = dict(season.constants, k_base=0)
+    static = engine.simulate_seasons(season.clubs.elo, season.clubs.goals, season.fixtures, N_SEASONS,
+                                     season.constants, engine.season_key(SEED), static=True)
+    normal = engine.simulate_seasons(season.clubs.elo, season.clubs.goals, season.fixtures, N_SEASONS, frozen,
+                                     engine.season_key(SEED + 1), use_kernel=True)
+    np.testing.assert_array_equal(static.elo, np.broadcast_to(season.clubs.elo, static.elo.shape))
+    np.testing.assert_allclose(normal.elo, np.broadcast_to(season.clubs.elo, normal.elo.shape))
+    for attribute in engine.STAT_ATTRIBUTES[1:]:
+        static_values, normal_values = getattr(static, attribute), getattr(normal, attribute)
+        error = np.sqrt((static_values.var(axis=0) + normal_values.var(axis=0)) / N_SEASONS)
+        difference = np.abs(static_values.mean(axis=0) - normal_values.mean(axis=0))
+        assert (difference <= Z * error + 1e-9).all(), attribute
+    # outcomes agree with the goals
+    assert (static.outcome == 1 - np.sign(static.home_scored - static.away_scored)).all()
+
+
+def test_same_seed_same_seasons(tmp_path, monkeypatch):
+    """
+    Static runs with the same seed (on any number of processes) have the same results, other seed gives other results
+    """
+    # old pickle files are looked for in the working folder
+    monkeypatch.chdir(tmp_path)
+
+    def run(name, workers, seed):
+        return Main.simulate(workers, N_SEASONS, seed, checkpoint_file=str(tmp_path / name), tolerance=1e-9,
+                             metrics_file=None, static=True)[0]
+    first, second, other = run('first.npz', 1, SEED), run('second.npz', 2, SEED), run('other.npz', 1, SEED + 1)
+    for attribute in engine.STAT_ATTRIBUTES + ('placings',):
+        np.testing.assert_array_equal(getattr(first, attribute), getattr(second, attribute), attribute)
+    assert (first.placings != other.placings).any()
+
+
+def test_static_and_normal_results_are_not_mixed(tmp_path, monkeypatch):
+    """
+    Checkpoint of the normal run can't be continued in the static mode
+    """
+    monkeypatch.chdir(tmp_path)
+    file = str(tmp_path / 'run.npz')
+    Main.simulate(max_seasons=10000, seed=SEED, checkpoint_file=file, tolerance=1e-9, metrics_file=None)
+    with pytest.raises(ValueError):
+        Main.simulate(max_seasons=20000, seed=SEED, checkpoint_file=file, tolerance=1e-9, metrics_file=None,
+                      static=True)
+
+
+def test_all_games_played():
+    """
+    When all games were already played the static run has nothing to draw and every season is the real one
+    """
+    season = Main.current_season()
+    results = [(matchday, home, away, len(home) % 3, len(away) % 4)
+               for matchday, home, away in schedule.read_fixtures(Main.FIXTURES_FILE)]
+    fixtures = schedule.index_fixtures([result[:3] for result in results], season.clubs.names)[0]
+    played = league.League(season.name, season.constants, season.clubs, fixtures, league.played_array(results))
+    static = engine.simulate_seasons(played.clubs.elo, played.clubs.goals, played.fixtures, 10, played.constants,
+                                     engine.season_key(SEED), played=played.played, static=True)
+    normal = engine.simulate_seasons(played.clubs.elo, played.clubs.goals, played.fixtures, 10, played.constants,
+                                     engine.season_key(SEED), played=played.played)
+    for attribute in engine.STAT_ATTRIBUTES[1:]:
+        np.testing.assert_array_equal(getattr(static, attribute), getattr(normal, attribute), attribute)
+    assert (static.points == static.points[0]).all()
@@ -0,0 +1,145 @@
+"""
+Tests of the store of the seasons: every calculated season has to be stored once, with the same points, positions
+and results as the totals and the replayed season, also when the run is continued after the crash (more info in
+store.py)
+"""
+
+import numpy as np
+import pytest
+
+import Main
+import engine
+import league
+import schedule
+import store
+
+"""
+Seed of the runs, their number of seasons and the number of played matchdays
+"""
+SEED = 2019
+N_SEASONS = 20000
+PLAYED_MATCHDAYS = 30
+
+
+def played_season(folder) -> league.League:
+    """
+    Function that makes the league where the first PLAYED_MATCHDAYS matchdays were played (every home club won 2:1)
+    :param folder: folder of the results file
+    :return: league from Main.current_season
+    """
+    lines = ['matchday,home,away,home_goals,away_goals']
+    for matchday, home, away in schedule.read_fixtures(Main.FIXTURES_FILE):
+        lines.append('{},{},{},{}'.format(matchday, home, away, '2,1' if matchday <= PLAYED_MATCHDAYS else ','))
+    (folder / 'results.csv').write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return Main.current_season(results_file=str(folder / 'results.csv'))
+
+
+def run(folder, season: league.League, max_seasons: int) -> engine.SeasonTotals:
+    """
+    Function that calculates the seasons with the store turned on
+    :param folder: folder of the checkpoint and the store
+    :param season: league
+    :param max_seasons: number of seasons
+    :return: totals of the run
+    """
+    # old pickle files are looked for in the working folder
+    with pytest.MonkeyPatch.context() as patch:
+        patch.chdir(folder)
+        return Main.simulate(max_seasons=max_seasons, seed=SEED, checkpoint_file=str(folder / 'run.npz'),
+                             tolerance=1e-9, metrics_file=None, season=season, store_seasons=True)[0]
+
+
+@pytest.fixture(scope='module')
+def stored_run(tmp_path_factory) -> tuple:
+    """
+    Function that calculates N_SEASONS seasons with the store
+    :param tmp_path_factory: pytest factory of the temporary folders
+    :return: tuple (league, totals, store)
+    """
+    folder = tmp_path_factory.mktemp('store')
+    season = played_season(folder)
+    totals = run(folder, season, N_SEASONS)
+    return season, totals, store.SeasonStore(str(folder / 'run.seasons'))
+
+
+def test_store_matches_totals(stored_run):
+    """
+    Every season is stored once and the rows add up to the totals
+    """
+    season, totals, seasons = stored_run
+    rows = seasons.rows()
+    assert len(seasons) == N_SEASONS
+    np.testing.assert_array_equal(rows['season'], np.arange(N_SEASONS))
+    n_clubs = len(season.clubs)
+    placings = np.stack([np.bincount(rows['position'][:, club], minlength=n_clubs) for club in range(n_clubs)])
+    np.testing.assert_array_equal(placings, totals.placings)
+    np.testing.assert_array_equal(rows['points'].sum(axis=0, dtype=np.int64), totals.points)
+    np.testing.assert_array_equal(rows['goal_difference'].sum(axis=0, dtype=np.int64),
+                                  totals.goals_scored - totals.goals_received)
+    assert seasons.names == season.clubs.names and seasons.entropy == SEED
+    assert seasons.games == [tuple(game) for game in season.fixtures[len(season.played):].tolist()]
+
+
+def test_store_matches_replay(stored_run):
+    """
+    Results of the remaining games and the table of the stored season are the same as in the replayed season
+    """
+    season, _, seasons = stored_run
+    rows = seasons.rows()
+    n_played = len(season.played)
+    for number in (0, 1, 9999, N_SEASONS - 1):
+        games, totals = Main.replay_season(season, SEED, number)
+        outcomes = [1 - int(np.sign(home_goals - away_goals)) for _, _, home_goals, away_goals, _, _ in games]
+        assert [int(store.game_outcomes(rows[number:number + 1], game)[0]) for game in range(len(seasons.games))] == \
+            outcomes[n_played:]
+        np.testing.assert_array_equal(rows['points'][number], totals.points)
+        np.testing.assert_array_equal(rows['position'][number], totals.placings.argmax(axis=1))
+
+
+def test_pack_outcomes():
+    """
+    Every outcome code is unpacked the same as it was packed
+    """
+    outcome = np.random.RandomState(SEED).randint(0, 3, (100, 37)).astype(np.int8)
+    rows = np.zeros(100, dtype=store.row_dtype(2, 37))
+    rows['outcomes'] = store.pack_outcomes(outcome)
+    assert rows.dtype['outcomes'].shape == (10,)
+    for game in range(37):
+        np.testing.assert_array_equal(store.game_outcomes(rows, game), outcome[:, game])
+
+
+def test_probability(stored_run):
+    """
+    Probability read in chunks is the share of the seasons, empty store has no probability
+    """
+    _, _, seasons = stored_run
+    rows = seasons.rows()
+    expected = float(np.mean(rows['points'][:, 0] >= 90))
+    probability, error = seasons.probability(lambda chunk: chunk['points'][:, 0] >= 90, chunk_size=3000)
+    assert probability == pytest.approx(expected)
+    assert error == pytest.approx((expected * (1 - expected) / N_SEASONS) ** 0.5)
+
+
+def test_continued_run(tmp_path):
+    """
+    Seasons calculated after the last checkpoint of the crashed run are removed and calculated again, half written row
+    is ignored and the store of other inputs can't be continued
+    """
+    season = played_season(tmp_path)
+    run(tmp_path, season, 10000)
+    seasons = store.SeasonStore(str(tmp_path / 'run.seasons'))
+    # rows that were written before the crash, but after the last checkpoint
+    crashed = np.array(seasons.rows()[-500:])
+    crashed['season'] += 500
+    seasons.append(crashed)
+    with open(seasons.file, 'ab') as handle:
+        handle.write(b'\0' * 10)
+    assert len(seasons) == 10500
+    run(tmp_path, season, 20000)
+    rows = seasons.rows()
+    np.testing.assert_array_equal(rows['season'], np.arange(20000))
+    np.testing.assert_array_equal(rows['points'][10250], Main.replay_season(season, SEED, 10250)[1].points)
+    with pytest.raises(ValueError):
+        store.SeasonStore.open_run(seasons.file, seasons.names, seasons.games, 'other fingerprint', SEED, 0)
+    empty = store.SeasonStore.create(str(tmp_path / 'empty.seasons'), seasons.names, seasons.games, 'none', SEED)
+    assert len(empty) == 0 and np.isnan(empty.probability(lambda chunk: chunk['points'][:, 0] > 0)[0])
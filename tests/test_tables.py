@@ -0,0 +1,54 @@
+"""
+Tests of the lookup tables: interpolated values have to be the same as the exact formulas within the error found when
+the table was made, and get_table keeps only the last TABLE_CACHE tables (more info in tables.py)
+"""
+
+import numpy as np
+
+import Main
+import tables
+
+"""
+Elo differences the tables are checked at (random ones, the grid points and the ones outside of the table)
+"""
+DIFFERENCES = np.concatenate([np.random.RandomState(2019).uniform(-1600, 1600, 10000), np.arange(-1500, 1501, 0.1),
+                              [-1e6, -1500.05, 1499.95, 1e6]])
+
+
+def test_lookup_matches_exact_values():
+    """
+    Both lookups have to be within max_error of the exact formulas, which has to be small
+    """
+    table = tables.get_table(Main.CONSTANTS)
+    assert table.max_error < 1e-7
+    clipped = np.clip(DIFFERENCES, -table.limit, table.limit)
+    exact = tables.exact_values(clipped, Main.CONSTANTS)
+    looked_up = np.stack(table.lookup(DIFFERENCES.copy()), axis=-1)
+    np.testing.assert_allclose(looked_up, exact[:, [0, 1, 3]], rtol=0, atol=table.max_error + 1e-12)
+    one_by_one = np.array([table.lookup_one(difference) for difference in DIFFERENCES])
+    np.testing.assert_allclose(one_by_one, exact, rtol=0, atol=table.max_error + 1e-12)
+    np.testing.assert_allclose(one_by_one[:, [0, 1, 3]], looked_up, rtol=0, atol=1e-12)
+
+
+def test_lookup_keeps_the_input():
+    """
+    lookup doesn't change the array of differences
+    """
+    differences = DIFFERENCES.copy()
+    tables.get_table(Main.CONSTANTS).lookup(differences)
+    np.testing.assert_array_equal(differences, DIFFERENCES)
+
+
+def test_get_table_cache():
+    """
+    Same constants give the same table, tables not used the longest are removed after TABLE_CACHE others are made
+    """
+    table = tables.get_table(Main.CONSTANTS)
+    assert tables.get_table(dict(Main.CONSTANTS)) is table
+    assert tables.get_table(dict(Main.CONSTANTS, home_field_advantage=0)) is table
+    for i in range(tables.TABLE_CACHE):
+        tables.get_table(dict(Main.CONSTANTS, c=Main.CONSTANTS['c'] + i + 1))
+        assert len(tables._tables) <= tables.TABLE_CACHE
+    assert tables.get_table(Main.CONSTANTS) is not table
+    assert tables.get_table(dict(Main.CONSTANTS, c=Main.CONSTANTS['c'] + tables.TABLE_CACHE)) is tables.get_table(
+        dict(Main.CONSTANTS, c=Main.CONSTANTS['c'] + tables.TABLE_CACHE))